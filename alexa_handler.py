@@ -1,95 +1,122 @@
-import json
-import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import requests
 from dotenv import load_dotenv
-from tasks.youtube_task import handle_youtube
-from tasks.media_task import handle_media
-from tasks.system_task import handle_system
-from tasks.todo_task import handle_todo
-from tasks.reminder_task import handle_reminder, schedule_existing_reminders
-from tasks.picture_task import handle_pictures
-from speech_module import speak  # Still useful for output
-from tasks.media_task import speak  # assuming speak() is reused here
-
-def handle_local_command(command):
-    """Process local Jarvis commands from Alexa input."""
-    command = command.lower().strip()
-    print(f"[ALEXA DEBUG] Processing local command: {command}")
-
-    if handle_youtube(command):
-        return "YouTube task triggered."
-    if handle_media(command):
-        return "Media task executed."
-    if handle_system(command):
-        return "System task executed."
-    if handle_todo(command):
-        return "To-do task executed."
-    if handle_reminder(command):
-        return "Reminder task added."
-    if handle_pictures(command):
-        return "Picture slideshow started."
-
-    return "Sorry, I could not process the local command."
+import metrics
+from tasks.router import compile_intents, match_intents
+from tasks import engine
+from tasks import intents  # registers trigger phrases; task modules load on first use
+from tasks import groq_handler
 
-load_dotenv()
-groq_api_key = os.getenv("GROQ_API_KEY")
+compile_intents()
+
+log = logging.getLogger("jarvis.alexa")
+
+LOCAL_COMMAND_RESPONSES = {
+    "youtube": "YouTube task triggered.",
+    "media": "Media task executed.",
+    "system": "System task executed.",
+    "todo": "To-do task executed.",
+    "reminder": "Reminder task added.",
+    "pictures": "Picture slideshow started.",
+}
+
+# Alexa waits about 8 seconds for a skill to answer. Slow work (Groq, local
+# handlers that drive a browser or VLC) runs on a small bounded pool; the
+# request thread waits at most until its deadline and then answers with a
+# fallback while the work carries on. Local commands are acknowledged as soon
+# as the router knows which intent takes them and run on the task engine.
+
+DEADLINE_SECONDS = 6.5          # leaves headroom for the trip back to Alexa
+PROGRESSIVE_AFTER_SECONDS = 1.5 # say "working on it" if the answer isn't ready by then
+MAX_WORKERS = 4
+MAX_PENDING = 16                # running + queued; beyond this, answer "busy" at once
+
+TIMEOUT_RESPONSE = "That is taking longer than expected. Ask me again in a moment and I should have it."
+BUSY_RESPONSE = "I'm a bit busy right now. Please try again in a moment."
+PROGRESS_RESPONSE = "Let me think about that."
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="alexa-work")
+_slots = threading.BoundedSemaphore(MAX_PENDING)
+
+def submit(label, fn, *args):
+    """Run fn on the worker pool. Returns a Future, or None if the pool is saturated."""
+    if not _slots.acquire(blocking=False):
+        metrics.inc("jarvis_alexa_rejected_total", intent=label)
+        return None
+    started = time.perf_counter()
+
+    def run():
+        try:
+            return fn(*args)
+        finally:
+            metrics.observe("jarvis_alexa_work_seconds", time.perf_counter() - started, intent=label)
+            _slots.release()
+    return _executor.submit(run)
 
-def handle_alexa_request(data):
+def send_progressive_response(alexa_request, text):
+    """Have Alexa say text while we keep working (Progressive Response API). Best effort."""
+    if not (alexa_request.api_endpoint and alexa_request.api_token and alexa_request.request_id):
+        return
     try:
-        user_query = data['request']['intent']['slots']['query']['value'].lower()
-    except KeyError:
-        return build_alexa_response("Sorry, I didn't catch that.")
-
-    if user_query.startswith("local to "):
-        local_command = user_query.replace("local to ", "").strip()
-        if process_local_command(local_command):
-            return build_alexa_response("Command executed.")
-        else:
-            return build_alexa_response("Sorry, I couldn't process that local command.")
-    else:
-        return build_alexa_response(query_groq_model(user_query))
-
-def process_local_command(command):
-    if handle_youtube(command):
-        return True
-    if handle_media(command):
-        return True
-    if handle_system(command):
-        return True
-    if handle_todo(command):
-        return True
-    if handle_reminder(command):
-        return True
-    if handle_pictures(command):
-        return True
-    return False
+        requests.post(f"{alexa_request.api_endpoint}/v1/directives", timeout=1.0,
+                      headers={"Authorization": f"Bearer {alexa_request.api_token}"},
+                      json={"header": {"requestId": alexa_request.request_id},
+                            "directive": {"type": "VoicePlayer.Speak", "speech": text}})
+    except requests.RequestException as e:
+        log.warning("Progressive response failed: %s", e)
 
-def query_groq_model(prompt):
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {groq_api_key}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [{"role": "user", "content": prompt}]
-    }
+def answer_within_deadline(label, fn, *args, alexa_request=None, deadline=None):
+    """fn(*args) if it finishes within the deadline, else a fallback text. The work is never cancelled."""
+    deadline = DEADLINE_SECONDS if deadline is None else deadline
+    started = time.perf_counter()
+    future = submit(label, fn, *args)
+    if future is None:
+        return BUSY_RESPONSE
+    try:
+        if alexa_request is not None:
+            try:
+                return future.result(timeout=min(PROGRESSIVE_AFTER_SECONDS, deadline))
+            except FutureTimeout:
+                threading.Thread(target=send_progressive_response, args=(alexa_request, PROGRESS_RESPONSE),
+                                 daemon=True).start()
+        return future.result(timeout=max(0, deadline - (time.perf_counter() - started)))
+    except FutureTimeout:
+        metrics.inc("jarvis_alexa_deadline_exceeded_total", intent=label)
+        log.warning("%s missed the %ss deadline; answering with a fallback", label, deadline)
+        return TIMEOUT_RESPONSE
+
+LOCAL_UNKNOWN_RESPONSE = "Sorry, I could not process the local command."
+
+# Replies that never change, for alexa_request.precompile_responses
+FIXED_RESPONSES = (*LOCAL_COMMAND_RESPONSES.values(), TIMEOUT_RESPONSE, BUSY_RESPONSE,
+                   LOCAL_UNKNOWN_RESPONSE, "Working on it.")
+
+def _local_done(command, started, future):
+    metrics.observe("jarvis_alexa_work_seconds", time.perf_counter() - started, intent="local")
+    if future.exception() is None and future.result() is None:
+        log.warning("No handler took the local command in the end: %s", command)
 
+def acknowledge_local_command(command):
+    """Start a local command on the task engine and return the acknowledgement straight away."""
+    command = command.lower().strip()
+    log.debug("Processing local command: %s", command)
+    matched = match_intents(command)
+    if not matched:
+        return LOCAL_UNKNOWN_RESPONSE
+    intent = matched[0]["name"]
+    started = time.perf_counter()
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        return response.json()["choices"][0]["message"]["content"]
-    except Exception as e:
-        print("[ERROR] Groq API:", e)
-        return "There was a problem contacting the AI."
-
-def build_alexa_response(message):
-    return {
-        "version": "1.0",
-        "response": {
-            "outputSpeech": {
-                "type": "PlainText",
-                "text": message
-            },
-            "shouldEndSession": True
-        }
-    }
+        future = engine.submit(command)
+    except engine.EngineBusy:
+        metrics.inc("jarvis_alexa_rejected_total", intent=f"local:{intent}")
+        return BUSY_RESPONSE
+    future.add_done_callback(lambda f: _local_done(command, started, f))
+    return LOCAL_COMMAND_RESPONSES.get(intent, "Working on it.")
+
+load_dotenv()
+
+def query_groq_model(prompt):
+    return groq_handler.query_groq_model(prompt, error_reply="There was a problem contacting the AI.")
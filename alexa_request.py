@@ -0,0 +1,83 @@
+import json
+from dataclasses import dataclass, field
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compact model of an incoming Alexa request and a fast path for responses.
+# AlexaRequest.parse pulls out only the fields Jarvis uses; everything else in
+# the (fairly large) Alexa envelope is ignored. Responses are bytes: the
+# envelope around the spoken text never changes, so it is pre-split into a
+# prefix and suffix, and the fixed replies are serialized once at import.
+# orjson is used when it is installed; otherwise the standard json module.
+
+if orjson is not None:
+    loads = orjson.loads
+    _dump_string = orjson.dumps
+else:
+    loads = json.loads
+
+    def _dump_string(text):
+        return json.dumps(text, ensure_ascii=False).encode()
+
+class AlexaRequestError(ValueError):
+    pass
+
+@dataclass(slots=True, frozen=True)
+class AlexaRequest:
+    type: str
+    request_id: str = None
+    intent: str = None
+    slots: dict = field(default_factory=dict)  # slot name -> spoken value (only slots that have one)
+    api_endpoint: str = None
+    api_token: str = None
+
+    @classmethod
+    def parse(cls, body):
+        """Build from the raw request body (bytes or str). Raises AlexaRequestError if it isn't an Alexa request."""
+        try:
+            data = loads(body)
+        except ValueError as e:
+            raise AlexaRequestError(f"Request body is not JSON: {e}")
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data):
+        try:
+            request = data["request"]
+            request_type = request["type"]
+        except (KeyError, TypeError) as e:
+            raise AlexaRequestError(f"Missing key in Alexa JSON structure: {e}")
+
+        intent = request.get("intent")
+        intent_name = None
+        slots = {}
+        if intent:
+            intent_name = intent.get("name")
+            for name, slot in (intent.get("slots") or {}).items():
+                value = slot.get("value")
+                if value is not None:
+                    slots[name] = value
+
+        system = (data.get("context") or {}).get("System") or {}
+        return cls(request_type, request.get("requestId"), intent_name, slots,
+                   system.get("apiEndpoint"), system.get("apiAccessToken"))
+
+_PREFIX = b'{"version":"1.0","response":{"outputSpeech":{"type":"PlainText","text":'
+_SUFFIX = b'},"shouldEndSession":true}}'
+
+def render_response(message):
+    """The Alexa response JSON that speaks message and ends the session, as bytes."""
+    template = _templates.get(message)
+    if template is not None:
+        return template
+    return _PREFIX + _dump_string(message) + _SUFFIX
+
+_templates = {}
+
+def precompile_responses(messages):
+    """Serialize fixed replies once so render_response returns them without any work."""
+    for message in messages:
+        _templates[message] = _PREFIX + _dump_string(message) + _SUFFIX
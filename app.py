@@ -1,14 +1,19 @@
+import startup_profiler  # keep first so it can time every import below
 import os
+import sys
+import atexit
 import subprocess
 import time
-import json
-import requests
-from flask import Flask, request, jsonify
+import logging
+from flask import Flask, request, Response
 from dotenv import load_dotenv
 
-# Ensure these imports are correct and point to your alexa_handler.py and update_alexa_endpoint.py
-from alexa_handler import handle_local_command, query_groq_model, build_alexa_response
-from update_alexa_endpoint import update_alexa_endpoint
+from alexa_handler import acknowledge_local_command, answer_within_deadline, query_groq_model, FIXED_RESPONSES
+from alexa_request import AlexaRequest, AlexaRequestError, render_response, precompile_responses
+import metrics
+from jarvis_logging import configure_logging
+import endpoint_sync
+from tunnel import TunnelSupervisor, TunnelError
 
 # Load environment variables
 load_dotenv()
@@ -16,11 +21,25 @@ groq_api_key = os.getenv("GROQ_API_KEY")
 ngrok_token = os.getenv("NGROK_AUTH_TOKEN")
 
 app = Flask(__name__)
+log = logging.getLogger("jarvis.alexa")
+configure_logging()
 
-ngrok_process = None
+SERVER_PORT = 5000
+SERVER_THREADS = 8
+RECORD_DIR = os.getenv("JARVIS_RECORD_REQUESTS")  # save request bodies here for benchmarks/load_alexa.py
+
+tunnel = None
+
+def publish_url(public_url):
+    """Called with the first public URL and again whenever ngrok comes back with a new one."""
+    print(f"\n🚀 Ngrok Public URL: {public_url}")
+    update_env_variable("NGROK_PUBLIC_URL", public_url)
+    # Published in the background (and skipped if the URL hasn't changed),
+    # so the server takes requests straight away
+    endpoint_sync.sync_in_background(public_url)
 
 def start_ngrok():
-    global ngrok_process
+    global tunnel
     try:
         subprocess.run(["ngrok", "config", "add-authtoken", ngrok_token], check=True, capture_output=True, text=True)
     except subprocess.CalledProcessError as e:
@@ -31,45 +50,31 @@ def start_ngrok():
         print("Error: 'ngrok' command not found. Please ensure ngrok is installed and in your system's PATH.")
         return None
 
-    ngrok_process = subprocess.Popen(["ngrok", "http", "5000"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    time.sleep(5) # Adjust this if you still experience Connection Refused errors
-
+    tunnel = TunnelSupervisor(SERVER_PORT, on_url=publish_url)
     try:
-        tunnels_api_url = "http://localhost:4040/api/tunnels"
-        response = requests.get(tunnels_api_url, timeout=5)
-        response.raise_for_status()
-        tunnels_data = response.json()
-
-        if not tunnels_data or "tunnels" not in tunnels_data or not tunnels_data["tunnels"]:
-            print("No tunnels found in ngrok API response.")
-            return None
-
-        public_url = tunnels_data["tunnels"][0]["public_url"] + "/alexa"
-        print(f"\n🚀 Ngrok Public URL: {public_url}")
-        update_env_variable("NGROK_PUBLIC_URL", public_url)
-        return public_url
-    except requests.exceptions.ConnectionError:
-        print("❌ Failed to retrieve ngrok URL: Connection refused. Ngrok API might not be ready or running.")
-        print("   Please ensure ngrok is properly started. You might need to increase the sleep time in app.py.")
-        return None
-    except requests.exceptions.Timeout:
-        print("❌ Failed to retrieve ngrok URL: Request to ngrok API timed out.")
-        print("   Ngrok might be taking longer to start. Try increasing the sleep time in app.py.")
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"❌ An HTTP request error occurred while retrieving ngrok URL: {e}")
-        return None
-    except json.JSONDecodeError:
-        print("❌ Failed to parse JSON response from ngrok API.")
-        return None
-    except IndexError:
-        print("❌ Ngrok API returned no valid tunnel data.")
-        return None
-    except Exception as e:
-        print(f"❌ An unexpected error occurred while retrieving ngrok URL: {e}")
+        return tunnel.start()
+    except TunnelError as e:
+        print(f"❌ Failed to start the ngrok tunnel: {e}")
         return None
 
+def run_server(production=False, port=SERVER_PORT):
+    """Flask's development server, or waitress (multi-threaded WSGI) with --production.
+
+    Jarvis stays a single process on purpose: local actions drive this
+    machine's VLC, speakers and screen, and the Alexa work pool, metrics and
+    LLM answer cache live in process memory. Concurrency comes from threads.
+    """
+    if production:
+        try:
+            from waitress import serve
+        except ImportError:
+            log.warning("waitress is not installed (pip install waitress); using Flask's threaded server")
+        else:
+            log.info("Serving with waitress on port %d, %d threads", port, SERVER_THREADS)
+            serve(app, host="127.0.0.1", port=port, threads=SERVER_THREADS, ident="jarvis")
+            return
+    app.run(port=port, debug=False, threaded=True)
+
 def update_env_variable(key, value):
     env_path = ".env"
     lines = []
@@ -91,81 +96,99 @@ def update_env_variable(key, value):
     except Exception as e:
         print(f"Error updating .env file: {e}")
 
+def record_request(body):
+    try:
+        os.makedirs(RECORD_DIR, exist_ok=True)
+        with open(os.path.join(RECORD_DIR, f"{time.time_ns()}.json"), "wb") as f:
+            f.write(body)
+    except OSError as e:
+        log.warning("Could not record request: %s", e)
+
+LAUNCH_RESPONSE = "Hello, Jarvis is ready. What can I do for you?"
+ERROR_RESPONSE = "Sorry, I encountered an internal error processing your request."
+INCOMPLETE_RESPONSE = "Sorry, I received an incomplete request from Alexa."
+NO_LOCAL_COMMAND_RESPONSE = "Sorry, I didn't get a specific command for local action."
+NO_QUERY_RESPONSE = "Sorry, I didn't get a specific query for the AI."
+UNKNOWN_TYPE_RESPONSE = "Sorry, I didn't understand that type of request."
+
+precompile_responses([LAUNCH_RESPONSE, ERROR_RESPONSE, INCOMPLETE_RESPONSE, NO_LOCAL_COMMAND_RESPONSE,
+                      NO_QUERY_RESPONSE, UNKNOWN_TYPE_RESPONSE, "", *FIXED_RESPONSES])
+
+# Intent names and request types reported in metrics; anything else a caller
+# sends is counted as "other" so it can't add series
+METRIC_LABELS = ("LocalToIntent", "AskIntent", "LaunchRequest", "SessionEndedRequest", "unknown")
+
+def metric_label(label):
+    return label if label in METRIC_LABELS else "other"
+
+def answer(alexa):
+    """Text to speak back for a parsed request."""
+    if alexa.type == "IntentRequest":
+        if alexa.intent == "LocalToIntent":
+            user_query = alexa.slots.get("localquery")
+            if user_query is None:
+                log.warning("'localquery' slot or its value missing for LocalToIntent")
+                return NO_LOCAL_COMMAND_RESPONSE
+            # Acknowledged at once; the command itself runs in the background
+            return acknowledge_local_command(user_query)
+
+        user_query = alexa.slots.get("query")
+        if user_query is None:
+            log.warning("'query' slot or its value missing for %s", alexa.intent)
+            return NO_QUERY_RESPONSE
+        return answer_within_deadline("groq", query_groq_model, user_query, alexa_request=alexa)
+    if alexa.type == "LaunchRequest":
+        return LAUNCH_RESPONSE
+    if alexa.type == "SessionEndedRequest":
+        return ""
+    log.warning("Unhandled Alexa request type: %s", alexa.type)
+    return UNKNOWN_TYPE_RESPONSE
+
 @app.route("/alexa", methods=["POST"]) # Ensure only POST is allowed
 def handle_alexa():
-    # >>> CRITICAL DEBUGGING LINES <<<
-    import time # Import time if not already at top
-    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] RECEIVED POST REQUEST at /alexa")
-    data = request.get_json()
-    print("[DEBUG] Incoming Alexa JSON:\n", json.dumps(data, indent=2))
-    # >>> END CRITICAL DEBUGGING LINES <<<
-
-    response_text = "Sorry, I couldn't process your request." # Default response in case of unhandled error
-
+    started = time.perf_counter()
+    body = request.get_data()
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Incoming Alexa JSON: %s", body.decode(errors="replace"))
+    if RECORD_DIR:
+        record_request(body)
+
+    alexa = None
     try:
-        request_type = data['request']['type']
-        print(f"[DEBUG] Alexa Request Type: {request_type}") # Added debug
-
-        if request_type == "IntentRequest":
-            intent = data['request']['intent']
-            intent_name = intent.get('name')
-            print(f"[DEBUG] Detected Intent Name: {intent_name}") # Added debug
-
-            if intent_name == "LocalToIntent":
-                localquery_slot = intent['slots'].get('localquery')
-                if localquery_slot and 'value' in localquery_slot:
-                    user_query = localquery_slot['value']
-                    print(f"[DEBUG] Extracted user_query from 'localquery' slot: '{user_query}'") # Added debug
-                    response_text = handle_local_command(user_query)
-                    print(f"[DEBUG] Response from handle_local_command: '{response_text}'") # Added debug
-                else:
-                    response_text = "Sorry, I didn't get a specific command for local action."
-                    print(f"[ERROR] 'localquery' slot or its value missing for LocalToIntent.") # Added debug
-            else:
-                query_slot = intent['slots'].get('query')
-                if query_slot and 'value' in query_slot:
-                    user_query = query_slot['value']
-                    print(f"[DEBUG] Extracted user_query from 'query' slot: '{user_query}'") # Added debug
-                    response_text = query_groq_model(user_query)
-                    print(f"[DEBUG] Response from query_groq_model: '{response_text}'") # Added debug
-                else:
-                    response_text = "Sorry, I didn't get a specific query for the AI."
-                    print(f"[ERROR] 'query' slot or its value missing for non-LocalToIntent.") # Added debug
-        elif request_type == "LaunchRequest":
-            print("[DEBUG] Received LaunchRequest.") # Added debug
-            response_text = "Hello, Jarvis is ready. What can I do for you?"
-        elif request_type == "SessionEndedRequest":
-            print("[DEBUG] Received SessionEndedRequest.") # Added debug
-            response_text = ""
-        else:
-            print(f"[WARNING] Unhandled Alexa request type: {request_type}") # Added debug
-            response_text = "Sorry, I didn't understand that type of request."
-
-    except KeyError as e:
-        print(f"[ERROR] Missing key in Alexa JSON structure: {e}")
-        response_text = "Sorry, I received an incomplete request from Alexa."
-    except Exception as e:
-        print(f"[ERROR] An unexpected error occurred in handle_alexa: {e}")
-        import traceback
-        traceback.print_exc() # Print full traceback for deeper error analysis
-        response_text = "Sorry, I encountered an internal error processing your request."
-
-    print(f"[DEBUG] Sending Alexa response: '{response_text}'") # Added debug
-    return jsonify(build_alexa_response(response_text))
+        alexa = AlexaRequest.parse(body)
+        response_text = answer(alexa)
+    except AlexaRequestError as e:
+        log.error("%s", e)
+        response_text = INCOMPLETE_RESPONSE
+    except Exception:
+        log.exception("Unexpected error in handle_alexa")
+        response_text = ERROR_RESPONSE
+
+    elapsed = time.perf_counter() - started
+    label = (alexa.intent or alexa.type) if alexa else "unknown"
+    metrics.observe("jarvis_alexa_request_seconds", elapsed, intent=metric_label(label))
+    if log.isEnabledFor(logging.INFO):
+        log.info("alexa request", extra={"fields": {
+            "intent": label, "query": alexa.slots.get("query") or alexa.slots.get("localquery") if alexa else None,
+            "ms": round(elapsed * 1000, 1), "response": response_text[:80]}})
+    return Response(render_response(response_text), mimetype="application/json")
 
 if __name__ == "__main__":
-    public_url = start_ngrok()
+    with startup_profiler.mark("start_ngrok"):
+        public_url = start_ngrok()
     if public_url:
+        atexit.register(tunnel.stop)
+        print("✅ Jarvis Alexa Integration Ready. Waiting for requests...")
+        startup_profiler.report("Alexa server startup")
+        try:
+            metrics.serve()
+        except OSError as e:
+            log.warning("Could not serve metrics on port %d: %s", metrics.METRICS_PORT, e)
         try:
-            update_alexa_endpoint(public_url)
-            print("✅ Jarvis Alexa Integration Ready. Waiting for requests...")
-            app.run(port=5000, debug=False)
+            run_server(production="--production" in sys.argv)
         except Exception as e:
-            print(f"\n[CRITICAL ERROR] Alexa endpoint update or Flask app failed to start: {e}")
+            print(f"\n[CRITICAL ERROR] Flask app failed to start: {e}")
             import traceback
             traceback.print_exc()
-            print("Please check previous error messages and ensure update_alexa_endpoint.py runs correctly.")
     else:
         print("[CRITICAL ERROR] Failed to get ngrok public URL. Cannot start Flask app.")
-        if ngrok_process and ngrok_process.poll() is None:
-             print("   Ngrok process might still be running. You may need to terminate it manually (Ctrl+C).")
@@ -0,0 +1,143 @@
+import threading
+
+# The microphone is opened once and read by a single capture thread. Every
+# chunk it reads is copied into a ring of fixed-size slots in one preallocated
+# bytearray, so the capture loop allocates nothing of its own. Readers
+# (wake-word detection, command capture) each hold a Cursor: an absolute chunk
+# number they read from at their own pace while capture carries on. Since
+# chunks stay in the ring for RING_SECONDS, a reader can also seek back, e.g.
+# to where the wake word ended, so the start of a command said straight after
+# it isn't lost.
+#
+# A reader that falls more than RING_SECONDS behind has missed audio; its
+# cursor jumps to the oldest chunk still held and `overruns` is counted.
+
+RING_SECONDS = 10
+READ_TIMEOUT_SECONDS = 2.0
+
+class CaptureError(Exception):
+    pass
+
+class RingBuffer:
+    def __init__(self, chunk_bytes, slots):
+        self.chunk_bytes = chunk_bytes
+        self.slots = slots
+        self.data = bytearray(chunk_bytes * slots)
+        self._view = memoryview(self.data)
+        self.written = 0          # chunks written since the start; chunk n lives in slot n % slots
+        self.overruns = 0
+        self._cond = threading.Condition()
+
+    def write(self, chunk):
+        """Copy one chunk into the next slot (short chunks are zero-padded)."""
+        start = (self.written % self.slots) * self.chunk_bytes
+        n = min(len(chunk), self.chunk_bytes)
+        self._view[start:start + n] = chunk[:n]
+        if n < self.chunk_bytes:
+            self._view[start + n:start + self.chunk_bytes] = bytes(self.chunk_bytes - n)
+        with self._cond:
+            self.written += 1
+            self._cond.notify_all()
+
+    def oldest(self):
+        """Oldest chunk that is safe to read. The one before it shares a slot with the chunk being written."""
+        return max(0, self.written - self.slots + 1)
+
+    def read_into(self, index, out, timeout=READ_TIMEOUT_SECONDS):
+        """Copy chunk `index` into `out` (a bytearray of chunk_bytes).
+
+        Waits for it if it hasn't been captured yet. Returns the index actually
+        read: a later one if `index` had already been overwritten.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.written > index, timeout):
+                raise CaptureError(f"No audio from the microphone for {timeout}s")
+        while True:
+            if index < self.oldest():
+                self.overruns += 1
+                index = self.oldest()
+            start = (index % self.slots) * self.chunk_bytes
+            out[:] = self._view[start:start + self.chunk_bytes]
+            # The writer may have lapped us while copying; if so, the copy is torn
+            if index >= self.oldest():
+                return index
+
+class Cursor:
+    """A reader's position in the ring. read() returns a view of the cursor's own buffer, valid until the next read()."""
+
+    def __init__(self, ring, position):
+        self.ring = ring
+        self.position = position
+        self._out = bytearray(ring.chunk_bytes)
+        self._view = memoryview(self._out)
+
+    def read(self, size=None):
+        index = self.ring.read_into(self.position, self._out)
+        self.position = index + 1
+        return self._view
+
+    def seek(self, position):
+        self.position = max(position, self.ring.oldest())
+
+    def behind(self):
+        """Chunks captured but not read yet."""
+        return self.ring.written - self.position
+
+def open_microphone():
+    import speech_recognition as sr
+    return sr.Microphone()
+
+class MicrophoneCapture:
+    def __init__(self, open_source=open_microphone, seconds=RING_SECONDS):
+        self.open_source = open_source
+        self.seconds = seconds
+        self.ring = None
+        self.sample_rate = None
+        self.sample_width = None
+        self.chunk = None
+        self.error = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Open the microphone on the capture thread. Returns once audio is flowing; raises CaptureError otherwise."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="mic-capture", daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        if self.error is not None:
+            raise CaptureError(f"Could not open the microphone: {self.error}")
+        return self
+
+    def _run(self):
+        try:
+            with self.open_source() as source:
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                self.chunk = source.CHUNK
+                slots = max(2, int(self.seconds * self.sample_rate / self.chunk))
+                self.ring = RingBuffer(self.chunk * self.sample_width, slots)
+                self._ready.set()
+                read, write, chunk = source.stream.read, self.ring.write, self.chunk
+                while not self._stop.is_set():
+                    write(read(chunk))
+        except Exception as e:
+            # Readers see CaptureError once the ring stops filling; the owner starts a new capture
+            self.error = e
+            print(f"[CAPTURE ERROR] Microphone capture stopped: {e}")
+        finally:
+            self._ready.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def cursor(self, position=None):
+        """A new reader, at the live edge unless a position is given."""
+        return Cursor(self.ring, self.ring.written if position is None else position)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=READ_TIMEOUT_SECONDS)
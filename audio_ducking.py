@@ -0,0 +1,212 @@
+import json
+import time
+import atexit
+import threading
+import subprocess
+
+# Audio ducking for the wake word. Finding VLC's sink inputs used to fork
+# `pactl list sink-inputs` through a shell twice per wake word; now the list is
+# cached and only refreshed when `pactl subscribe` reports a sink input coming
+# or going (or, if subscribe isn't available, after CACHE_TTL seconds). When a
+# sink input changes (its volume set by "volume up" or pavucontrol, say) the
+# list is re-read in the background once the events settle, so duck() saves
+# the level the user actually set. Every VLC sink input is set in parallel,
+# and the volume is ramped in a background thread so nothing on the wake-word
+# path waits for it.
+
+DUCK_VOLUME = 30
+RESTORE_VOLUME = 80      # used when VLC's volume before ducking isn't known
+CACHE_TTL = 30.0
+REFRESH_DELAY = 0.3      # let a burst of change events (a volume ramp) settle before re-reading
+RAMP_SECONDS = 0.2
+RAMP_STEPS = 4
+MATCH = "vlc"
+
+_cache = {"sinks": None, "fetched_at": 0.0}
+_cache_lock = threading.Lock()
+_subscriber = None
+_subscribe_failed = False
+_refresh_timer = None
+_ramp_lock = threading.Lock()
+_ramp_generation = 0
+_saved_volumes = {}
+
+last_timings = {}
+
+def _run_pactl(*args):
+    return subprocess.run(["pactl", *args], capture_output=True, text=True, check=True).stdout
+
+def _parse_json(output):
+    sinks = []
+    for item in json.loads(output):
+        props = item.get("properties", {})
+        name = " ".join(str(props.get(k, "")) for k in ("application.name", "application.process.binary", "media.name"))
+        percents = [int(str(ch.get("value_percent", "0")).rstrip("%") or 0)
+                    for ch in item.get("volume", {}).values() if isinstance(ch, dict)]
+        sinks.append({"id": str(item["index"]), "name": name.lower(), "volume": max(percents, default=None)})
+    return sinks
+
+def _parse_text(output):
+    sinks = []
+    for block in output.split("Sink Input #")[1:]:
+        lines = block.splitlines()
+        volume = None
+        for line in lines:
+            line = line.strip()
+            if line.startswith("Volume:") and "%" in line:
+                try:
+                    volume = int(line.split("/")[1].strip().rstrip("%"))
+                except (IndexError, ValueError):
+                    pass
+                break
+        sinks.append({"id": lines[0].strip(), "name": block.lower(), "volume": volume})
+    return sinks
+
+def _list_sink_inputs():
+    try:
+        return _parse_json(_run_pactl("-f", "json", "list", "sink-inputs"))
+    except (subprocess.CalledProcessError, ValueError):
+        # pactl older than 16 has no JSON output
+        return _parse_text(_run_pactl("list", "sink-inputs"))
+
+def _refresh():
+    global _refresh_timer
+    with _cache_lock:
+        _refresh_timer = None
+    invalidate()
+    get_vlc_sinks()
+
+def _refresh_later():
+    """Re-read the sink inputs off the wake-word path, REFRESH_DELAY after the last change event."""
+    global _refresh_timer
+    with _cache_lock:
+        if _refresh_timer is not None:
+            _refresh_timer.cancel()
+        _refresh_timer = threading.Timer(REFRESH_DELAY, _refresh)
+        _refresh_timer.daemon = True
+        _refresh_timer.start()
+
+def _watch_events(process):
+    global _subscriber
+    for line in process.stdout:
+        if "sink-input" not in line:
+            continue
+        if "'new'" in line or "'remove'" in line:
+            invalidate()
+        elif "'change'" in line:
+            _refresh_later()
+    with _cache_lock:
+        _subscriber = None
+    print("[DUCKING DEBUG] pactl subscribe exited; falling back to cache TTL")
+
+def _ensure_subscriber():
+    global _subscriber, _subscribe_failed
+    if _subscriber is not None or _subscribe_failed:
+        return
+    try:
+        _subscriber = subprocess.Popen(["pactl", "subscribe"], stdout=subprocess.PIPE,
+                                       stderr=subprocess.DEVNULL, text=True)
+    except OSError as e:
+        _subscribe_failed = True
+        print(f"[DUCKING DEBUG] pactl subscribe unavailable, using a {CACHE_TTL:.0f}s cache TTL: {e}")
+        return
+    threading.Thread(target=_watch_events, args=(_subscriber,), daemon=True).start()
+    atexit.register(_stop_subscriber, _subscriber)
+
+def _stop_subscriber(process):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def invalidate():
+    with _cache_lock:
+        _cache["sinks"] = None
+
+def get_vlc_sinks():
+    """Cached [{"id", "name", "volume"}] for every sink input that belongs to VLC."""
+    with _cache_lock:
+        _ensure_subscriber()
+        fresh = _subscriber is not None or time.monotonic() - _cache["fetched_at"] < CACHE_TTL
+        if _cache["sinks"] is not None and fresh:
+            return _cache["sinks"]
+    try:
+        sinks = [s for s in _list_sink_inputs() if MATCH in s["name"]]
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[DEBUG] Error finding VLC sink ID: {e}")
+        return []
+    with _cache_lock:
+        _cache["sinks"] = sinks
+        _cache["fetched_at"] = time.monotonic()
+    return sinks
+
+def _set_volumes(volumes):
+    """Set several sink inputs at once: all pactl processes are started before any is waited on."""
+    procs = [subprocess.Popen(["pactl", "set-sink-input-volume", sink_id, f"{volume}%"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+             for sink_id, volume in volumes.items()]
+    failed = [p for p in procs if p.wait() != 0]
+    if failed:
+        invalidate()  # a sink input probably went away under us
+
+def _ramp(generation, start, target):
+    r0 = time.perf_counter()
+    for step in range(1, RAMP_STEPS + 1):
+        if generation != _ramp_generation:
+            return  # a newer duck/restore took over
+        _set_volumes({sid: round(start[sid] + (target[sid] - start[sid]) * step / RAMP_STEPS) for sid in target})
+        if step == 1:
+            last_timings["first_step_ms"] = (time.perf_counter() - r0) * 1000
+        if step < RAMP_STEPS:
+            time.sleep(RAMP_SECONDS / RAMP_STEPS)
+    last_timings["ramp_ms"] = (time.perf_counter() - r0) * 1000
+    print(f"[DUCKING DEBUG] {last_timings.get('action')} ramp: first step {last_timings['first_step_ms']:.1f} ms, "
+          f"done in {last_timings['ramp_ms']:.1f} ms")
+
+def _start_ramp(targets_for, label):
+    """Look up the sinks (cached) and hand the volume ramp to a background thread.
+
+    Timings of each step end up in last_timings: lookup_ms here, first_step_ms
+    and ramp_ms from the ramp thread.
+    """
+    global _ramp_generation
+    t0 = time.perf_counter()
+    sinks = get_vlc_sinks()
+    lookup_ms = (time.perf_counter() - t0) * 1000
+
+    last_timings.clear()
+    last_timings.update({"action": label, "lookup_ms": lookup_ms, "sinks": len(sinks)})
+    print(f"[DUCKING DEBUG] {label}: {len(sinks)} VLC sink input(s), lookup {lookup_ms:.1f} ms")
+    if not sinks:
+        return
+
+    with _ramp_lock:
+        _ramp_generation += 1
+        start, target = targets_for(sinks)
+        generation = _ramp_generation
+    if start == target:
+        return
+    threading.Thread(target=_ramp, args=(generation, start, target), daemon=True).start()
+
+def duck(volume=DUCK_VOLUME):
+    """Lower every VLC sink input to `volume` percent. Returns immediately; the ramp runs in the background."""
+    def targets(sinks):
+        start = {}
+        for s in sinks:
+            if s["id"] in _saved_volumes:
+                start[s["id"]] = volume  # already ducked; keep the level saved the first time
+            else:
+                current = s["volume"] if s["volume"] is not None else RESTORE_VOLUME
+                start[s["id"]] = _saved_volumes[s["id"]] = current
+        return start, {s["id"]: volume for s in sinks}
+    _start_ramp(targets, "duck")
+
+def restore():
+    """Bring every VLC sink input back to where it was before duck()."""
+    def targets(sinks):
+        target = {s["id"]: _saved_volumes.pop(s["id"], RESTORE_VOLUME) for s in sinks}
+        _saved_volumes.clear()
+        return {s["id"]: DUCK_VOLUME for s in sinks}, target
+    _start_ramp(targets, "restore")
@@ -0,0 +1,101 @@
+"""Per-request CPU cost of handling an Alexa request: the old get_json + dict
+walks + jsonify(build_alexa_response(...)) vs. AlexaRequest.parse + pre-built
+response bytes.
+
+Run from the repo root:  python -m benchmarks.bench_alexa_parsing [requests]
+
+Both handlers run inside a minimal Flask app through its test client, so the
+numbers include Flask's own request handling; the answer itself is a constant
+so only parsing and serialization differ. A second table times just the
+parse + serialize step on its own.
+"""
+import sys
+import json
+import time
+
+from flask import Flask, request, jsonify, Response
+
+import alexa_request
+from alexa_request import AlexaRequest, render_response, precompile_responses
+
+# A realistic envelope: Alexa sends session, context and device data we never read
+BODY = {
+    "version": "1.0",
+    "session": {"new": False, "sessionId": "amzn1.echo-api.session.0000", "application": {"applicationId": "amzn1.ask.skill.0000"},
+                "user": {"userId": "amzn1.ask.account." + "X" * 200}},
+    "context": {"System": {"application": {"applicationId": "amzn1.ask.skill.0000"},
+                           "user": {"userId": "amzn1.ask.account." + "X" * 200},
+                           "device": {"deviceId": "amzn1.ask.device." + "Y" * 200, "supportedInterfaces": {}},
+                           "apiEndpoint": "https://api.eu.amazonalexa.com", "apiAccessToken": "Z" * 900},
+                "Viewport": {"experiences": [{"arcMinuteWidth": 246, "arcMinuteHeight": 144, "canRotate": False}],
+                             "shape": "RECTANGLE", "pixelWidth": 1024, "pixelHeight": 600, "dpi": 160}},
+    "request": {"type": "IntentRequest", "requestId": "amzn1.echo-api.request.0000", "locale": "en-IN",
+                "timestamp": "2026-10-18T09:00:00Z",
+                "intent": {"name": "LocalToIntent", "confirmationStatus": "NONE",
+                           "slots": {"localquery": {"name": "localquery", "value": "play music", "confirmationStatus": "NONE"}}}},
+}
+RAW = json.dumps(BODY).encode()
+REPLY = "Media task executed."
+
+def build_alexa_response(message):
+    return {"version": "1.0", "response": {"outputSpeech": {"type": "PlainText", "text": message}, "shouldEndSession": True}}
+
+def make_apps():
+    old = Flask("old")
+    new = Flask("new")
+
+    @old.route("/alexa", methods=["POST"])
+    def old_handler():
+        data = request.get_json()
+        intent = data['request']['intent']
+        if data['request']['type'] == "IntentRequest" and intent.get('name') == "LocalToIntent":
+            slot = intent['slots'].get('localquery')
+            text = REPLY if slot and 'value' in slot else "?"
+        return jsonify(build_alexa_response(text))
+
+    @new.route("/alexa", methods=["POST"])
+    def new_handler():
+        alexa = AlexaRequest.parse(request.get_data())
+        text = REPLY if alexa.type == "IntentRequest" and "localquery" in alexa.slots else "?"
+        return Response(render_response(text), mimetype="application/json")
+
+    return old.test_client(), new.test_client()
+
+def cpu_per_call(fn, count):
+    start = time.process_time()
+    for _ in range(count):
+        fn()
+    return (time.process_time() - start) / count * 1e6
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    precompile_responses([REPLY])
+    print(f"{len(RAW)}-byte request, {count} requests, serializer: {'orjson' if alexa_request.orjson else 'json'}")
+
+    old_client, new_client = make_apps()
+    assert json.loads(old_client.post("/alexa", data=RAW, content_type="application/json").data) == \
+        json.loads(new_client.post("/alexa", data=RAW, content_type="application/json").data)
+    post = {"data": RAW, "content_type": "application/json"}
+    old_us = cpu_per_call(lambda: old_client.post("/alexa", **post), count // 4)
+    new_us = cpu_per_call(lambda: new_client.post("/alexa", **post), count // 4)
+    print(f"  through Flask:       old {old_us:7.1f} us/request   new {new_us:7.1f} us/request")
+
+    def old_core():
+        data = json.loads(RAW)
+        data['request']['intent']['slots'].get('localquery')
+        return json.dumps(build_alexa_response(REPLY)).encode()
+
+    def new_core():
+        AlexaRequest.parse(RAW).slots.get("localquery")
+        return render_response(REPLY)
+
+    def new_core_dynamic():
+        AlexaRequest.parse(RAW).slots.get("localquery")
+        return render_response("Some answer from the LLM that is not a fixed reply.")
+
+    print(f"  parse + serialize:   old {cpu_per_call(old_core, count):7.1f} us   "
+          f"new {cpu_per_call(new_core, count):7.1f} us (fixed reply)   "
+          f"{cpu_per_call(new_core_dynamic, count):7.1f} us (dynamic reply)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Groq calls against the local stub: the old one-off requests.post per question
+vs. tasks.llm_client (pooled session, retries, answer cache).
+
+Run from the repo root:  python -m benchmarks.bench_llm_client [questions]
+
+The stub is plain HTTP on localhost, so the saving shown is only the TCP
+connect per question; against api.groq.com each new connection also costs a
+TLS handshake, which the pooled session avoids too.
+"""
+import sys
+import json
+import time
+
+import requests
+
+from benchmarks.stub_groq import StubGroqServer
+from tasks.llm_client import LLMClient, LLMError
+
+def old_query(url, prompt):
+    headers = {"Authorization": "Bearer stub", "Content-Type": "application/json"}
+    data = {"model": "llama-3.3-70b-versatile", "messages": [{"role": "user", "content": prompt}]}
+    response = requests.post(url, headers=headers, data=json.dumps(data))
+    return response.json()["choices"][0]["message"]["content"]
+
+def timed(label, server, fn, prompts):
+    connections = server.connections
+    start = time.perf_counter()
+    for prompt in prompts:
+        fn(prompt)
+    per_call = (time.perf_counter() - start) / len(prompts) * 1000
+    print(f"  {label:<34} {per_call:7.2f} ms/question, {server.connections - connections:4d} connection(s)")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    server = StubGroqServer().start()
+    prompts = [f"what is fact number {n}?" for n in range(count)]
+    print(f"{count} distinct questions against {server.url}")
+
+    timed("old requests.post", server, lambda p: old_query(server.url, p), prompts)
+    client = LLMClient(url=server.url, api_key="stub")
+    timed("LLMClient, cold cache", server, client.complete, prompts)
+    timed("LLMClient, same questions again", server, client.complete, [p.upper() + "  " for p in prompts])
+
+    server.fail_first = server.requests + 2
+    flaky = LLMClient(url=server.url, api_key="stub", retries=2)
+    start = time.perf_counter()
+    flaky.complete("does retrying work?")
+    print(f"  two 503s then success:              {(time.perf_counter() - start) * 1000:7.2f} ms, "
+          f"{flaky.totals['retries']} retries")
+
+    server.fail_first = server.requests + 10
+    try:
+        flaky.complete("and when it keeps failing?")
+    except LLMError as e:
+        print(f"  persistent 503s:                    gave up after {flaky.retries + 1} attempts ({e})")
+
+    slow = StubGroqServer(latency=2.0).start()
+    impatient = LLMClient(url=slow.url, api_key="stub", timeout=(1, 0.3), retries=0)
+    start = time.perf_counter()
+    try:
+        impatient.complete("will this hang?")
+    except LLMError:
+        print(f"  2 s answer with 0.3 s read timeout: gave up in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"  client stats: {client.stats()}")
+
+if __name__ == "__main__":
+    main()
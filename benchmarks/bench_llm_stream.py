@@ -0,0 +1,41 @@
+"""Time to first audio for an LLM answer: waiting for the whole completion
+(query_groq_model) vs. streaming it and speaking sentence by sentence.
+
+Run from the repo root:  python -m benchmarks.bench_llm_stream [ms_per_token]
+
+The stub generates one word every ms_per_token (default 30 ms, a slowish
+70B model) after a 150 ms time-to-first-token. "Audio" here is the moment a
+sentence would be handed to speak(), so TTS start-up time is not included.
+"""
+import sys
+import time
+
+from benchmarks.stub_groq import StubGroqServer
+from tasks.llm_client import LLMClient, sentences
+
+ANSWER = ("The Eiffel Tower is in Paris, France. It was finished in 1889 for the World's Fair "
+          "and was the tallest structure in the world for about forty years. It is about 330 metres "
+          "tall including its antennas. Around seven million people visit it every year, which makes "
+          "it one of the most visited paid monuments anywhere. Gustave Eiffel's company designed and built it.")
+
+def main():
+    token_delay = (float(sys.argv[1]) if len(sys.argv) > 1 else 30) / 1000
+    server = StubGroqServer(latency=0.15, token_delay=token_delay, answer=lambda prompt: ANSWER).start()
+    print(f"{len(ANSWER.split())}-word answer, {token_delay * 1000:.0f} ms per token")
+
+    client = LLMClient(url=server.url, api_key="stub", cache_size=0)
+    start = time.perf_counter()
+    client.complete("where is the eiffel tower")
+    whole_ms = (time.perf_counter() - start) * 1000
+    print(f"  complete():   first audio at {whole_ms:7.0f} ms (whole answer)")
+
+    start = time.perf_counter()
+    spoken_at = []
+    for sentence in sentences(client.stream("where is the eiffel tower")):
+        spoken_at.append((time.perf_counter() - start) * 1000)
+    print(f"  stream():     first audio at {spoken_at[0]:7.0f} ms, "
+          f"{len(spoken_at)} sentences, last at {spoken_at[-1]:.0f} ms")
+    print(f"  time to first audio is {whole_ms / spoken_at[0]:.1f}x shorter")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Cost of finding the tracks to play: full listdir + sort (the old get_media_files)
+vs. the incremental media library, on a folder of empty dummy files.
+
+Run from the repo root:  python -m benchmarks.bench_media_library [tracks]
+"""
+import os
+import sys
+import time
+import tempfile
+
+from tasks import media_library
+from tasks.store import JsonStore
+
+def old_get_media_files(folder):
+    return sorted([
+        os.path.join(folder, f)
+        for f in os.listdir(folder)
+        if f.lower().endswith(('.mp3', '.wav', '.m4a', '.mp4', '.mkv', '.avi'))
+    ])
+
+def timed_ms(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    with tempfile.TemporaryDirectory() as root:
+        folder = os.path.join(root, "music")
+        os.makedirs(folder)
+        for n in range(count):
+            open(os.path.join(folder, f"track-{n:06d}.mp3"), "w").close()
+
+        # Keep the benchmark's catalogue out of the real media_library.json
+        media_library.library_store = JsonStore(os.path.join(root, "library.json"))
+
+        print(f"{count} tracks")
+        print(f"  old listdir + sort:        {timed_ms(old_get_media_files, folder):8.2f} ms (every play)")
+        print(f"  library, first scan:       {timed_ms(media_library.get_tracks, 'music', folder):8.2f} ms")
+        print(f"  library, folder unchanged: {timed_ms(media_library.get_tracks, 'music', folder):8.2f} ms")
+        time.sleep(0.01)
+        open(os.path.join(folder, "new-track.mp3"), "w").close()
+        print(f"  library, one file added:   {timed_ms(media_library.get_tracks, 'music', folder):8.2f} ms")
+        tracks = media_library.get_tracks("music", folder)
+        media_library.PLAYLIST_DIR = root
+        print(f"  write M3U playlist:        {timed_ms(media_library.write_playlist, 'bench', [p for _, p in tracks]):8.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""How long the UI thread is blocked per slide: the old Image.open + full-size
+LANCZOS resize on the Tk thread vs. tasks.image_pipeline.
+
+Run from the repo root:  python -m benchmarks.bench_picture_pipeline [pictures] [width]x[height]
+
+Synthetic camera-sized JPEGs (4000x3000) are written to a temporary folder,
+and the disk cache is pointed at another one. Reported:
+  - old: UI-thread time per slide (decode + resize to the screen)
+  - pipeline, cold: worker time per picture with draft decoding, no cache
+  - pipeline, disk cache: worker time per picture on the second slideshow
+  - pipeline, UI thread: what the UI thread pays per slide when the frame
+    was prefetched during the previous slide's SLIDE_MS
+The PhotoImage conversion is the same either way and needs a display, so it is
+not included.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+from PIL import Image, ImageDraw
+
+from tasks import image_pipeline
+from tasks.image_pipeline import FramePipeline, PREFETCH_AHEAD
+from tasks.store import JsonStore
+from tasks.disk_cache import DiskLRU
+
+PHOTO_SIZE = (4000, 3000)
+
+def make_pictures(folder, count):
+    rng = random.Random(3)
+    paths = []
+    for n in range(count):
+        img = Image.new("RGB", PHOTO_SIZE, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        draw = ImageDraw.Draw(img)
+        for _ in range(200):
+            x, y = rng.randrange(PHOTO_SIZE[0]), rng.randrange(PHOTO_SIZE[1])
+            draw.ellipse((x, y, x + rng.randrange(50, 600), y + rng.randrange(50, 600)),
+                         fill=(rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        path = os.path.join(folder, f"photo-{n}.jpg")
+        img.save(path, "JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+def old_slide(path, size):
+    img = Image.open(path)
+    return img.resize(size, Image.Resampling.LANCZOS)
+
+def per_call_ms(fn, paths, *args):
+    times = []
+    for path in paths:
+        started = time.perf_counter()
+        fn(path, *args)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+def show(label, times):
+    print(f"  {label:28s} median {statistics.median(times):7.1f} ms   max {max(times):7.1f} ms")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 12
+    size = tuple(int(n) for n in sys.argv[2].split("x")) if len(sys.argv) > 2 else (1920, 1080)
+    with tempfile.TemporaryDirectory() as pictures, tempfile.TemporaryDirectory() as cache:
+        image_pipeline.disk_cache = DiskLRU(cache, JsonStore(os.path.join(cache, "index.json")),
+                                            image_pipeline.MAX_CACHE_BYTES, ".jpg")
+        paths = make_pictures(pictures, count)
+        print(f"{count} pictures of {PHOTO_SIZE[0]}x{PHOTO_SIZE[1]}, screen {size[0]}x{size[1]}")
+
+        show("old (on the UI thread)", per_call_ms(old_slide, paths, size))
+        show("pipeline, cold", per_call_ms(image_pipeline.prepare, paths, size))
+        show("pipeline, disk cache", per_call_ms(image_pipeline.prepare, paths, size))
+
+        # A slideshow pass: prefetch ahead, then the UI thread only takes frames
+        pipeline = FramePipeline(size)
+        pipeline.prefetch(paths[:PREFETCH_AHEAD + 1])
+        ui_times = []
+        for index, path in enumerate(paths):
+            while pipeline.get(path) is None:   # stands in for the SLIDE_MS gap between slides
+                time.sleep(0.005)
+            started = time.perf_counter()
+            pipeline.get(path)
+            pipeline.prefetch([paths[(index + n) % len(paths)] for n in range(1, PREFETCH_AHEAD + 1)])
+            ui_times.append((time.perf_counter() - started) * 1000)
+        pipeline.shutdown()
+        show("pipeline, UI thread", ui_times)
+        image_pipeline.disk_cache.index_store.flush()
+
+if __name__ == "__main__":
+    main()
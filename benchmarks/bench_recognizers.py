@@ -0,0 +1,120 @@
+"""Word error rate and end-of-speech-to-text latency of the speech backends in
+recognizers.py, replaying recorded commands.
+
+Run from the repo root:
+    python -m benchmarks.bench_recognizers --dir data/stt_corpus [--backends google,vosk] [--fast]
+
+The corpus folder holds 16-bit mono WAV files, each with a .txt file of the
+same name holding what was said (e.g. `add-task.wav` + `add-task.txt`).
+Record them on the Jarvis machine with `arecord -f S16_LE -r 16000 -c 1 x.wav`.
+
+Each file is fed to a backend in microphone-sized chunks, paced in real time
+unless --fast is given, the way speech_module._capture feeds it. Reported per
+backend:
+  - WER: word-level edit distance against the reference, over the whole corpus
+  - latency: from the last chunk being fed (the end of speech) to the final
+    text, which is the wait the user actually notices
+  - first partial: when the first partial hypothesis arrived, relative to the
+    start of the audio (streaming backends only)
+"""
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import statistics
+
+import recognizers
+from recognizers import NoSpeechError, BackendUnavailable
+from wake_word import read_wav
+
+CHUNK = 1024  # samples, as sr.Microphone reads them
+
+def words(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+def edit_distance(ref, hyp):
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        previous, row[0] = row[0], i
+        for j, h in enumerate(hyp, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (r != h))
+    return row[-1]
+
+def load_corpus(folder):
+    corpus = []
+    for wav in sorted(glob.glob(os.path.join(folder, "*.wav"))):
+        txt = os.path.splitext(wav)[0] + ".txt"
+        if not os.path.exists(txt):
+            print(f"  skipping {wav}: no {os.path.basename(txt)}")
+            continue
+        rate, samples = read_wav(wav)
+        with open(txt) as f:
+            corpus.append((os.path.basename(wav), rate, samples.tobytes(), f.read().strip()))
+    return corpus
+
+def replay(backend, rate, pcm, realtime):
+    """(text, end-of-speech-to-text seconds, first partial seconds or None)"""
+    step = CHUNK * 2
+    stream = backend.start(rate)
+    started = time.perf_counter()
+    first_partial = None
+    for n, offset in enumerate(range(0, len(pcm), step)):
+        if realtime:
+            delay = started + n * CHUNK / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        if stream.feed(pcm[offset:offset + step]) and first_partial is None:
+            first_partial = time.perf_counter() - started
+    end_of_speech = time.perf_counter()
+    try:
+        text = stream.finish()
+    except NoSpeechError:
+        text = ""
+    return text, time.perf_counter() - end_of_speech, first_partial
+
+def run(name, corpus, realtime, verbose):
+    try:
+        backend = recognizers.BACKENDS[name]()
+    except BackendUnavailable as e:
+        print(f"{name:8s} unavailable: {e}")
+        return
+    errors = total = 0
+    latencies, partials = [], []
+    for label, rate, pcm, reference in corpus:
+        try:
+            text, latency, first_partial = replay(backend, rate, pcm, realtime)
+        except BackendUnavailable as e:
+            print(f"{name:8s} failed on {label}: {e}")
+            return
+        ref, hyp = words(reference), words(text)
+        errors += edit_distance(ref, hyp)
+        total += len(ref)
+        latencies.append(latency * 1000)
+        if first_partial is not None:
+            partials.append(first_partial * 1000)
+        if verbose:
+            print(f"    {label}: {text!r} ({latency * 1000:.0f} ms)")
+    first = f"{statistics.median(partials):7.0f} ms" if partials else "      -   "
+    print(f"{name:8s} WER {errors / max(total, 1):6.1%}   latency median {statistics.median(latencies):7.1f} ms   "
+          f"max {max(latencies):7.1f} ms   first partial {first}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=os.path.join("data", "stt_corpus"))
+    parser.add_argument("--backends", default=",".join(recognizers.BACKENDS))
+    parser.add_argument("--fast", action="store_true", help="feed audio as fast as possible instead of in real time")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.dir)
+    if not corpus:
+        sys.exit(f"No .wav/.txt pairs in {args.dir}")
+    seconds = sum(len(pcm) / 2 / rate for _, rate, pcm, _ in corpus)
+    print(f"{len(corpus)} utterances, {seconds:.0f} s of audio, {'fast' if args.fast else 'real-time'} replay")
+    for name in args.backends.split(","):
+        run(name.strip(), corpus, not args.fast, args.verbose)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Compare intent dispatch latency: compiled router vs. the old handler cascade.
+
+Run from the repo root:  python -m benchmarks.bench_router [utterances]
+
+Only the matching step is timed. Neither side runs a handler, so nothing is
+spoken or played while the benchmark runs.
+
+Part of the corpus is written the way Vosk transcribes it ("remove task
+twelve", "at five thirty p m") and passed through recognizers.normalize_vosk
+first, as the Vosk backend does. Those must route like the Google forms, and
+their numbers and times must come out in the form the handlers parse.
+"""
+import datetime
+import random
+import sys
+import time
+
+from tasks.router import match_intents, compile_intents
+from tasks.intents import MEDIA_CATEGORY_NAMES as MEDIA_CATEGORIES
+from recognizers import normalize_vosk
+
+FILLER = ["please", "now", "jarvis", "the", "some", "for me", "quickly", "again", "okay"]
+
+TEMPLATES = [
+    "open youtube and play {word}",
+    "play {category}",
+    "play random {category}",
+    "pause {category}",
+    "skip {category}",
+    "stop {category}",
+    "volume up",
+    "volume down",
+    "unmute",
+    "close play",
+    "add task buy {word}",
+    "remove task {n}",
+    "show task",
+    "remind me to call {word} at 5:30 pm",
+    "show reminders",
+    "remove reminder {n}",
+    "show pictures",
+    "pause picture",
+    "what is the weather like in {word}",
+    "tell me a joke about {word}",
+]
+
+# Vosk output: no digits, no punctuation, "okay" for "ok"
+VOSK_TEMPLATES = [
+    ("remind me to call {word} at {hour} {minutes} p m", "reminder"),
+    ("remind me to call {word} at {hour} a m", "reminder"),
+    ("remove task {n}", "todo"),
+    ("remove reminder {n}", "reminder"),
+    ("okay play {category}", "media"),
+]
+
+ONES = "zero one two three four five six seven eight nine ten eleven twelve thirteen fourteen fifteen " \
+       "sixteen seventeen eighteen nineteen".split()
+TENS = {2: "twenty", 3: "thirty", 4: "forty", 5: "fifty"}
+
+def spell(n):
+    if n < 20:
+        return ONES[n]
+    return TENS[n // 10] + (f" {ONES[n % 10]}" if n % 10 else "")
+
+def legacy_cascade(command):
+    """The checks the six handle_* functions used to run, in order, minus the side effects."""
+    c = command.lower()
+    if "open youtube and play" in c:
+        return "youtube"
+    c = command.lower().strip()
+    for category in MEDIA_CATEGORIES:
+        if f"play random {category}" in c or f"play {category}" in c:
+            return "media"
+    for category in MEDIA_CATEGORIES:
+        if any(kw in c for kw in [f"pause {category}", f"resume {category}", f"continue {category}"]):
+            return "media"
+        elif f"stop {category}" in c:
+            return "media"
+        elif any(kw in c for kw in [f"skip {category}", f"next {category}"]):
+            return "media"
+    if "volume up" in c or "volume down" in c or "mute" in c or "unmute" in c:
+        return "media"
+    if "close play" in command.lower():
+        return "system"
+    c = command.strip()
+    if (c.startswith("add task") and c.replace("add task", "", 1).strip()) or \
+            (c.startswith("remove task") and c.replace("remove task", "", 1).strip()) or c == "show task":
+        return "todo"
+    c = command.lower().strip()
+    if c.startswith("remind me to") or c == "show reminders" or c.startswith("remove reminder"):
+        return "reminder"
+    c = command.lower().strip()
+    if c in ["play pictures", "show pictures", "start slideshow", "pause picture",
+             "continue picture", "stop picture", "close pictures"]:
+        return "pictures"
+    return None
+
+def router_match(command):
+    matches = match_intents(command.lower().strip())
+    return matches[0]["name"] if matches else None
+
+def build_corpus(size, seed=7):
+    rng = random.Random(seed)
+    categories = list(MEDIA_CATEGORIES)
+    corpus = []
+    for _ in range(size):
+        text = rng.choice(TEMPLATES).format(
+            word=rng.choice(FILLER), category=rng.choice(categories), n=rng.randint(1, 50))
+        if rng.random() < 0.3:
+            text = f"{text} {rng.choice(FILLER)}"
+        corpus.append(text)
+    return corpus
+
+def build_vosk_corpus(size, seed=11):
+    """[(raw Vosk transcript, normalized text, expected intent)]"""
+    rng = random.Random(seed)
+    categories = list(MEDIA_CATEGORIES)
+    corpus = []
+    for _ in range(size):
+        template, intent = rng.choice(VOSK_TEMPLATES)
+        raw = template.format(word=rng.choice(FILLER), category=rng.choice(categories),
+                              n=spell(rng.randint(1, 50)), hour=spell(rng.randint(1, 12)),
+                              minutes=rng.choice(["oh five", "fifteen", "thirty", "forty five", "o'clock"]))
+        corpus.append((raw, normalize_vosk(raw), intent))
+    return corpus
+
+def vosk_problem(text, intent):
+    """Why a normalized Vosk transcript would fail in its handler, or None."""
+    if router_match(text) != intent:
+        return f"routed to {router_match(text)}"
+    if text.startswith(("remove task", "remove reminder")) and not text.split()[-1].isdigit():
+        return "no number"
+    if text.startswith("remind me to"):
+        time_str = text.split(" at ")[-1].replace(".", "").upper()
+        try:
+            datetime.datetime.strptime(time_str, "%I:%M %p")
+        except ValueError:
+            return f"time {time_str!r} does not parse"
+    return None
+
+def time_dispatch(fn, corpus, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for command in corpus:
+            fn(command)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus) * 1e6
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    vosk = build_vosk_corpus(size // 5)
+    corpus = build_corpus(size) + [text for _, text, _ in vosk]
+
+    start = time.perf_counter()
+    compile_intents()
+    print(f"Compiled intents in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    mismatches = [c for c in corpus if legacy_cascade(c) != router_match(c)]
+    print(f"Corpus: {len(corpus)} utterances, {len(mismatches)} routed differently")
+    for c in sorted(set(mismatches))[:10]:
+        print(f"  '{c}': cascade={legacy_cascade(c)} router={router_match(c)}")
+
+    failed = [(raw, text, problem) for raw, text, intent in vosk if (problem := vosk_problem(text, intent))]
+    print(f"Vosk-style: {len(vosk)} transcripts, {len(failed)} not usable after normalize_vosk")
+    for raw, text, problem in failed[:10]:
+        print(f"  '{raw}' -> '{text}': {problem}")
+
+    cascade_us = time_dispatch(legacy_cascade, corpus)
+    router_us = time_dispatch(router_match, corpus)
+    print(f"Cascade: {cascade_us:.2f} us/command")
+    print(f"Router:  {router_us:.2f} us/command ({cascade_us / router_us:.1f}x)")
+
+if __name__ == "__main__":
+    main()
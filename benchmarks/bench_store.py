@@ -0,0 +1,107 @@
+"""Per-command latency of the write-behind store vs. the old load/modify/save of the whole JSON file.
+
+Run from the repo root:  python -m benchmarks.bench_store
+
+Each "command" adds one to-do entry and removes another, like "add task" followed
+by "remove task". Files are written to a temporary folder.
+
+Then the path "add task" and "remind me to" actually take: todo_task.add_task
+and reminder_task.store_reminder, which hand out the next numbered id, on
+stores of the same sizes. Those must stay flat too.
+"""
+import os
+import json
+import time
+import builtins
+import tempfile
+
+from tasks import todo_task, reminder_task
+from tasks.store import JsonStore
+
+SIZES = (100, 1_000, 10_000, 100_000)
+
+def legacy_command(path, i):
+    with open(path, "r") as f:
+        tasks = json.load(f)
+    tasks[f"task-new-{i}"] = "benchmark task"
+    with open(path, "w") as f:
+        json.dump(tasks, f, indent=4)
+    with open(path, "r") as f:
+        tasks = json.load(f)
+    tasks.pop(f"task-new-{i}")
+    with open(path, "w") as f:
+        json.dump(tasks, f, indent=4)
+
+def store_command(store, i):
+    store.set(f"task-new-{i}", "benchmark task")
+    store.pop(f"task-new-{i}")
+
+def seed(path, size):
+    with open(path, "w") as f:
+        json.dump({f"task-{n}": f"seeded task number {n}" for n in range(size)}, f, indent=4)
+
+def time_per_command(fn, *args, commands):
+    start = time.perf_counter()
+    for i in range(commands):
+        fn(*args, i)
+    return (time.perf_counter() - start) / commands * 1000
+
+def seed_numbered(path, prefix, value, size):
+    with open(path, "w") as f:
+        json.dump({f"{prefix}{n}": value for n in range(1, size + 1)}, f, indent=4)
+
+def add_task_command(i):
+    todo_task.add_task(f"benchmark task {i}")
+
+def store_reminder_command(i):
+    reminder_task.store_reminder({"task": f"benchmark reminder {i}", "time": "05:30 PM", "recurring": None})
+
+def time_numbered_adds(folder):
+    todo_task.speak = lambda *args, **kwargs: None
+    real_print = builtins.print
+    for size in SIZES:
+        todo_path = os.path.join(folder, f"todo-{size}.json")
+        reminder_path = os.path.join(folder, f"reminders-{size}.json")
+        seed_numbered(todo_path, "task-", "seeded task", size)
+        seed_numbered(reminder_path, "reminder-", {"task": "seeded", "time": "05:30 PM", "recurring": None}, size)
+        todo_task.todo_store = JsonStore(todo_path)
+        reminder_task.reminder_store = JsonStore(reminder_path)
+        len(todo_task.todo_store)
+        len(reminder_task.reminder_store)
+        builtins.print = lambda *args, **kwargs: None  # add_task prints a line per task
+        try:
+            task_ms = time_per_command(add_task_command, commands=1000)
+        finally:
+            builtins.print = real_print
+        reminder_ms = time_per_command(store_reminder_command, commands=1000)
+        todo_task.todo_store.flush()
+        reminder_task.reminder_store.flush()
+        print(f"{size:>7} entries: add_task {task_ms:7.4f} ms, store_reminder {reminder_ms:7.4f} ms")
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+
+        for size in SIZES:
+            legacy_path = os.path.join(folder, f"legacy-{size}.json")
+            store_path = os.path.join(folder, f"store-{size}.json")
+            seed(legacy_path, size)
+            seed(store_path, size)
+
+            commands = max(3, 20_000 // size)
+            legacy_ms = time_per_command(legacy_command, legacy_path, commands=commands)
+
+            store = JsonStore(store_path)
+            len(store)  # first access loads the file; that is a one-time cost
+            store_ms = time_per_command(store_command, store, commands=1000)
+
+            start = time.perf_counter()
+            store.flush()
+            flush_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{size:>7} entries: legacy {legacy_ms:9.3f} ms/command, "
+                  f"store {store_ms:7.4f} ms/command, background flush {flush_ms:8.1f} ms")
+
+        time_numbered_adds(folder)
+
+if __name__ == "__main__":
+    main()
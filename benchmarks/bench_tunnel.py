@@ -0,0 +1,66 @@
+"""Tunnel start-up and recovery times with tunnel.TunnelSupervisor against
+benchmarks.fake_ngrok, next to the old fixed time.sleep(5) before reading the
+URL once.
+
+Run from the repo root:  python -m benchmarks.bench_tunnel [ready_after_seconds]
+
+Reported:
+  - start: spawn to public URL, for a fake ngrok that needs ready_after
+    seconds to open its tunnel (the old code always took 5 s, or failed
+    if ngrok needed longer)
+  - process exit: ngrok dies, time until the new URL has been republished
+  - tunnel dropped: the API stops listing the tunnel, same measurement
+The health check interval is lowered to 0.2 s so the recovery runs are short.
+"""
+import sys
+import time
+import socket
+import threading
+
+import requests
+
+import tunnel
+from tunnel import TunnelSupervisor
+from benchmarks import fake_ngrok
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+def main():
+    ready_after = float(sys.argv[1]) if len(sys.argv) > 1 else 0.3
+    tunnel.HEALTH_SECONDS = 0.2
+    port = free_port()
+    api = f"http://localhost:{port}"
+    published = []
+    changed = threading.Event()
+
+    def on_url(url):
+        published.append(url)
+        changed.set()
+
+    supervisor = TunnelSupervisor(5000, on_url=on_url, command=fake_ngrok.command(port, ready_after),
+                                  api_url=api + "/api/tunnels")
+    started = time.perf_counter()
+    supervisor.start()
+    print(f"start (ngrok ready after {ready_after * 1000:.0f} ms): "
+          f"{(time.perf_counter() - started) * 1000:7.1f} ms   (old: 5000 ms fixed)")
+    print(f"  {supervisor.output_lines} lines of ngrok output drained")
+
+    for label, path in (("process exit", "/fake/exit"), ("tunnel dropped", "/fake/drop")):
+        changed.clear()
+        before = supervisor.public_url
+        started = time.perf_counter()
+        requests.post(api + path, timeout=2)
+        if not changed.wait(30):
+            print(f"{label}: not recovered within 30 s")
+            continue
+        print(f"{label:16s} republished after {(time.perf_counter() - started) * 1000:7.1f} ms   "
+              f"({before} -> {supervisor.public_url})")
+
+    print(f"restarts: {supervisor.restarts}, URLs published: {len(published)}")
+    supervisor.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Popup display latency: a new thread with its own tk.Tk() per popup (the old
+show_tasks / show reminders code) vs. the shared UI thread in ui_service.
+
+Run from the repo root, with a display:  python -m benchmarks.bench_ui_popups [popups]
+On a headless machine:                    xvfb-run python -m benchmarks.bench_ui_popups
+
+Latency is measured from the request to the moment the fullscreen text window
+has been laid out (update_idletasks returned). The old way closes each
+window before the next popup. The new way hides the shared window and shows it
+again. Resident memory is printed after each run.
+"""
+import sys
+import time
+import resource
+import statistics
+import threading
+
+import ui_service
+
+TEXT = "\n".join(f"task-{n}: something to do number {n}" for n in range(1, 21))
+
+def old_popup(shown):
+    import tkinter as tk
+
+    def show_window():
+        root = tk.Tk()
+        root.title("To-Do List")
+        root.attributes("-fullscreen", True)
+        root.attributes("-topmost", True)
+        text_widget = tk.Text(root, wrap="word", font=("Helvetica", 20))
+        text_widget.insert("1.0", TEXT)
+        text_widget.config(state="disabled")
+        text_widget.pack(padx=20, pady=20, fill="both", expand=True)
+        tk.Button(root, text="Close", command=root.destroy, font=("Helvetica", 16)).pack(pady=10)
+        root.update_idletasks()
+        shown.set()
+        root.after(10, root.destroy)
+        root.mainloop()
+
+    thread = threading.Thread(target=show_window)
+    thread.start()
+    return thread
+
+def time_old(count):
+    latencies = []
+    for _ in range(count):
+        shown = threading.Event()
+        started = time.perf_counter()
+        thread = old_popup(shown)
+        shown.wait()
+        latencies.append(time.perf_counter() - started)
+        thread.join()
+    return latencies
+
+def time_new(count):
+    ui_service.start()
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        ui_service.show_text("To-Do List", TEXT, topmost=True).result()
+        latencies.append(time.perf_counter() - started)
+        ui_service.call(lambda: ui_service.window("text").hide()).result()
+    return latencies
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:  # not Linux: fall back to the peak
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def report(label, latencies):
+    ms = sorted(x * 1000 for x in latencies)
+    print(f"  {label:22s} first {latencies[0] * 1000:7.1f} ms   median {statistics.median(ms):6.1f} ms   "
+          f"p95 {ms[int(len(ms) * 0.95) - 1]:6.1f} ms   RSS {rss_mb():6.1f} MB")
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    print(f"{count} popups each")
+    report("thread + Tk() each", time_old(count))
+    report("shared UI thread", time_new(count))
+
+if __name__ == "__main__":
+    main()
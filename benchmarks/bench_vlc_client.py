@@ -0,0 +1,61 @@
+"""Latency of VLC RC commands: one socket per command (the old send_vlc_command)
+vs. the persistent VLCClient, against benchmarks.fake_vlc_rc.
+
+Run from the repo root:  python -m benchmarks.bench_vlc_client
+"""
+import time
+import socket
+
+from benchmarks.fake_vlc_rc import FakeVLCServer
+from tasks.vlc_client import VLCClient, VLCError
+
+ROUNDS = 2000
+
+def old_send(port, cmd):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(2)
+        s.connect(("localhost", port))
+        s.sendall((cmd + "\n").encode())
+
+def per_command_us(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+def main():
+    server = FakeVLCServer().start()
+    client = VLCClient(port=server.port)
+
+    print(f"Fake VLC on port {server.port}, {ROUNDS} commands each")
+    old_us = per_command_us(lambda: old_send(server.port, 'pause'), rounds=200)
+    print(f"  new socket per command, no reply: {old_us:8.1f} us")
+    print(f"  persistent client, with reply:    {per_command_us(lambda: client.command('pause')):8.1f} us")
+    batch = ["get_title", "status", "get_time", "playlist"]
+    print(f"  4 queries pipelined:              {per_command_us(lambda: client.send_many(batch)):8.1f} us")
+    print(f"  4 queries one by one:             {per_command_us(lambda: [client.command(c) for c in batch]):8.1f} us")
+    print(f"  status -> {client.status()}")
+    print(f"  playlist -> {len(client.playlist())} items, now playing: {client.now_playing()}")
+
+    # Simulate VLC restarting: drop the server, then bring a new one up on the same port
+    port = server.port
+    server.shutdown()
+    server.server_close()
+    client._sock.shutdown(socket.SHUT_RDWR)
+    try:
+        client.command("status")
+    except VLCError as e:
+        print(f"  while VLC is down: {e}")
+    server = FakeVLCServer(port).start()
+    start = time.perf_counter()
+    while True:
+        try:
+            client.command("status")
+            break
+        except VLCError:
+            time.sleep(0.01)
+    print(f"  reconnected {1000 * (time.perf_counter() - start):.1f} ms after VLC came back")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""False-accept / false-reject rates and CPU cost of the local wake-word detector.
+
+Run from the repo root:
+    python -m benchmarks.bench_wake_word                       (synthetic clips)
+    python -m benchmarks.bench_wake_word ENROLL_DIR POSITIVE_DIR NEGATIVE_DIR
+
+With directories, every *.wav in ENROLL_DIR becomes a template, every file in
+POSITIVE_DIR should trigger the detector at least once (else it's a false
+reject) and every detection in NEGATIVE_DIR counts as a false accept. Files are
+fed in 1024-sample chunks like the microphone stream in speech_module.listen.
+
+Without arguments, clips are synthesized: the "wake phrase" is a fixed pattern
+of tone glides with random speed, pitch, gain and background noise; negatives
+are other glide patterns, noise bursts and quiet room noise.
+"""
+import os
+import sys
+import glob
+import math
+import time
+import random
+import tempfile
+import wave
+from array import array
+
+import wake_word
+
+RATE = 16000
+CHUNK = 1024
+THRESHOLDS = (4.5, 5.0, 5.5, 6.0, 6.5)
+
+WAKE_PATTERN = [(500, 900, 0.18), (900, 900, 0.12), (1800, 1200, 0.22), (700, 400, 0.2)]
+
+def synth(pattern, gain=8000, speed=1.0, pitch=1.0, noise=150, rng=random):
+    """Tone glides [(start_hz, end_hz, seconds)] padded with room noise on both sides."""
+    samples = [rng.gauss(0, noise) for _ in range(int(RATE * rng.uniform(0.3, 0.8)))]
+    for start_hz, end_hz, seconds in pattern:
+        n = int(RATE * seconds / speed)
+        phase = 0.0
+        for i in range(n):
+            hz = (start_hz + (end_hz - start_hz) * i / n) * pitch
+            phase += 2 * math.pi * hz / RATE
+            envelope = min(1.0, i / 200, (n - i) / 200)
+            samples.append(gain * envelope * (math.sin(phase) + 0.3 * math.sin(2 * phase)) + rng.gauss(0, noise))
+    samples += [rng.gauss(0, noise) for _ in range(int(RATE * rng.uniform(0.4, 0.8)))]
+    return array("h", (max(-32768, min(32767, int(s))) for s in samples))
+
+def random_pattern(rng):
+    return [(rng.randint(250, 3000), rng.randint(250, 3000), rng.uniform(0.08, 0.3))
+            for _ in range(rng.randint(2, 6))]
+
+def write_wav(path, samples):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(RATE)
+        w.writeframes(samples.tobytes())
+
+def make_corpus(root, rng):
+    dirs = {name: os.path.join(root, name) for name in ("enroll", "positive", "negative")}
+    for d in dirs.values():
+        os.makedirs(d)
+
+    def variant():
+        return dict(speed=rng.uniform(0.85, 1.15), pitch=rng.uniform(0.92, 1.08),
+                    gain=rng.uniform(3000, 12000), noise=rng.uniform(50, 300), rng=rng)
+
+    for n in range(3):
+        write_wav(os.path.join(dirs["enroll"], f"wake-{n}.wav"), synth(WAKE_PATTERN, **variant()))
+    for n in range(40):
+        write_wav(os.path.join(dirs["positive"], f"wake-{n}.wav"), synth(WAKE_PATTERN, **variant()))
+    for n in range(80):
+        write_wav(os.path.join(dirs["negative"], f"speech-{n}.wav"), synth(random_pattern(rng), **variant()))
+    for n in range(20):
+        # Long stretches of room noise with the odd loud bang
+        quiet = synth([(rng.randint(100, 4000), rng.randint(100, 4000), 0.05)], noise=200, rng=rng)
+        quiet.extend(array("h", (int(rng.gauss(0, 200)) for _ in range(RATE * 10))))
+        write_wav(os.path.join(dirs["negative"], f"room-{n}.wav"), quiet)
+    return dirs["enroll"], dirs["positive"], dirs["negative"]
+
+def replay(detector, samples):
+    """Feed a clip in microphone-sized chunks; returns (detections, CPU seconds)."""
+    detector.reset()
+    data = samples.tobytes() + bytes(RATE)  # half a second of silence closes the last burst
+    start = time.process_time()
+    detections = 0
+    for i in range(0, len(data), CHUNK * 2):
+        if detector.process(data[i:i + CHUNK * 2]):
+            detections += 1
+    return detections, time.process_time() - start
+
+def load_dir(folder):
+    clips = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.wav"))):
+        rate, samples = wake_word.read_wav(path)
+        clips.append((path, rate, samples))
+    return clips
+
+def evaluate(templates, positives, negatives, threshold):
+    cpu = 0.0
+    audio_seconds = 0.0
+    rejected = 0
+    accepted = 0
+    negative_seconds = 0.0
+    for _, rate, samples in positives:
+        detections, spent = replay(wake_word.WakeWordDetector(templates, rate, threshold), samples)
+        rejected += detections == 0
+        cpu += spent
+        audio_seconds += len(samples) / rate
+    for _, rate, samples in negatives:
+        detections, spent = replay(wake_word.WakeWordDetector(templates, rate, threshold), samples)
+        accepted += detections
+        cpu += spent
+        audio_seconds += len(samples) / rate
+        negative_seconds += len(samples) / rate
+    return {
+        "frr": rejected / len(positives) if positives else 0.0,
+        "fa_per_hour": accepted / negative_seconds * 3600 if negative_seconds else 0.0,
+        "false_accepts": accepted,
+        "cpu_s_per_hour": cpu / audio_seconds * 3600 if audio_seconds else 0.0,
+        "negative_seconds": negative_seconds,
+    }
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        if len(sys.argv) == 4:
+            enroll_dir, positive_dir, negative_dir = sys.argv[1:]
+        else:
+            print("Synthesizing clips (pass ENROLL_DIR POSITIVE_DIR NEGATIVE_DIR to use recordings)")
+            enroll_dir, positive_dir, negative_dir = make_corpus(root, random.Random(9))
+
+        enroll_files = sorted(glob.glob(os.path.join(enroll_dir, "*.wav")))
+        templates = wake_word.enroll(enroll_files, path=os.path.join(root, "templates.json"))
+        positives, negatives = load_dir(positive_dir), load_dir(negative_dir)
+        print(f"{len(templates)} template(s), {len(positives)} positive and {len(negatives)} negative clip(s)")
+
+        for threshold in THRESHOLDS:
+            r = evaluate(templates, positives, negatives, threshold)
+            print(f"  threshold {threshold:4.2f}: false reject {r['frr'] * 100:5.1f}%, "
+                  f"false accept {r['fa_per_hour']:6.1f}/hour ({r['false_accepts']} in "
+                  f"{r['negative_seconds']:.0f}s of negatives), CPU {r['cpu_s_per_hour']:6.1f} s per hour of audio")
+
+if __name__ == "__main__":
+    main()
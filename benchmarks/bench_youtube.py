@@ -0,0 +1,168 @@
+"""Latency of "open youtube and play <keyword>" with tasks.youtube_task, against
+benchmarks.fake_vlc_rc and a stub resolver that sleeps like a yt-dlp lookup
+would. The old handler blocked for at least 13 s (sleep 7 + 1 + 5 around
+Firefox and pyautogui) before anything played.
+
+Run from the repo root:
+    python -m benchmarks.bench_youtube [--resolve-seconds 2.0]
+    python -m benchmarks.bench_youtube --ytdlp      (real yt-dlp, needs the network)
+
+Reported:
+  - handler: how long handle_youtube holds the caller (voice loop, Alexa request)
+  - cold: command to VLC playing, nothing cached
+  - warm: same keyword again, served from the cache
+  - stale stream: cached video whose stream URL has expired (no new search)
+  - superseded: a second request while the first is resolving; only the second plays
+  - music VLC: VLC was started for music (no video output); it is restarted for video
+
+The last two are checked, and only run with the stub resolver.
+"""
+import os
+import time
+import argparse
+import tempfile
+import threading
+
+from benchmarks.fake_vlc_rc import FakeVLCServer
+from tasks import media_task, youtube_task
+from tasks.store import get_store
+from tasks.vlc_client import VLCClient
+
+class StubResolver:
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = []
+        self._released = threading.Event()
+        self._released.set()
+        self.holding = threading.Event()
+
+    def hold(self):
+        """Make the next lookup wait in the resolver until release(); holding is set once it does."""
+        self.holding.clear()
+        self._released.clear()
+
+    def release(self):
+        self._released.set()
+
+    def __call__(self, target):
+        self.calls.append(target)
+        if not self._released.is_set():
+            self.holding.set()
+            self._released.wait()
+        time.sleep(self.seconds)
+        video_id = f"v{abs(hash(target)) % 10**8:08d}"
+        expire = int(time.time()) + 6 * 3600
+        return {"id": video_id, "title": f"Video for {target}",
+                "url": f"https://rr1.example.googlevideo.com/videoplayback?id={video_id}&expire={expire}"}
+
+class AddCounter:
+    """Wraps the fake VLC's command handler to count `add`s (the same URL may be added twice)."""
+
+    def __init__(self, state):
+        self.adds = []
+        handle = state.handle
+
+        def counting(line):
+            if line.startswith("add "):
+                self.adds.append(line[4:].strip())
+            return handle(line)
+        state.handle = counting
+
+    def wait(self, count, timeout=60):
+        """Seconds until there have been `count` adds in all."""
+        started = time.perf_counter()
+        while len(self.adds) < count:
+            if time.perf_counter() - started > timeout:
+                raise TimeoutError("nothing started playing")
+            time.sleep(0.002)
+        return time.perf_counter() - started
+
+def run(label, vlc_adds, command, resolver):
+    calls = len(resolver.calls) if resolver else 0
+    expected = len(vlc_adds.adds) + 1
+    started = time.perf_counter()
+    youtube_task.handle_youtube(command)
+    handler = time.perf_counter() - started
+    seconds = vlc_adds.wait(expected)
+    made = len(resolver.calls) - calls if resolver else "?"
+    print(f"{label:14s} handler {handler * 1000:7.2f} ms   playing after {(handler + seconds) * 1000:8.1f} ms   "
+          f"resolver calls {made}")
+    return vlc_adds.adds[-1]
+
+def wait_for_worker():
+    """Block until youtube_task's worker has finished everything queued so far."""
+    youtube_task._worker.submit(lambda: None).result()
+
+def superseded(vlc_adds, resolver):
+    adds = len(vlc_adds.adds)
+    resolver.hold()
+    youtube_task.handle_youtube("open youtube and play jazz piano")
+    resolver.holding.wait()   # jazz piano is being looked up...
+    youtube_task.handle_youtube("open youtube and play ocean waves")   # ...when this comes in
+    resolver.release()
+    seconds = vlc_adds.wait(adds + 1)
+    wait_for_worker()
+    played = vlc_adds.adds[adds:]
+    ocean = youtube_task.cache.get("ocean waves")
+    print(f"{'superseded':14s} playing after {seconds * 1000:8.1f} ms, added {len(played)} URL(s)")
+    assert ocean is not None and played == [ocean["url"]], f"expected only ocean waves to play, got {played}"
+
+def music_vlc(vlc_adds):
+    """play_url on a VLC started for music must restart it for video instead of adding to it."""
+    started, stopped = [], []
+    start_vlc, stop_vlc = media_task.start_vlc, media_task.stop_vlc
+
+    def fake_start(media_type, target, shuffle=False):
+        started.append(media_type)
+        media_task.media_store.set(media_task.VLC_MODE_KEY, media_type)
+        media_task.vlc.send_many(["clear", f"add {target}"])   # the "new" VLC is the same fake one
+
+    media_task.start_vlc, media_task.stop_vlc = fake_start, lambda: stopped.append(True)
+    media_task.media_store.set(media_task.VLC_MODE_KEY, "music")
+    try:
+        run("music VLC", vlc_adds, "open youtube and play rain sounds", None)
+        wait_for_worker()
+    finally:
+        media_task.start_vlc, media_task.stop_vlc = start_vlc, stop_vlc
+    print(f"               restarted for {started}")
+    assert stopped and started == ["video"], f"expected a restart in video mode, got stop={stopped} start={started}"
+    assert media_task.media_store.get(media_task.VLC_MODE_KEY) == "video"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolve-seconds", type=float, default=2.0)
+    parser.add_argument("--ytdlp", action="store_true", help="use yt-dlp instead of the stub")
+    args = parser.parse_args()
+
+    server = FakeVLCServer().start()
+    media_task.vlc = VLCClient(port=server.port)
+    vlc_adds = AddCounter(server.state)
+    resolver = None if args.ytdlp else StubResolver(args.resolve_seconds)
+    if resolver:
+        youtube_task.set_resolver(resolver)
+
+    with tempfile.TemporaryDirectory() as folder:
+        youtube_task.cache = get_store(os.path.join(folder, "youtube_cache.json"))
+        media_task.media_store = get_store(os.path.join(folder, "media_state.json"))
+        media_task.media_store.set(media_task.VLC_MODE_KEY, "video")  # the fake VLC stands in for a video one
+        run("cold", vlc_adds, "open youtube and play lofi beats", resolver)
+        run("warm", vlc_adds, "open youtube and play lofi beats", resolver)
+        run("other", vlc_adds, "open youtube and play rain sounds", resolver)
+        run("warm again", vlc_adds, "open youtube and play lofi beats", resolver)
+
+        key = youtube_task.cache_key("lofi beats")
+        youtube_task.cache.set(key, dict(youtube_task.cache.get(key), expires=time.time()))
+        run("stale stream", vlc_adds, "open youtube and play lofi beats", resolver)
+        if resolver:
+            print(f"               re-resolved {resolver.calls[-1]}")
+
+        if resolver:
+            superseded(vlc_adds, resolver)
+            music_vlc(vlc_adds)
+        youtube_task.cache.flush()
+        media_task.media_store.flush()
+
+    print("old handler: >= 13000 ms blocked (fixed sleeps), plus the Firefox start-up")
+
+if __name__ == "__main__":
+    main()
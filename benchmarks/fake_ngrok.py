@@ -0,0 +1,93 @@
+"""A stand-in for the ngrok process and its local tunnels API, for exercising
+tunnel.TunnelSupervisor offline.
+
+    python -m benchmarks.fake_ngrok [--api-port 4041] [--ready-after 0.3] [--chatter 2000]
+
+Run as the supervisor's command, it behaves like `ngrok http`. It writes
+`--chatter` log lines to stdout at once (far more than a pipe buffer holds,
+so it blocks unless its output is read). After `--ready-after` seconds it
+lists one https tunnel at http://localhost:<api-port>/api/tunnels. Every
+process gets a new random public URL, the way a free ngrok account does.
+Tests can misbehave on purpose:
+    POST /fake/drop   the API stops listing the tunnel
+    POST /fake/exit   the process exits
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        if self.path != "/api/tunnels":
+            self._send_json(404, {"msg": "not found"})
+            return
+        tunnels = []
+        if time.monotonic() >= server.ready_at and not server.dropped:
+            tunnels = [{"name": "command_line", "proto": "https", "public_url": server.public_url,
+                        "config": {"addr": f"http://localhost:{server.target_port}"}}]
+        self._send_json(200, {"tunnels": tunnels, "uri": "/api/tunnels"})
+
+    def do_POST(self):
+        if self.path == "/fake/drop":
+            self.server.dropped = True
+            self._send_json(200, {"dropped": True})
+        elif self.path == "/fake/exit":
+            self._send_json(200, {"exiting": True})
+            threading.Timer(0.05, os._exit, args=(3,)).start()
+        else:
+            self._send_json(404, {"msg": "not found"})
+
+class FakeTunnelsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, ready_after=0.0, target_port=5000):
+        super().__init__(("localhost", port), _Handler)
+        self.ready_at = time.monotonic() + ready_after
+        self.public_url = f"https://{uuid.uuid4().hex[:12]}.ngrok-free.app"
+        self.target_port = target_port
+        self.dropped = False
+
+    @property
+    def api_url(self):
+        return f"http://localhost:{self.server_address[1]}/api/tunnels"
+
+def command(api_port, ready_after=0.3, chatter=2000):
+    """Command line that runs this fake as the ngrok process."""
+    return [sys.executable, "-m", "benchmarks.fake_ngrok", "--api-port", str(api_port),
+            "--ready-after", str(ready_after), "--chatter", str(chatter)]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-port", type=int, default=4041)
+    parser.add_argument("--ready-after", type=float, default=0.3)
+    parser.add_argument("--chatter", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = FakeTunnelsServer(args.api_port, args.ready_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for n in range(args.chatter):
+        print(f't=2026-10-18T09:00:00+0000 lvl=info msg="fake ngrok log line" n={n} padding={"x" * 60}', flush=True)
+    print(f'lvl=info msg="started tunnel" url={server.public_url}', flush=True)
+    while True:
+        time.sleep(3600)
+
+if __name__ == "__main__":
+    main()
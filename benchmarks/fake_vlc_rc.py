@@ -0,0 +1,135 @@
+"""A small stand-in for VLC's RC interface, for exercising tasks.vlc_client without VLC.
+
+    python -m benchmarks.fake_vlc_rc [port]
+
+It speaks enough of the protocol for the client: a banner, a "> " prompt after
+every reply, and canned answers to status/get_time/get_title/playlist plus the
+control and playlist (clear/add) commands media_task sends. drop_connections()
+hangs up on every client, the way a VLC restart does.
+"""
+import sys
+import socket
+import socketserver
+import threading
+
+BANNER = "VLC media player 3.0.18 Vetinari\nCommand Line Interface initialized. Type `help' for help.\n"
+
+class FakeVLCState:
+    def __init__(self, tracks=None):
+        self.tracks = tracks or [f"track-{n:03d}.mp3" for n in range(1, 6)]
+        self.current = 0
+        self.playing = True
+        self.volume = 256
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def handle(self, line):
+        cmd, _, arg = line.strip().partition(" ")
+        with self.lock:
+            if cmd == "status":
+                if not self.tracks:
+                    return f"( audio volume: {self.volume} )\n( state stopped )\n"
+                state = "playing" if self.playing else "paused"
+                return (f"( new input: file:///music/{self.tracks[self.current]} )\n"
+                        f"( audio volume: {self.volume} )\n( state {state} )\n")
+            if cmd == "get_time":
+                self.position += 1
+                return f"{self.position}\n"
+            if cmd == "get_title":
+                if not self.tracks:
+                    return "\n"
+                return f"{self.tracks[self.current]}\n"
+            if cmd == "playlist":
+                lines = ["+----[ Playlist - playlist ]", "| 1 - Playlist"]
+                for n, track in enumerate(self.tracks):
+                    marker = "*" if n == self.current else ""
+                    lines.append(f"|   {marker}{n + 3} - {track} (00:03:{n:02d})")
+                lines += ["| 2 - Media Library", "+----[ End of playlist ]"]
+                return "\n".join(lines) + "\n"
+            if cmd == "pause":
+                self.playing = not self.playing
+                return ""
+            if cmd == "next":
+                if not self.tracks:
+                    return ""
+                self.current = (self.current + 1) % len(self.tracks)
+                self.position = 0
+                return ""
+            if cmd == "clear":
+                self.tracks, self.current, self.playing = [], 0, False
+                return ""
+            if cmd == "add":
+                self.tracks.append(arg.strip())
+                self.current, self.playing, self.position = len(self.tracks) - 1, True, 0
+                return ""
+            if cmd == "stop":
+                self.playing = False
+                return ""
+            if cmd in ("volup", "voldown"):
+                step = int(arg or 1) * 32
+                self.volume = max(0, self.volume + (step if cmd == "volup" else -step))
+                return f"( audio volume: {self.volume} )\n"
+            if cmd == "volume":
+                self.volume = int(arg)
+                return ""
+            return f"Unknown command `{cmd}'. Type `help' for help.\n"
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.clients.add(self.request)
+
+    def finish(self):
+        with self.server.lock:
+            self.server.clients.discard(self.request)
+        super().finish()
+
+    def handle(self):
+        try:
+            self.wfile.write((BANNER + "> ").encode())
+            for raw in self.rfile:
+                reply = self.server.state.handle(raw.decode(errors="replace"))
+                self.wfile.write((reply + "> ").encode())
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # clients like the old send_vlc_command hang up without reading
+
+class FakeVLCServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, port=0, state=None):
+        super().__init__(("localhost", port), _Handler)
+        self.state = state or FakeVLCState()
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def drop_connections(self):
+        with self.lock:
+            clients = list(self.clients)
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def stop(self):
+        """Stop listening and hang up on everyone, like VLC quitting."""
+        self.shutdown()
+        self.server_close()
+        self.drop_connections()
+
+if __name__ == "__main__":
+    server = FakeVLCServer(int(sys.argv[1]) if len(sys.argv) > 1 else 9999)
+    print(f"Fake VLC RC listening on localhost:{server.port}")
+    server.serve_forever()
@@ -0,0 +1,130 @@
+"""Load test for the /alexa endpoint: replays Alexa request bodies and reports
+latency percentiles and throughput.
+
+Run from the repo root:
+    python -m benchmarks.load_alexa                       (in-process, both servers)
+    python -m benchmarks.load_alexa --url http://localhost:5000/alexa --dir recorded/
+
+Request bodies come from *.json files in --dir (record real traffic by
+starting app.py with JARVIS_RECORD_REQUESTS=recorded/), or default to a
+mix of launch, question and session-end requests. Without --url the app is
+served in-process, once with Flask's development server and once with
+waitress, and Groq is replaced by benchmarks.stub_groq so questions don't
+leave the machine. Local commands are not in the default mix because they
+would really run (open VLC, speak, ...).
+"""
+import os
+import sys
+import glob
+import json
+import time
+import logging
+import argparse
+import threading
+
+import requests
+
+def default_bodies():
+    def intent(name, slot, value, n):
+        return {"version": "1.0", "request": {"type": "IntentRequest", "requestId": f"load-{n}",
+                "intent": {"name": name, "slots": {slot: {"name": slot, "value": value}}}}}
+    bodies = [{"version": "1.0", "request": {"type": "LaunchRequest", "requestId": "load-launch"}},
+              {"version": "1.0", "request": {"type": "SessionEndedRequest", "requestId": "load-end"}}]
+    bodies += [intent("AskIntent", "query", f"what is fact number {n % 20}", n) for n in range(8)]
+    return bodies
+
+def load_bodies(folder):
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        with open(path) as f:
+            bodies.append(json.load(f))
+    return bodies
+
+def run_load(url, bodies, total, concurrency):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        session = requests.Session()
+        mine = []
+        for n in counter:
+            body = bodies[n % len(bodies)]
+            start = time.perf_counter()
+            try:
+                ok = session.post(url, json=body, timeout=10).status_code == 200
+            except requests.RequestException:
+                ok = False
+            mine.append(time.perf_counter() - start)
+            if not ok:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "errors": errors[0],
+    }
+
+def report(label, result):
+    print(f"  {label:<22} {result['rps']:8.1f} req/s   p50 {result['p50_ms']:7.2f} ms   "
+          f"p99 {result['p99_ms']:7.2f} ms   errors {result['errors']}")
+
+def serve_in_process(kind, app):
+    if kind == "waitress":
+        from waitress.server import create_server
+        server = create_server(app, host="127.0.0.1", port=0, threads=8, ident="jarvis")
+        threading.Thread(target=server.run, daemon=True).start()
+        return server.effective_port, server.close
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="hit a running server instead of serving the app in-process")
+    parser.add_argument("--dir", help="folder of recorded request bodies (*.json)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    bodies = load_bodies(args.dir) if args.dir else default_bodies()
+    if not bodies:
+        sys.exit(f"No *.json request bodies in {args.dir}")
+    print(f"{args.requests} requests, {args.concurrency} concurrent, {len(bodies)} distinct bodies")
+
+    if args.url:
+        report(args.url, run_load(args.url, bodies, args.requests, args.concurrency))
+        return
+
+    from benchmarks.stub_groq import StubGroqServer
+    stub = StubGroqServer().start()
+    os.environ["GROQ_API_URL"] = stub.url  # read when the shared LLM client is first made
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    from wsgi import app
+    # Per-request INFO and access-log lines would dominate the timing
+    logging.getLogger("jarvis").setLevel(logging.WARNING)
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    for kind in ("flask-dev", "waitress"):
+        port, stop = serve_in_process(kind, app)
+        url = f"http://127.0.0.1:{port}/alexa"
+        run_load(url, bodies, min(200, args.requests), args.concurrency)  # warm up
+        report(kind, run_load(url, bodies, args.requests, args.concurrency))
+        stop()
+
+if __name__ == "__main__":
+    main()
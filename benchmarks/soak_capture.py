@@ -0,0 +1,145 @@
+"""Soak test for the always-on microphone path: the capture thread filling the
+ring buffer, the wake-word detector reading it at the same time, and a
+command capture every so often that rewinds into the ring. Reports CPU and
+memory over the run.
+
+Run from the repo root:
+    python -m benchmarks.soak_capture                     (24 hours, synthetic microphone)
+    python -m benchmarks.soak_capture --hours 1 --mic     (the real microphone)
+    python -m benchmarks.soak_capture --hours 24 --csv soak.csv
+
+The synthetic microphone delivers 1024-sample chunks at 16 kHz in real time:
+room noise, with a speech-like burst every few seconds so the detector does
+real work (features and DTW), not just the energy gate. Every
+--sample-minutes a line is printed (and written to --csv): CPU use since the
+last sample, resident memory, chunks captured, reader lag and ring overruns.
+The summary at the end gives average CPU and how much RSS grew per hour.
+"""
+import sys
+import math
+import time
+import random
+import argparse
+import resource
+import threading
+from array import array
+
+import wake_word
+import audio_capture
+from audio_capture import MicrophoneCapture
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+class SyntheticMicrophone:
+    """Stands in for sr.Microphone: same attributes, and stream.read paced in real time."""
+    SAMPLE_RATE = SAMPLE_RATE
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+
+    def __init__(self):
+        rng = random.Random(5)
+        noise = [bytes(array("h", (rng.randint(-150, 150) for _ in range(CHUNK)))) for _ in range(8)]
+        burst = [bytes(array("h", (int(4000 * math.sin(2 * math.pi * (300 + 40 * n) * i / SAMPLE_RATE))
+                                             for i in range(CHUNK)))) for n in range(10)]
+        # ~4 s of noise, then a ~0.6 s burst, repeated
+        self.pattern = noise * 8 + burst + noise * 2
+        self.template = wake_word.extract_template(
+            array("h", b"".join(noise[:4] + burst + noise * 2)), SAMPLE_RATE)
+        self.stream = self
+        self._n = 0
+        self._started = None
+
+    def read(self, size):
+        if self._started is None:
+            self._started = time.perf_counter()
+        self._n += 1
+        delay = self._started + self._n * CHUNK / SAMPLE_RATE - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        return self.pattern[self._n % len(self.pattern)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--sample-minutes", type=float, default=10)
+    parser.add_argument("--command-every", type=float, default=30, help="seconds between simulated commands")
+    parser.add_argument("--mic", action="store_true", help="use the real microphone")
+    parser.add_argument("--csv")
+    args = parser.parse_args()
+
+    fake = None if args.mic else SyntheticMicrophone()
+    capture = MicrophoneCapture(open_source=audio_capture.open_microphone if args.mic else (lambda: fake)).start()
+    templates = [fake.template] if fake else wake_word.load_templates(sample_rate=capture.sample_rate)
+    detector = wake_word.WakeWordDetector(templates, sample_rate=capture.sample_rate)
+    cursor = capture.cursor()
+    stats = {"wakes": 0, "commands": 0}
+    stop = threading.Event()
+
+    def detect():
+        # The listen() loop's wake-word wait, plus a command capture now and then
+        next_command = time.monotonic() + args.command_every
+        while not stop.is_set():
+            if detector.process(cursor.read()):
+                stats["wakes"] += 1
+            if time.monotonic() >= next_command:
+                next_command += args.command_every
+                command = capture.cursor(cursor.position - int(1.0 * capture.sample_rate / capture.chunk))
+                pcm = bytearray()
+                for _ in range(int(2.0 * capture.sample_rate / capture.chunk)):
+                    pcm += command.read()
+                stats["commands"] += 1
+
+    reader = threading.Thread(target=detect, daemon=True)
+    reader.start()
+
+    out = open(args.csv, "w") if args.csv else None
+    header = "elapsed_h,cpu_percent,rss_mb,chunks,lag_chunks,overruns,wakes,commands"
+    print(header)
+    if out:
+        out.write(header + "\n")
+    started = last_wall = time.perf_counter()
+    last_cpu = time.process_time()
+    first_rss = rss_mb()
+    cpu_samples = []
+    end = started + args.hours * 3600
+    while time.perf_counter() < end:
+        time.sleep(min(args.sample_minutes * 60, max(0.0, end - time.perf_counter())))
+        wall, cpu = time.perf_counter(), time.process_time()
+        percent = (cpu - last_cpu) / (wall - last_wall) * 100
+        cpu_samples.append(percent)
+        last_wall, last_cpu = wall, cpu
+        line = (f"{(wall - started) / 3600:.3f},{percent:.2f},{rss_mb():.1f},{capture.ring.written},"
+                f"{cursor.behind()},{capture.ring.overruns},{stats['wakes']},{stats['commands']}")
+        print(line, flush=True)
+        if out:
+            out.write(line + "\n")
+            out.flush()
+
+    stop.set()
+    capture.stop()
+    hours = (time.perf_counter() - started) / 3600
+    last_rss = rss_mb()
+    print(f"\n{hours:.2f} h: CPU {sum(cpu_samples) / len(cpu_samples):.2f}% average, {max(cpu_samples):.2f}% max; "
+          f"RSS {first_rss:.1f} -> {last_rss:.1f} MB ({(last_rss - first_rss) / hours:+.2f} MB/h); "
+          f"ring {capture.ring.slots} x {capture.ring.chunk_bytes} B, {capture.ring.overruns} overruns; "
+          f"{stats['wakes']} wakes, {stats['commands']} commands")
+    if out:
+        out.close()
+    return 0 if capture.ring.overruns == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""Stress test for the task engine: fires thousands of mixed to-do and reminder
+commands from many threads at once and checks the stores come out consistent.
+
+Run from the repo root:  python -m benchmarks.stress_engine [commands] [clients]
+
+The stores are pointed at a temporary folder and speech is switched off. Each
+store is seeded with entries. Then, all at once: every even seeded entry is
+removed, a new uniquely worded entry is added for every command, and some
+commands match no intent. Afterwards every odd seeded entry and every new
+entry must be there exactly once, and nothing else. The reminder scheduler must
+hold the same ids as the reminder store.
+
+It is then run split across two processes, each with its own engine, sharing
+the store files the way main.py and app.py do. The stores must come out the
+same, and the parent's scheduler, brought up to date from the file the way
+the voice process picks up Alexa's reminders, must match them.
+
+The same load is then run again with the handlers called directly from the
+client threads. That is the old behaviour, with no resource locks. It used to
+lose entries when two adds picked the same number; the store now hands out
+numbers itself (JsonStore.add_numbered), so any loss there points at the
+handlers. The thread switch interval is lowered to make races easier to hit.
+"""
+import os
+import sys
+import time
+import random
+import builtins
+import tempfile
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from tasks import todo_task, reminder_task, reminder_scheduler
+from tasks.store import JsonStore
+from tasks.router import compile_intents
+from tasks.engine import TaskEngine
+import tasks.intents  # noqa: F401  (registers the intents)
+
+SEED = 200
+
+def quiet(*args, **kwargs):
+    pass
+
+def fresh_stores(folder, label):
+    todo_task.todo_store = JsonStore(os.path.join(folder, f"{label}-todo.json"))
+    reminder_task.reminder_store = JsonStore(os.path.join(folder, f"{label}-reminders.json"))
+    reminder_scheduler.clear_reminders()
+    for n in range(1, SEED + 1):
+        todo_task.todo_store.set(f"task-{n}", f"seeded task {n}")
+        info = {"task": f"seeded reminder {n}", "time": "05:30 PM", "recurring": None}
+        reminder_task.reminder_store.set(f"reminder-{n}", info)
+        reminder_scheduler.add_reminder(f"reminder-{n}", info)
+
+def make_commands(count):
+    commands = []
+    for n in range(count):
+        kind = n % 5
+        if kind == 0:
+            commands.append(f"add task write report {n}")
+        elif kind == 1:
+            commands.append(f"remind me to call person {n} at 5:30 pm")
+        elif kind == 2:
+            commands.append("tell me something unrelated")
+        elif kind == 3:
+            commands.append(f"add task buy thing {n}")
+        else:
+            commands.append(f"remind me to water plant {n} at 6:15 pm")
+    commands += [f"remove task {n}" for n in range(2, SEED + 1, 2)]
+    commands += [f"remove reminder {n}" for n in range(2, SEED + 1, 2)]
+    random.Random(1).shuffle(commands)
+    return commands
+
+def expected_values(commands):
+    tasks = {f"seeded task {n}" for n in range(1, SEED + 1, 2)}
+    reminders = {f"seeded reminder {n}" for n in range(1, SEED + 1, 2)}
+    for command in commands:
+        if command.startswith("add task"):
+            tasks.add(command.replace("add task", "", 1).strip())
+        elif command.startswith("remind me to"):
+            reminders.add(command.replace("remind me to", "", 1).split(" at ")[0].strip())
+    return tasks, reminders
+
+def check(commands):
+    """List of problems found in the stores (empty when consistent)."""
+    want_tasks, want_reminders = expected_values(commands)
+    got_tasks = [text for _, text in todo_task.todo_store.items()]
+    got_reminders = [info["task"] for _, info in reminder_task.reminder_store.items()]
+    problems = []
+    for label, got, want in (("task", got_tasks, want_tasks), ("reminder", got_reminders, want_reminders)):
+        lost = want - set(got)
+        extra = set(got) - want
+        doubled = len(got) - len(set(got))
+        if lost:
+            problems.append(f"{len(lost)} {label}(s) lost, e.g. {sorted(lost)[:3]}")
+        if extra:
+            problems.append(f"{len(extra)} unexpected {label}(s), e.g. {sorted(extra)[:3]}")
+        if doubled:
+            problems.append(f"{doubled} duplicate {label}(s)")
+    stored = set(reminder_task.reminder_store.keys())
+    scheduled = set(reminder_scheduler._scheduled)
+    if stored != scheduled:
+        problems.append(f"scheduler out of sync: {len(stored - scheduled)} not scheduled, "
+                        f"{len(scheduled - stored)} scheduled but not stored")
+    return problems
+
+def run_engine(commands, clients):
+    engine = TaskEngine(max_pending=len(commands))
+    with ThreadPoolExecutor(clients) as pool:
+        futures = list(pool.map(engine.submit, commands))
+    for future in futures:
+        future.result()
+
+def _run_child(commands, clients, todo_path, reminder_path):
+    todo_task.todo_store = JsonStore(todo_path)
+    reminder_task.reminder_store = JsonStore(reminder_path)
+    run_engine(commands, clients)
+    todo_task.todo_store.flush()
+    reminder_task.reminder_store.flush()
+
+def run_processes(commands, clients, processes=2):
+    """Every process takes every n-th command, with its own engine and stores on the same files."""
+    todo_path, reminder_path = todo_task.todo_store.path, reminder_task.reminder_store.path
+    todo_task.todo_store.flush()
+    reminder_task.reminder_store.flush()
+    context = multiprocessing.get_context("fork")
+    children = [context.Process(target=_run_child, args=(commands[n::processes], clients // processes,
+                                                         todo_path, reminder_path))
+                for n in range(processes)]
+    for child in children:
+        child.start()
+    for child in children:
+        child.join()
+        if child.exitcode:
+            raise RuntimeError(f"worker process exited with {child.exitcode}")
+    # Read back what the processes wrote
+    todo_task.todo_store = JsonStore(todo_path)
+    reminder_task.reminder_store = JsonStore(reminder_path)
+    reminder_scheduler.sync_reminders(dict(reminder_task.reminder_store.items()))
+
+def run_unlocked(commands, clients):
+    def call(command):
+        if command.startswith(("add task", "remove task")):
+            return todo_task.handle_todo(command)
+        if command.startswith(("remind me to", "remove reminder")):
+            return reminder_task.handle_reminder(command)
+        return False
+
+    with ThreadPoolExecutor(clients) as pool:
+        list(pool.map(call, commands))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    todo_task.speak = quiet
+    reminder_task.speak = quiet
+    real_print = builtins.print
+    compile_intents()
+    sys.setswitchinterval(1e-6)
+
+    commands = make_commands(count)
+    failed = False
+    with tempfile.TemporaryDirectory() as folder:
+        for label, run in (("task engine", run_engine), ("2 processes", run_processes), ("no locks", run_unlocked)):
+            fresh_stores(folder, label.replace(" ", "-"))
+            # Handlers print a line per command; keep the report readable
+            builtins.print = quiet
+            started = time.perf_counter()
+            try:
+                run(commands, clients)
+            finally:
+                builtins.print = real_print
+            elapsed = time.perf_counter() - started
+            problems = check(commands)
+            # Write out now, before the debounce timer fires into a deleted folder
+            todo_task.todo_store.flush()
+            reminder_task.reminder_store.flush()
+            print(f"{label:12s} {len(commands)} commands from {clients} threads in {elapsed:.2f}s: "
+                  f"{'consistent' if not problems else 'INCONSISTENT'}")
+            for problem in problems:
+                print(f"    {problem}")
+            if run is not run_unlocked and problems:
+                failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""A local stand-in for Groq's chat completions endpoint, for exercising tasks.llm_client offline.
+
+    python -m benchmarks.stub_groq [port]
+
+Then point Jarvis at it with GROQ_API_URL=http://localhost:<port>/openai/v1/chat/completions.
+It speaks HTTP/1.1 with keep-alive, counts the TCP connections it accepts, can
+add a fixed delay per answer, and can fail the first N requests with 503 (or
+fail_status, 429 say) to exercise retries. Requests with "stream": true get
+server-sent events, one chunk per word, token_delay seconds apart (non-streamed
+answers take the same total time, as if the model generated them before
+replying). The tests in tests/ run against it too.
+"""
+import sys
+import json
+import socket
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH = "/openai/v1/chat/completions"
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body, headers=()):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            failing = server.requests <= server.fail_first
+        if self.path != PATH:
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+        if failing:
+            self._send_json(server.fail_status, {"error": {"message": "stub overloaded"}}, [("Retry-After", "0")])
+            return
+        if server.latency:
+            time.sleep(server.latency)
+        prompt = request["messages"][-1]["content"]
+        answer = server.answer(prompt)
+        if request.get("stream"):
+            self._stream(request, prompt, answer)
+            return
+        time.sleep(server.token_delay * len(answer.split()))
+        self._send_json(200, {
+            "id": f"stub-{server.requests}",
+            "model": request.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(answer.split()),
+                      "total_tokens": len(prompt.split()) + len(answer.split())},
+        })
+
+    def _write_chunk(self, data):
+        payload = data.encode()
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+
+    def _event(self, body):
+        self._write_chunk(f"data: {json.dumps(body)}\n\n")
+
+    def _stream(self, request, prompt, answer):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        words = answer.split(" ")
+        base = {"id": f"stub-{self.server.requests}", "object": "chat.completion.chunk", "model": request.get("model")}
+        self._event(dict(base, choices=[{"index": 0, "delta": {"role": "assistant", "content": ""}}]))
+        for n, word in enumerate(words):
+            time.sleep(self.server.token_delay)
+            text = word if n == 0 else " " + word
+            self._event(dict(base, choices=[{"index": 0, "delta": {"content": text}, "finish_reason": None}]))
+        usage = {"prompt_tokens": len(prompt.split()), "completion_tokens": len(words),
+                 "total_tokens": len(prompt.split()) + len(words)}
+        self._event(dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}], x_groq={"usage": usage}))
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+def default_answer(prompt):
+    return f"This is the stub answer to: {prompt}. It has a second sentence. And a third one."
+
+class StubGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, port=0, latency=0.0, fail_first=0, answer=default_answer, token_delay=0.0, fail_status=503):
+        super().__init__(("localhost", port), _Handler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.answer = answer
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}{PATH}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+if __name__ == "__main__":
+    server = StubGroqServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Stub Groq API listening on {server.url}")
+    server.serve_forever()
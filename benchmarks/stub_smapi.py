@@ -0,0 +1,153 @@
+"""A local stand-in for Login with Amazon and the Skill Management API, for
+exercising endpoint_sync offline.
+
+    python -m benchmarks.stub_smapi [port]
+
+Then point Jarvis at it with SMAPI_URL=http://localhost:<port> and
+LWA_TOKEN_URL=http://localhost:<port>/auth/o2/token, plus any values for
+ALEXA_SKILL_ID, LWA_CLIENT_ID, LWA_CLIENT_SECRET and LWA_REFRESH_TOKEN. It
+serves one skill's development manifest: GET returns it with an ETag, PUT
+checks If-Match and the bearer token, and the status resource reports the
+update as IN_PROGRESS for `status_polls` polls before SUCCEEDED. Every call
+is counted in `calls`, and the If-Match of every PUT is kept in `if_match`, so
+tests can check what was (not) sent.
+"""
+import sys
+import json
+import socket
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+TOKEN_PATH = "/auth/o2/token"
+ACCESS_TOKEN = "Atza|stub-access-token"
+
+def default_manifest():
+    return {"publishingInformation": {"locales": {"en-IN": {"name": "Jarvis"}}},
+            "apis": {"custom": {"endpoint": {"uri": "https://old.example.ngrok-free.app/alexa",
+                                             "sslCertificateType": "Wildcard"}}},
+            "manifestVersion": "1.0"}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body=None, headers=()):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _authorized(self):
+        if self.headers.get("Authorization") != f"Bearer {ACCESS_TOKEN}":
+            self._send_json(401, {"message": "bad token"})
+            return False
+        return True
+
+    def _route(self, method):
+        server = self.server
+        url = urlsplit(self.path)
+        manifest_path = f"/v1/skills/{server.skill_id}/stages/development/manifest"
+        status_path = f"/v1/skills/{server.skill_id}/status"
+        with server.lock:
+            server.calls[f"{method} {url.path}"] += 1
+
+        if method == "POST" and url.path == TOKEN_PATH:
+            form = parse_qs(self._body().decode())
+            if form.get("grant_type") != ["refresh_token"] or not form.get("refresh_token"):
+                self._send_json(400, {"error": "invalid_request"})
+                return
+            self._send_json(200, {"access_token": ACCESS_TOKEN, "token_type": "bearer", "expires_in": 3600})
+            return
+        if not self._authorized():
+            return
+        if method == "GET" and url.path == manifest_path:
+            with server.lock:
+                self._send_json(200, {"manifest": server.manifest}, [("ETag", f'"{server.version}"')])
+            return
+        if method == "PUT" and url.path == manifest_path:
+            body = json.loads(self._body() or b"{}")
+            with server.lock:
+                server.if_match.append(self.headers.get("If-Match"))
+                if self.headers.get("If-Match") not in (None, f'"{server.version}"'):
+                    self._send_json(412, {"message": "manifest changed since it was read"})
+                    return
+                server.manifest = body["manifest"]
+                server.version += 1
+                server.polls_left = server.status_polls
+            self._send_json(202, headers=[("Location", status_path + "?resource=manifest")])
+            return
+        if method == "GET" and url.path == status_path:
+            with server.lock:
+                state = "IN_PROGRESS" if server.polls_left > 0 else "SUCCEEDED"
+                server.polls_left -= 1
+            self._send_json(200, {"manifest": {"lastUpdateRequest": {"status": state}}})
+            return
+        self._send_json(404, {"message": "not found"})
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+class StubSmapiServer(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0, skill_id="amzn1.ask.skill.stub", status_polls=1):
+        super().__init__(("localhost", port), _Handler)
+        self.skill_id = skill_id
+        self.status_polls = status_polls
+        self.polls_left = 0
+        self.manifest = default_manifest()
+        self.version = 1
+        self.calls = Counter()
+        self.if_match = []
+        self.lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    @property
+    def endpoint(self):
+        with self.lock:
+            return self.manifest["apis"]["custom"]["endpoint"]["uri"]
+
+    def env(self):
+        """Environment variables that point endpoint_sync at this server."""
+        return {"SMAPI_URL": self.url, "LWA_TOKEN_URL": self.url + TOKEN_PATH, "ALEXA_SKILL_ID": self.skill_id,
+                "LWA_CLIENT_ID": "stub-client", "LWA_CLIENT_SECRET": "stub-secret", "LWA_REFRESH_TOKEN": "Atzr|stub"}
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+if __name__ == "__main__":
+    server = StubSmapiServer(int(sys.argv[1]) if len(sys.argv) > 1 else 8766)
+    print(f"Stub SMAPI listening on {server.url}. Environment for Jarvis:")
+    for name, value in server.env().items():
+        print(f"  {name}={value}")
+    server.serve_forever()
@@ -0,0 +1,231 @@
+import os
+import sys
+import time
+import logging
+import threading
+import requests
+import metrics
+from tasks.store import get_store
+
+# Keeps the Alexa skill's endpoint pointed at the current ngrok URL.
+#
+# The last URL published successfully is kept in STATE_FILE. When ngrok hands
+# out the same URL again, nothing is sent at all. Otherwise the skill manifest
+# is updated through the Skill Management API (SMAPI): plain HTTPS calls that
+# take a second or two. Browser automation (update_alexa_endpoint, which
+# needs selenium and Chrome) is only used when no SMAPI credentials are
+# configured.
+#
+# SMAPI needs a Login with Amazon security profile and a refresh token for it,
+# e.g. from `ask util generate-lwa-tokens`, set in .env as ALEXA_SKILL_ID,
+# LWA_CLIENT_ID, LWA_CLIENT_SECRET and LWA_REFRESH_TOKEN. SMAPI_URL and
+# LWA_TOKEN_URL point elsewhere for testing (see benchmarks/stub_smapi.py).
+#
+# sync_in_background() runs the sync on its own thread so the server can
+# take requests straight away. If several URLs are requested while a sync
+# is running, only the newest is published.
+
+log = logging.getLogger("jarvis.endpoint")
+
+STATE_FILE = os.path.join("data", "alexa_endpoint.json")
+SKILL_STAGE = "development"
+SSL_CERTIFICATE_TYPE = "Wildcard"     # ngrok URLs are covered by ngrok's wildcard certificate
+TIMEOUT = (3.05, 15)                  # (connect, read) seconds
+STATUS_POLL_SECONDS = 1.0
+STATUS_TIMEOUT_SECONDS = 60
+RETRY_SECONDS = (15, 60, 300)         # waits between attempts after a failed sync
+
+state_store = get_store(STATE_FILE)
+
+class EndpointSyncError(Exception):
+    pass
+
+def last_published():
+    """The URL the skill was last pointed at by this machine, or None."""
+    return state_store.get("url")
+
+def remember_published(url, method):
+    state_store.set("url", url)
+    state_store.set("method", method)
+    state_store.set("published_at", time.time())
+    state_store.flush()  # it must survive a crash right after, or the next boot publishes again
+
+def smapi_settings():
+    """SMAPI settings from the environment, or None if any are missing."""
+    settings = {
+        "skill_id": os.getenv("ALEXA_SKILL_ID"),
+        "client_id": os.getenv("LWA_CLIENT_ID"),
+        "client_secret": os.getenv("LWA_CLIENT_SECRET"),
+        "refresh_token": os.getenv("LWA_REFRESH_TOKEN"),
+    }
+    if not all(settings.values()):
+        return None
+    settings["base_url"] = os.getenv("SMAPI_URL", "https://api.amazonalexa.com")
+    settings["token_url"] = os.getenv("LWA_TOKEN_URL", "https://api.amazon.com/auth/o2/token")
+    return settings
+
+class SmapiClient:
+    def __init__(self, skill_id, client_id, client_secret, refresh_token, base_url, token_url):
+        self.skill_id = skill_id
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.base_url = base_url.rstrip("/")
+        self.token_url = token_url
+        self.session = requests.Session()
+        self._token = None
+        self._token_expires = 0.0
+
+    def _access_token(self):
+        if self._token is None or time.time() >= self._token_expires:
+            response = self.session.post(self.token_url, timeout=TIMEOUT, data={
+                "grant_type": "refresh_token",
+                "refresh_token": self.refresh_token,
+                "client_id": self.client_id,
+                "client_secret": self.client_secret,
+            })
+            if response.status_code != 200:
+                raise EndpointSyncError(f"Login with Amazon refused the refresh token ({response.status_code}): "
+                                        f"{response.text[:200]}")
+            body = response.json()
+            self._token = body["access_token"]
+            self._token_expires = time.time() + body.get("expires_in", 3600) - 60
+        return self._token
+
+    def _call(self, method, path, expect, **kwargs):
+        headers = kwargs.pop("headers", {})
+        headers["Authorization"] = f"Bearer {self._access_token()}"
+        response = self.session.request(method, self.base_url + path, headers=headers, timeout=TIMEOUT, **kwargs)
+        if response.status_code != expect:
+            raise EndpointSyncError(f"SMAPI {method} {path} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    def _manifest_path(self):
+        return f"/v1/skills/{self.skill_id}/stages/{SKILL_STAGE}/manifest"
+
+    def _wait_for_manifest(self):
+        deadline = time.monotonic() + STATUS_TIMEOUT_SECONDS
+        while True:
+            status = self._call("GET", f"/v1/skills/{self.skill_id}/status", 200,
+                                params={"resource": "manifest"}).json()
+            update = status.get("manifest", {}).get("lastUpdateRequest", {})
+            if update.get("status") == "SUCCEEDED":
+                return
+            if update.get("status") == "FAILED":
+                raise EndpointSyncError(f"SMAPI rejected the manifest: {update.get('errors')}")
+            if time.monotonic() >= deadline:
+                raise EndpointSyncError("SMAPI did not finish the manifest update in time")
+            time.sleep(STATUS_POLL_SECONDS)
+
+    def set_endpoint(self, url):
+        """Point the skill's custom endpoint at url. Returns False if it already was."""
+        response = self._call("GET", self._manifest_path(), 200)
+        manifest = response.json()["manifest"]
+        custom = manifest.setdefault("apis", {}).setdefault("custom", {})
+        if (custom.get("endpoint") or {}).get("uri") == url:
+            return False
+        custom["endpoint"] = {"uri": url, "sslCertificateType": SSL_CERTIFICATE_TYPE}
+        headers = {"If-Match": response.headers["ETag"]} if "ETag" in response.headers else {}
+        self._call("PUT", self._manifest_path(), 202, json={"manifest": manifest}, headers=headers)
+        self._wait_for_manifest()
+        return True
+
+def publish_endpoint(url):
+    """Point the skill at url through SMAPI, or the browser when SMAPI isn't set up. Returns which was used."""
+    settings = smapi_settings()
+    if settings is not None:
+        SmapiClient(**settings).set_endpoint(url)
+        return "smapi"
+    log.warning("SMAPI credentials are not set (see endpoint_sync.py); updating the endpoint in the browser")
+    from update_alexa_endpoint import update_alexa_endpoint  # pulls in selenium
+    update_alexa_endpoint(url)
+    return "browser"
+
+def sync_endpoint(url, force=False):
+    """Make sure the skill points at url. Returns "unchanged", "smapi" or "browser"."""
+    if not force and url == last_published():
+        log.info("Alexa endpoint already points at %s", url)
+        return "unchanged"
+    started = time.perf_counter()
+    method = publish_endpoint(url)
+    remember_published(url, method)
+    log.info("Alexa endpoint set to %s via %s in %.1fs", url, method, time.perf_counter() - started)
+    return method
+
+class EndpointSyncer:
+    """Runs sync_endpoint on a background thread, always for the newest URL asked for."""
+
+    def __init__(self):
+        self._wanted = None
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread = None
+        self.last_result = None
+        self.last_error = None
+
+    def request(self, url):
+        with self._cond:
+            self._wanted = url
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="endpoint-sync", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def wait(self, timeout=None):
+        """Block until no sync is running or waiting. Returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._wanted is None and not self._busy, timeout)
+
+    def _run(self):
+        failures = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._wanted is not None)
+                url, self._wanted = self._wanted, None
+                self._busy = True
+            try:
+                self.last_result = sync_endpoint(url)
+                self.last_error = None
+                failures = 0
+                metrics.inc("jarvis_endpoint_sync_total", result=self.last_result)
+            except Exception as e:
+                self.last_error = e
+                metrics.inc("jarvis_endpoint_sync_total", result="error")
+                delay = RETRY_SECONDS[min(failures, len(RETRY_SECONDS) - 1)]
+                failures += 1
+                log.error("Could not update the Alexa endpoint to %s (retrying in %gs): %s", url, delay, e)
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+                    # Retry unless a newer URL turns up in the meantime
+                    if not self._cond.wait_for(lambda: self._wanted is not None, delay):
+                        self._wanted = url
+                continue
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+_syncer = None
+_syncer_lock = threading.Lock()
+
+def get_syncer():
+    global _syncer
+    with _syncer_lock:
+        if _syncer is None:
+            _syncer = EndpointSyncer()
+        return _syncer
+
+def sync_in_background(url):
+    get_syncer().request(url)
+
+if __name__ == "__main__":
+    # python endpoint_sync.py <url> [--force]
+    from dotenv import load_dotenv
+    from jarvis_logging import configure_logging
+    load_dotenv()
+    configure_logging()
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    url = args[0] if args else os.getenv("NGROK_PUBLIC_URL")
+    if not url:
+        sys.exit("usage: python endpoint_sync.py <url> [--force]")
+    print(sync_endpoint(url, force="--force" in sys.argv))
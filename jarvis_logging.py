@@ -0,0 +1,50 @@
+import os
+import sys
+import json
+import time
+import logging
+
+# Logging setup for the Alexa server. Records are written one JSON object per
+# line (or as plain text with JARVIS_LOG_FORMAT=text), and the level comes from
+# JARVIS_LOG_LEVEL (default INFO). Callers pass structured data through
+# extra={"fields": {...}}; anything costly to build, like a pretty-printed
+# request body, should sit behind log.isEnabledFor(logging.DEBUG) so it's only
+# serialized when debug logging is actually on.
+
+LOG_LEVEL = os.getenv("JARVIS_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("JARVIS_LOG_FORMAT", "json")
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        text = super().format(record)
+        fields = getattr(record, "fields", None)
+        if fields:
+            text += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return text
+
+def configure_logging(level=LOG_LEVEL, fmt=LOG_FORMAT):
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+    root = logging.getLogger("jarvis")
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    root.propagate = False
+    return root
@@ -1,20 +1,29 @@
-from speech_module import listen, speak
-from tasks.youtube_task import handle_youtube
-from tasks.media_task import handle_media
-from tasks.system_task import handle_system
-from tasks.todo_task import handle_todo
-from tasks.reminder_task import handle_reminder, schedule_existing_reminders
-from tasks.picture_task import handle_pictures  # ✅ Added
+import startup_profiler  # keep first so it can time every import below
+from speech_module import listen, speak, get_engine, prewarm
+from tasks.router import compile_intents, match_intents, prepare
+from tasks import engine
+from tasks import intents  # registers trigger phrases; task modules load on first use
+from tasks.reminder_task import schedule_existing_reminders
+import ui_service
+from dotenv import load_dotenv
 import os
 import subprocess
 import atexit
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+load_dotenv()
 
 # Suppress ALSA / JACK warnings
 devnull = os.open(os.devnull, os.O_WRONLY)
 os.dup2(devnull, 2)
 
+# Build the intent matcher once, before the first command comes in
+with startup_profiler.mark("compile_intents"):
+    compile_intents()
+
 # Schedule all saved reminders on startup
-schedule_existing_reminders()
+with startup_profiler.mark("schedule_existing_reminders"):
+    schedule_existing_reminders()
 
 # Start gnome-session-inhibit to prevent suspend/lock
 inhibitor_process = subprocess.Popen([
@@ -36,36 +45,68 @@ def cleanup():
 
 atexit.register(cleanup)
 
+QUICK_RESULT_SECONDS = 0.3
+
+def report_result(command, future):
+    if future.exception() is None:
+        intent = future.result()
+        if intent:
+            print(f"[PROCESS DEBUG] Handled by: {intent}")
+        else:
+            print(f"[PROCESS DEBUG] No handler took: {command}")
+
 def process_command(command):
     print(f"[PROCESS DEBUG] Trying to process command: {command}")
-    if handle_youtube(command):
-        print("[PROCESS DEBUG] Handled by: YouTube Task")
-        return True
-    if handle_media(command):
-        print("[PROCESS DEBUG] Handled by: Media Task")
-        return True
-    if handle_system(command):
-        print("[PROCESS DEBUG] Handled by: System Task")
-        return True
-    if handle_todo(command):
-        print("[PROCESS DEBUG] Handled by: To-Do Task")
+    if not match_intents(command.lower().strip()):
+        return False
+    try:
+        future = engine.submit(command)
+    except engine.EngineBusy as e:
+        print(f"[PROCESS DEBUG] Dropped {command!r}: {e}")
         return True
-    if handle_reminder(command):
-        print("[PROCESS DEBUG] Handled by: Reminder Task")
+    future.add_done_callback(lambda f: report_result(command, f))
+    # The loop goes back to listening while long commands (YouTube, slideshows)
+    # run. Handlers that turn a command down do so at once, so a short wait is
+    # enough to still say "didn't understand" in that case.
+    try:
+        return future.result(timeout=QUICK_RESULT_SECONDS) is not None
+    except FutureTimeout:
         return True
-    if handle_pictures(command):  # ✅ NEW HANDLER
-        print("[PROCESS DEBUG] Handled by: Picture Task")
+    except Exception:
         return True
-    return False
+
+# Partial transcripts come in while the user is still talking. The task module
+# their intent needs is imported meanwhile, off the capture thread so no audio
+# is dropped; the command itself only runs once it is final.
+_preparer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prepare")
+
+def on_partial(text):
+    print(f"[LISTEN DEBUG] Partial: {text}")
+    _preparer.submit(prepare, text)
+
+def answer_with_groq(command):
+    # Imported here so startup doesn't pay for requests unless a question comes in
+    from tasks.groq_handler import stream_groq_answer
+    stream_groq_answer(command, speak)
 
 def main():
+    with startup_profiler.mark("tts engine init"):
+        get_engine()
+    prewarm()  # fixed responses are rendered to the TTS cache in the background
+    with startup_profiler.mark("ui service"):
+        ui_service.start()  # so the first popup doesn't pay for starting Tk
+    startup_profiler.report("Voice loop startup")
     speak("Jarvis ready. Say 'ok jarvis' or 'ok bro' followed by your command.")
     while True:
-        command = listen()
+        command = listen(on_partial=on_partial)
         print(f"[MAIN DEBUG] Final returned command: '{command}'")
         if command:
             if not process_command(command.strip()):
-                speak("Sorry, I didn't understand that command.")
+                if os.getenv("GROQ_API_KEY"):
+                    # Not a local command: ask the LLM, speaking each sentence as it arrives
+                    answer_with_groq(command)
+                else:
+                    speak("Sorry, I didn't understand that command.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,88 @@
+import os
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Process-wide counters and latency histograms, rendered in the Prometheus
+# text format. Names and labels are free-form; a series appears the first
+# time it is incremented or observed, so label values must come from a small
+# fixed set (never straight from a request), or the series grow without end.
+#
+# serve() exposes them at /metrics on their own port, bound to loopback. The
+# Alexa server's port is the one ngrok makes public, so it doesn't serve them.
+
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.getenv("JARVIS_METRICS_PORT", "5001"))
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 6.5, 8.0, 15.0)
+
+_lock = threading.Lock()
+_counters = {}    # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., count, sum]
+
+def _key(name, labels):
+    # Values are kept as strings so keys always sort, whatever a caller passes (None, say)
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def inc(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def observe(name, seconds, **labels):
+    key = _key(name, labels)
+    with _lock:
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(LATENCY_BUCKETS) + 2)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += seconds
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def render():
+    """All series in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(series)) for key, series in _histograms.items())
+    lines = []
+    for (name, labels), value in counters:
+        lines.append(f"{name}{_labels(labels)} {value}")
+    for (name, labels), series in histograms:
+        for bound, count in zip(LATENCY_BUCKETS, series):
+            lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {series[-2]}")
+        lines.append(f"{name}_count{_labels(labels)} {series[-2]}")
+        lines.append(f"{name}_sum{_labels(labels)} {series[-1]:.6f}")
+    return "\n".join(lines) + "\n"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # a scrape every few seconds would flood the console
+
+def serve(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on host:port from a daemon thread. Returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,77 @@
+import os
+import json
+from tasks import sqlite_store
+from tasks.reminder_scheduler import next_fire_time
+
+# One-shot copy of the old JSON to-do and reminder files into the SQLite store.
+# Run from the project root:  python migrate_json_to_sqlite.py
+# Afterwards start Jarvis with JARVIS_STORAGE=sqlite. The JSON files are left in
+# place; running this again does nothing unless you pass --force.
+
+TODO_FILES = ["todo_list.json", "todo_data.json",
+              os.path.join("tasks", "todo_list.json"), os.path.join("tasks", "todo_data.json")]
+REMINDER_FILES = [os.path.join("tasks", "reminders.json")]
+
+MIGRATION_KEY = "migrated_from_json"
+
+def read_json(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except json.JSONDecodeError as e:
+        print(f"[MIGRATE] Skipping {path}: not valid JSON ({e})")
+        return None
+
+def wanted_id(key, prefix, taken):
+    """Keep the old number ("task-3" -> 3) unless another file already used it."""
+    number = key[len(prefix):] if key.startswith(prefix) else ""
+    if number.isdigit() and int(number) not in taken:
+        return int(number)
+    return None
+
+def migrate_todos():
+    taken = {n for n, _ in sqlite_store.list_todos()}
+    count = 0
+    for path in TODO_FILES:
+        data = read_json(path)
+        if data is None:
+            continue
+        # todo_list.json files are {"task-1": "text"}; todo_data.json files are plain lists
+        entries = data.items() if isinstance(data, dict) else [("", text) for text in data]
+        for key, text in entries:
+            new_id = sqlite_store.add_todo(text, todo_id=wanted_id(key, "task-", taken))
+            taken.add(new_id)
+            count += 1
+        print(f"[MIGRATE] {path}: {len(data)} to-do(s)")
+    return count
+
+def migrate_reminders():
+    taken = {n for n, _ in sqlite_store.list_reminders()}
+    count = 0
+    for path in REMINDER_FILES:
+        data = read_json(path)
+        if not isinstance(data, dict):
+            continue
+        for key, info in data.items():
+            fire_at = next_fire_time(info)
+            new_id = sqlite_store.add_reminder(info, fire_at.timestamp() if fire_at else None,
+                                               reminder_id=wanted_id(key, "reminder-", taken))
+            taken.add(new_id)
+            count += 1
+        print(f"[MIGRATE] {path}: {len(data)} reminder(s)")
+    return count
+
+def migrate(force=False):
+    if sqlite_store.get_meta(MIGRATION_KEY) and not force:
+        print(f"[MIGRATE] {sqlite_store.DB_FILE} was already migrated. Use --force to import again.")
+        return
+    todos = migrate_todos()
+    reminders = migrate_reminders()
+    sqlite_store.set_meta(MIGRATION_KEY, "1")
+    print(f"[MIGRATE] Done: {todos} to-do(s) and {reminders} reminder(s) in {sqlite_store.DB_FILE}")
+
+if __name__ == "__main__":
+    import sys
+    migrate(force="--force" in sys.argv)
@@ -0,0 +1,218 @@
+import os
+import json
+import threading
+
+# Speech-to-text backends. Every backend turns 16-bit mono PCM into text
+# through the same small interface:
+#
+#     stream = backend.start(sample_rate)
+#     stream.feed(pcm)      # as audio arrives; returns the partial text so far, or None
+#     text = stream.finish()
+#
+# "google" is the free Google Web Speech API that speech_recognition wraps. It
+# only sees the audio once the utterance is over, so it has no partials and
+# needs the network. "vosk" runs a Kaldi model on the CPU. It decodes while
+# the user is still speaking and reports partial hypotheses as it goes, so
+# finish() has little left to do, and it works offline. Download a model from
+# https://alphacephei.com/vosk/models (vosk-model-small-en-us is about 40 MB)
+# and unpack it to VOSK_MODEL_PATH.
+#
+# Vosk writes everything out as lowercase words with no punctuation: "okay
+# jarvis", "remove task five", "at five thirty p m". normalize_vosk() turns
+# that into what Google returns and the handlers parse ("ok jarvis", "remove
+# task 5", "at 5:30 pm"). Only times and the numbers after "task" or
+# "reminder" become digits; other number words are left as words.
+#
+# JARVIS_STT picks the backend. If it is unavailable (package or model
+# missing), google is used. When google can't be reached and vosk is set up,
+# speech_module retries the utterance on vosk.
+
+BACKEND = os.getenv("JARVIS_STT", "google")
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join("data", "vosk-model"))
+
+class NoSpeechError(Exception):
+    """The audio held no words the backend could make out."""
+
+class BackendUnavailable(Exception):
+    """The backend can't run here (package or model missing, no network)."""
+
+_SMALL_NUMBERS = {word: n for n, word in enumerate(
+    "zero one two three four five six seven eight nine ten eleven twelve thirteen "
+    "fourteen fifteen sixteen seventeen eighteen nineteen".split())}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+         "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90}
+_NUMBERED = ("task", "reminder")
+
+def _number(words, i):
+    """(value, index after it) for a spelled-out number 0-99 at words[i], or (None, i)."""
+    word = words[i] if i < len(words) else None
+    if word in _SMALL_NUMBERS:
+        return _SMALL_NUMBERS[word], i + 1
+    if word in _TENS:
+        unit = words[i + 1] if i + 1 < len(words) else None
+        if unit in _SMALL_NUMBERS and 1 <= _SMALL_NUMBERS[unit] <= 9:
+            return _TENS[word] + _SMALL_NUMBERS[unit], i + 2
+        return _TENS[word], i + 1
+    return None, i
+
+def _minutes(words, i):
+    """(minutes, index after them) for "o'clock", "oh five" or "thirty five" at words[i], or (None, i)."""
+    word = words[i] if i < len(words) else None
+    if word == "o'clock":
+        return 0, i + 1
+    if word in ("oh", "o"):
+        value, end = _number(words, i + 1)
+        return (value, end) if value is not None and 1 <= value <= 9 else (None, i)
+    value, end = _number(words, i)
+    return (value, end) if value is not None and 10 <= value <= 59 else (None, i)
+
+def _meridiem(words, i):
+    """("am" or "pm", index after it) for "a m", "p m", "am" or "pm" at words[i], or (None, i)."""
+    if words[i:i + 2] in (["a", "m"], ["p", "m"]):
+        return words[i] + "m", i + 2
+    if i < len(words) and words[i] in ("am", "pm"):
+        return words[i], i + 1
+    return None, i
+
+def normalize_vosk(text):
+    """Vosk's spelled-out transcript in the form Google gives and the handlers expect."""
+    words = text.split()
+    out = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word == "okay":
+            out.append("ok")
+            i += 1
+            continue
+        if words[i:i + 2] == ["o", "k"]:
+            out.append("ok")
+            i += 2
+            continue
+        value, end = _number(words, i)
+        if value is None:
+            out.append(word)
+            i += 1
+            continue
+        token = None
+        if 1 <= value <= 12:
+            minutes, after_minutes = _minutes(words, end)
+            meridiem, after = _meridiem(words, after_minutes)
+            if minutes is not None or meridiem is not None:
+                token = f"{value}:{minutes or 0:02d}" + (f" {meridiem}" if meridiem else "")
+                end = after
+        if token is None:
+            if not out or out[-1] not in _NUMBERED:
+                out.append(word)
+                i += 1
+                continue
+            token = str(value)
+        out.append(token)
+        i = end
+    return " ".join(out)
+
+class GoogleStream:
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.pcm = bytearray()
+
+    def feed(self, pcm):
+        self.pcm += pcm
+        return None
+
+    def finish(self):
+        import speech_recognition as sr
+        audio = sr.AudioData(bytes(self.pcm), self.sample_rate, 2)
+        try:
+            return sr.Recognizer().recognize_google(audio).lower()
+        except sr.UnknownValueError:
+            raise NoSpeechError("Google could not understand the audio")
+        except sr.RequestError as e:
+            raise BackendUnavailable(f"Google API error: {e}")
+
+class GoogleBackend:
+    name = "google"
+    streaming = False
+
+    def start(self, sample_rate):
+        return GoogleStream(sample_rate)
+
+class VoskStream:
+    def __init__(self, model, sample_rate):
+        from vosk import KaldiRecognizer
+        self._recognizer = KaldiRecognizer(model, sample_rate)
+        self._done = []        # text of segments vosk has already closed
+        self.partial = ""
+
+    def feed(self, pcm):
+        if self._recognizer.AcceptWaveform(bytes(pcm)):
+            text = json.loads(self._recognizer.Result()).get("text", "")
+            if text:
+                self._done.append(text)
+            current = ""
+        else:
+            current = json.loads(self._recognizer.PartialResult()).get("partial", "")
+        partial = normalize_vosk(" ".join(self._done + ([current] if current else [])))
+        if partial == self.partial:
+            return None
+        self.partial = partial
+        return partial
+
+    def finish(self):
+        text = json.loads(self._recognizer.FinalResult()).get("text", "")
+        text = normalize_vosk(" ".join(self._done + ([text] if text else [])))
+        if not text:
+            raise NoSpeechError("Vosk heard no words")
+        return text
+
+class VoskBackend:
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        try:
+            import vosk
+        except ImportError:
+            raise BackendUnavailable("vosk is not installed (pip install vosk)")
+        if not os.path.isdir(model_path):
+            raise BackendUnavailable(f"No Vosk model at {model_path}")
+        vosk.SetLogLevel(-1)
+        self.model = vosk.Model(model_path)  # a few hundred ms; done once
+
+    def start(self, sample_rate):
+        return VoskStream(self.model, sample_rate)
+
+BACKENDS = {"google": GoogleBackend, "vosk": VoskBackend}
+
+_backends = {}
+_lock = threading.Lock()
+
+def get_backend(name=None):
+    """The backend called `name` (default JARVIS_STT), falling back to google if it can't run."""
+    name = name or BACKEND
+    with _lock:
+        if name not in _backends:
+            try:
+                _backends[name] = BACKENDS[name]()
+            except KeyError:
+                raise ValueError(f"Unknown speech backend {name!r}; choose from {', '.join(BACKENDS)}")
+            except BackendUnavailable as e:
+                if name == "google":
+                    raise
+                print(f"[STT ERROR] {name} backend unavailable, using google: {e}")
+                _backends[name] = GoogleBackend()
+        return _backends[name]
+
+def offline_backend():
+    """A local backend that can take over when the network is down, or None."""
+    try:
+        backend = get_backend("vosk")
+    except BackendUnavailable:
+        return None
+    return backend if backend.name == "vosk" else None
+
+def transcribe(pcm, sample_rate, backend=None):
+    """Whole-utterance convenience: feed everything, return the final text."""
+    stream = (backend or get_backend()).start(sample_rate)
+    stream.feed(pcm)
+    return stream.finish()
@@ -1,7 +1,7 @@
 import os
-import tkinter as tk
 import threading
 import simpleaudio as sa
+import ui_service
 
 ALARM_SOUND = "/usr/share/sounds/alsa/Front_Center.wav"  # Replace with louder .wav if needed
 
@@ -14,17 +14,7 @@ def play_alarm():
         print("Error playing alarm:", e)
 
 def show_reminder_popup(message):
-    def show():
-        root = tk.Tk()
-        root.title("Reminder")
-        root.attributes('-topmost', True)
-        root.attributes('-fullscreen', True)
-        label = tk.Label(root, text=message, font=("Helvetica", 20), fg="white", bg="black", wraplength=1000)
-        label.pack(padx=20, pady=20, expand=True)
-        root.after(10000, root.destroy)
-        root.mainloop()
-
-    threading.Thread(target=show).start()
+    return ui_service.show_alert(message, close_after=10)
 
 def trigger_reminder(message):
     threading.Thread(target=play_alarm).start()
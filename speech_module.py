@@ -1,95 +1,465 @@
-import speech_recognition as sr
-import pyttsx3
+import math
 import time
-import subprocess
-import simpleaudio as sa
+import queue
+import itertools
+import threading
+from array import array
+import audio_ducking
+import audio_capture
+import wake_word
+import tts_cache
+import recognizers
 
-recognizer = sr.Recognizer()
-engine = pyttsx3.init()
+# pyttsx3, speech_recognition and simpleaudio are slow to import and pyttsx3.init()
+# enumerates every installed voice, so they are loaded on first use instead of
+# when this module is imported.
+recognizer = None
+engine = None
+microphone = None
+_init_lock = threading.Lock()
+_engine_lock = threading.Lock()  # pyttsx3 can't run two utterances at once
 
-# Configure voice
-engine.setProperty('rate', 160)
-engine.setProperty('volume', 1.0)
-for voice in engine.getProperty('voices'):
-    if 'english' in voice.name.lower() and 'female' in voice.name.lower():
-        engine.setProperty('voice', voice.id)
-        break
+def get_engine():
+    global engine
+    with _init_lock:
+        if engine is not None:
+            return engine
+        import pyttsx3
+        engine = pyttsx3.init()
 
-# Volume control for VLC via pactl
+        # Configure voice
+        engine.setProperty('rate', 160)
+        engine.setProperty('volume', 1.0)
+        for voice in engine.getProperty('voices'):
+            if 'english' in voice.name.lower() and 'female' in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        return engine
+
+def get_recognizer():
+    global recognizer
+    with _init_lock:
+        if recognizer is None:
+            import speech_recognition as sr
+            recognizer = sr.Recognizer()
+        return recognizer
+
+def get_microphone():
+    """The shared capture thread, (re)started if it isn't running."""
+    global microphone
+    with _init_lock:
+        if microphone is None or not microphone.running:
+            microphone = audio_capture.MicrophoneCapture().start()
+        return microphone
+
+def ring_source(mic):
+    """An sr.AudioSource reading from the capture ring, starting at the live edge.
+
+    speech_recognition keeps every chunk it reads, so its stream gets a copy of
+    each; Jarvis's own loops read source.cursor directly and copy nothing.
+    """
+    import speech_recognition as sr
+
+    class RingSource(sr.AudioSource):
+        def __init__(self):
+            self.SAMPLE_RATE = mic.sample_rate
+            self.SAMPLE_WIDTH = mic.sample_width
+            self.CHUNK = mic.chunk
+            self.cursor = mic.cursor()
+            self.stream = self
+
+        def read(self, size=None):
+            return bytes(self.cursor.read())
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    return RingSource()
+
+# Volume control for VLC via pactl; see audio_ducking for the caching and ramping
 def get_vlc_sink_id():
-    try:
-        output = subprocess.check_output("pactl list sink-inputs", shell=True).decode()
-        blocks = output.split("Sink Input #")[1:]
-        for block in blocks:
-            if "vlc" in block.lower():
-                return block.split('\n')[0].strip()
-    except Exception as e:
-        print(f"[DEBUG] Error finding VLC sink ID: {e}")
-    return "0"
+    sinks = audio_ducking.get_vlc_sinks()
+    return sinks[0]["id"] if sinks else "0"
 
 def lower_vlc_volume():
-    print("[DEBUG] Lowering VLC volume to 30%")
-    subprocess.run(["pactl", "set-sink-input-volume", get_vlc_sink_id(), "30%"])
+    print(f"[DEBUG] Lowering VLC volume to {audio_ducking.DUCK_VOLUME}%")
+    audio_ducking.duck()
 
 def restore_vlc_volume():
-    print("[DEBUG] Restoring VLC volume to 80%")
-    subprocess.run(["pactl", "set-sink-input-volume", get_vlc_sink_id(), "80%"])
+    print("[DEBUG] Restoring VLC volume")
+    audio_ducking.restore()
+
+BEEP_FILE = "beep.wav"
+_beep = None
 
 def play_beep():
+    """Start the beep and return straight away; returns its length in seconds (0 if it can't play)."""
+    global _beep
     try:
+        import simpleaudio as sa
+        if _beep is None:
+            _beep = sa.WaveObject.from_wave_file(BEEP_FILE)
         print("[DEBUG] Playing beep")
-        wave_obj = sa.WaveObject.from_wave_file("beep.wav")
-        wave_obj.play()
+        _beep.play()
+        return len(_beep.audio_data) / (_beep.sample_rate * _beep.num_channels * _beep.bytes_per_sample)
     except Exception as e:
         print(f"[DEBUG] Beep Error: {e}")
+        return 0
+
+def _voice_settings():
+    engine = get_engine()
+    return engine.getProperty('voice'), engine.getProperty('rate')
+
+def _render(text, path):
+    engine = get_engine()
+    with _engine_lock:
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+
+def _cached_clip(text):
+    """Path of a pre-rendered clip for text, rendering it first if it's worth caching. None otherwise."""
+    voice, rate = _voice_settings()
+    path = tts_cache.lookup(text, voice, rate)
+    if path is None and tts_cache.should_cache(text):
+        path = tts_cache.store(text, voice, rate, lambda tmp_path: _render(text, tmp_path))
+    return path
+
+# Speech output runs on one worker thread fed by a priority queue, so handlers
+# (and Flask requests into alexa_handler) return as soon as their text is
+# queued. Consecutive short items that have no cached clip are merged into one
+# utterance, which saves the engine's start-up gap between them. interrupt()
+# stops whatever is playing and drops everything queued before it; listen()
+# calls it when the wake word is heard.
+
+PRIORITY_URGENT = 0     # reminders going off
+PRIORITY_NORMAL = 10
+MERGE_MAX_CHARS = 60    # items longer than this are spoken on their own
+MERGE_LIMIT_CHARS = 240
+
+_speech_queue = queue.PriorityQueue()
+_speech_seq = itertools.count()
+_speech_lock = threading.Lock()
+_speech_idle = threading.Condition(_speech_lock)
+_speech_worker = None
+_speech_generation = 0
+_speech_pending = 0
+_playing = None  # simpleaudio PlayObject currently playing, if any
+
+def play_clip(path):
+    global _playing
+    import simpleaudio as sa
+    play = sa.WaveObject.from_wave_file(path).play()
+    _playing = play
+    try:
+        play.wait_done()
+    finally:
+        _playing = None
+
+def _say(text, generation):
+    try:
+        path = _cached_clip(text)
+        if path is not None:
+            play_clip(path)
+            return
+    except Exception as e:
+        print(f"[DEBUG] TTS cache unavailable, speaking directly: {e}")
+    if generation != _speech_generation:
+        return  # interrupted while the clip was being rendered
+    engine = get_engine()
+    with _engine_lock:
+        engine.say(text)
+        engine.runAndWait()
+
+def _mergeable(text):
+    return len(text) <= MERGE_MAX_CHARS and not tts_cache.is_known(text)
+
+def _next_utterance():
+    """Take the next item off the queue, merged with any short items queued right behind it."""
+    priority, seq, generation, text, done = _speech_queue.get()
+    texts, events = [text], [done]
+    if _mergeable(text):
+        held = []
+        while sum(len(t) for t in texts) < MERGE_LIMIT_CHARS:
+            try:
+                item = _speech_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] != priority or item[2] != generation or not _mergeable(item[3]):
+                held.append(item)
+                break
+            texts.append(item[3])
+            events.append(item[4])
+        for item in held:
+            _speech_queue.put(item)
+    if len(texts) > 1:
+        texts = [t if t.endswith((".", "!", "?")) else t + "." for t in texts]
+    return generation, " ".join(texts), events
 
-def speak(text):
+def _speech_loop():
+    global _speech_pending
+    while True:
+        generation, text, events = _next_utterance()
+        try:
+            if generation == _speech_generation:
+                _say(text, generation)
+        except Exception as e:
+            print(f"[DEBUG] Speech error: {e}")
+        finally:
+            for done in events:
+                done.set()
+            with _speech_lock:
+                _speech_pending -= len(events)
+                if _speech_pending == 0:
+                    _speech_idle.notify_all()
+
+def speak_async(text, priority=PRIORITY_NORMAL):
+    """Queue text to be spoken and return at once. The returned Event is set once it has been spoken (or dropped)."""
+    global _speech_worker, _speech_pending
     print(f"[Jarvis says] {text}")
-    engine.say(text)
-    engine.runAndWait()
+    done = threading.Event()
+    with _speech_lock:
+        if _speech_worker is None:
+            _speech_worker = threading.Thread(target=_speech_loop, daemon=True)
+            _speech_worker.start()
+        _speech_pending += 1
+        _speech_queue.put((priority, next(_speech_seq), _speech_generation, text, done))
+    return done
+
+def speak(text, priority=PRIORITY_NORMAL, wait=False):
+    """Queue text on the speech worker; with wait=True, also block until it has been spoken."""
+    done = speak_async(text, priority)
+    if wait:
+        done.wait()
+
+def interrupt():
+    """Stop the current utterance and drop everything queued so far."""
+    global _speech_generation
+    with _speech_lock:
+        _speech_generation += 1
+        if _speech_pending == 0:
+            return
+    print("[DEBUG] Speech interrupted")
+    playing = _playing
+    if playing is not None:
+        playing.stop()
+    elif engine is not None:
+        engine.stop()
+
+def wait_until_quiet(timeout=None):
+    """Block until nothing is queued or being spoken. Returns False on timeout."""
+    with _speech_lock:
+        return _speech_idle.wait_for(lambda: _speech_pending == 0, timeout)
+
+def prewarm(phrases=tts_cache.KNOWN_PHRASES):
+    """Render the fixed responses into the TTS cache in a background thread."""
+    def run():
+        started = time.perf_counter()
+        rendered = 0
+        voice, rate = _voice_settings()
+        for text in phrases:
+            if tts_cache.lookup(text, voice, rate) is not None:
+                continue
+            try:
+                # One phrase per engine lock, so speak() is never stuck behind the whole list
+                tts_cache.store(text, voice, rate, lambda tmp_path: _render(text, tmp_path))
+                rendered += 1
+            except Exception as e:
+                print(f"[DEBUG] Could not pre-render {text!r}: {e}")
+                return
+        print(f"[DEBUG] TTS cache warm: {rendered} phrase(s) rendered in {time.perf_counter() - started:.1f}s")
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+# listen() is a small state machine. The microphone stays open between calls:
+# a capture thread (audio_capture) fills a ring buffer and listen() reads it
+# through a cursor. So detecting the wake word never holds up capture, and the
+# command can be read from where the wake phrase ended instead of from
+# whenever detection and the beep finished.
+# Ambient calibration runs once, the first
+# time; after that the energy threshold follows the room continuously (the local
+# wake-word detector's noise floor, or speech_recognition's own dynamic
+# threshold). The beep plays while capture is already running, and the time
+# spent in every state is logged so slow stages stand out.
+#
+# Command audio is fed to the speech backend (recognizers.py) chunk by chunk
+# while it is captured. A streaming backend decodes as it goes and passes
+# partial transcripts to listen()'s on_partial callback, so by the time the
+# user stops talking there is little left to do.
+
+CALIBRATE = "calibrate"
+WAKE = "wake"
+CAPTURE = "capture"
+RECOGNIZE = "recognize"
+DONE = "done"
+
+CALIBRATION_SECONDS = 1
+PHRASE_TIMEOUT_SECONDS = 10     # give up if no command starts within this
+PHRASE_LIMIT_SECONDS = 100
+
+_calibrated = False
+last_timings = {}
+
+def wait_for_wake_word(source, detector, recognizer=None):
+    """Read raw microphone frames until the local detector hears the wake word; blocks until then."""
+    detector.reset()
+    while True:
+        if detector.process(source.cursor.read()):
+            print(f"🎙️ [DEBUG] Wake word detected locally (distance {detector.last_distance:.2f})")
+            return
+        if recognizer is not None and not detector.speaking:
+            # Keep the command capture threshold in step with the room
+            recognizer.energy_threshold = max(wake_word.MIN_RMS, detector.noise_floor * recognizer.dynamic_energy_ratio)
+
+def _calibrate(ctx):
+    global _calibrated
+    wait_until_quiet(timeout=15)  # don't calibrate against Jarvis's own voice
+    ctx["recognizer"].adjust_for_ambient_noise(ctx["source"], duration=CALIBRATION_SECONDS)
+    _calibrated = True
+    print(f"[DEBUG] Calibrated energy threshold: {ctx['recognizer'].energy_threshold:.0f}")
+    return WAKE
+
+def _wait_for_wake(ctx):
+    recognizer, source = ctx["recognizer"], ctx["source"]
+    print("🎧 [DEBUG] Listening for wake word...")
+    if ctx["templates"]:
+        # Nothing leaves the machine until the wake word is heard
+        detector = wake_word.WakeWordDetector(ctx["templates"], sample_rate=source.SAMPLE_RATE)
+        wait_for_wake_word(source, detector, recognizer)
+        # The phrase ended a little before it was recognized (the detector
+        # waits out a short silence); the command may already have started
+        behind = detector.samples_fed - detector.wake_end_sample
+        ctx["command_start"] = source.cursor.position - math.ceil(behind / source.CHUNK)
+        return CAPTURE
 
-def listen():
-    with sr.Microphone() as source:
-        print("🎧 [DEBUG] Listening for wake word...")
+    # No enrolled wake word yet (see wake_word.py); ask the speech backend instead
+    print("[DEBUG] Capturing wake word audio...")
+    audio = recognizer.listen(source, timeout=None, phrase_time_limit=40)
+    text = recognizers.transcribe(audio.get_raw_data(convert_width=2), audio.sample_rate, ctx["backend"])
+    print(f"🎙️ [DEBUG] Wake word recognized: {text}")
+    if "ok jarvis" in text or "ok bro" in text:
+        return CAPTURE
+    print("[DEBUG] Wake word not detected.")
+    return DONE
+
+def _rms(data):
+    samples = array("h")
+    samples.frombytes(data)
+    return math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0.0
+
+def _capture(ctx):
+    import speech_recognition as sr
+    recognizer, source = ctx["recognizer"], ctx["source"]
+    cursor = source.cursor
+    interrupt()
+    lower_vlc_volume()
+    ctx["ducked"] = True
+    beep_at = cursor.ring.written
+    beep_seconds = play_beep()
+    beep_end = beep_at + int(beep_seconds * source.SAMPLE_RATE / source.CHUNK + 0.5)
+    # Go back to where the wake phrase ended; what was said since is still in the ring
+    start = ctx.get("command_start")
+    if start is not None:
+        cursor.seek(start)
+    floor = cursor.position
+    print("🎧 [DEBUG] Listening for command...")
+
+    # Same end-pointing as Recognizer.listen: speech starts above the energy
+    # threshold and ends after pause_threshold seconds below it. Once it
+    # starts, the cursor steps back over the quiet lead-in so the first word
+    # isn't clipped, and every chunk goes to the backend as it is read.
+    chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+    preroll = max(1, int(recognizer.non_speaking_duration / chunk_seconds))
+    stream = ctx["stream"] = ctx["backend"].start(source.SAMPLE_RATE)
+    pcm = ctx["pcm"] = bytearray()
+    waited = spoken = quiet = 0.0
+    while True:
+        data = cursor.read()
+        index = cursor.position - 1
+        if beep_at <= index < beep_end:
+            floor = index + 1  # the beep itself must not open the phrase
+            continue
+        if _rms(data) > recognizer.energy_threshold:
+            cursor.seek(max(floor, index - preroll + 1))
+            break
+        waited += chunk_seconds
+        if waited > PHRASE_TIMEOUT_SECONDS:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+
+    while True:
+        data = cursor.read()
+        pcm += data
+        partial = stream.feed(data)
+        if partial and ctx["on_partial"]:
+            ctx["on_partial"](partial)
+        spoken += chunk_seconds
+        quiet = 0.0 if _rms(data) > recognizer.energy_threshold else quiet + chunk_seconds
+        if quiet >= recognizer.pause_threshold or spoken >= PHRASE_LIMIT_SECONDS:
+            break
+    print("[DEBUG] Finished recording command audio")
+    return RECOGNIZE
+
+def _recognize(ctx):
+    play_beep()
+    try:
+        ctx["command"] = ctx["stream"].finish()
+    except recognizers.BackendUnavailable as e:
+        # Usually no network; a local backend can still make sense of the audio
+        fallback = recognizers.offline_backend()
+        if fallback is None or fallback is ctx["backend"]:
+            raise
+        print(f"[DEBUG] {e}; retrying with {fallback.name}")
+        ctx["command"] = recognizers.transcribe(bytes(ctx["pcm"]), ctx["source"].SAMPLE_RATE, fallback)
+    print(f"🎙️ [DEBUG] Final Command: {ctx['command']}")
+    return DONE
+
+STATES = {
+    CALIBRATE: _calibrate,
+    WAKE: _wait_for_wake,
+    CAPTURE: _capture,
+    RECOGNIZE: _recognize,
+}
+
+def listen(on_partial=None):
+    """Wait for the wake word and return the spoken command ("" if none).
+
+    on_partial(text) is called with the transcript so far while the command is
+    still being spoken (streaming backends only), from this thread.
+    """
+    import speech_recognition as sr
+    ctx = {"recognizer": get_recognizer(), "backend": recognizers.get_backend(),
+           "on_partial": on_partial, "command": "", "ducked": False}
+    state = WAKE if _calibrated else CALIBRATE
+    last_timings.clear()
+    try:
+        source = ctx["source"] = ring_source(get_microphone())
+        ctx["templates"] = wake_word.load_templates(sample_rate=source.SAMPLE_RATE)
+    except audio_capture.CaptureError as e:
+        print(f"🚫 [DEBUG] {e}")
+        time.sleep(1)  # don't spin while the microphone is missing
+        return ""
+    with source:
         try:
-            recognizer.adjust_for_ambient_noise(source, duration=2)
-            print("[DEBUG] Capturing wake word audio...")
-            audio = recognizer.listen(source, timeout=None, phrase_time_limit=40)
-            text = recognizer.recognize_google(audio).lower()
-            print(f"🎙️ [DEBUG] Wake word recognized: {text}")
-
-            if "ok jarvis" in text or "ok bro" in text:
-                lower_vlc_volume()
+            while state != DONE:
+                started = time.perf_counter()
+                current = state
                 try:
-                    time.sleep(0.5)
-                    play_beep()
-                    time.sleep(3)
-                    print("🎧 [DEBUG] Listening for command...")
-                    audio = recognizer.listen(source, timeout=10, phrase_time_limit=100)
-                    print("[DEBUG] Finished recording command audio")
-                    time.sleep(2)
-                    play_beep()
-                    final_command = recognizer.recognize_google(audio).lower()
-                    print(f"🎙️ [DEBUG] Final Command: {final_command}")
-                    return final_command
-                except sr.UnknownValueError:
-                    print("🤷 [DEBUG] Could not understand the speech.")
-                    return ""
-                except sr.RequestError as e:
-                    print(f"🚫 [DEBUG] Google API error: {e}")
-                    return ""
+                    state = STATES[current](ctx)
                 finally:
-                    restore_vlc_volume()  # ✅ Always restore volume
-
-            print("[DEBUG] Wake word not detected.")
-            return ""
-
+                    last_timings[current] = (time.perf_counter() - started) * 1000
         except sr.WaitTimeoutError:
             print("⏱️ [DEBUG] No speech detected within time window.")
-            return ""
-        except sr.UnknownValueError:
+        except recognizers.NoSpeechError:
             print("🤷 [DEBUG] Could not understand the speech.")
-            return ""
-        except sr.RequestError as e:
-            print(f"🚫 [DEBUG] Google API error: {e}")
-            return ""
+        except recognizers.BackendUnavailable as e:
+            print(f"🚫 [DEBUG] Speech backend error: {e}")
+        except audio_capture.CaptureError as e:
+            print(f"🚫 [DEBUG] {e}")
+        finally:
+            if ctx["ducked"]:
+                restore_vlc_volume()  # ✅ Always restore volume
+            print("[LISTEN TIMING] " + ", ".join(f"{name} {ms:.0f} ms" for name, ms in last_timings.items()))
+    return ctx["command"]
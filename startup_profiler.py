@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+# Startup profiler. Set JARVIS_PROFILE_STARTUP=1 (or pass --profile-startup) and
+# import this module before anything else; every import and every block wrapped
+# in mark() is timed, and report() prints them as a waterfall.
+
+ENABLED = os.getenv("JARVIS_PROFILE_STARTUP") == "1" or "--profile-startup" in sys.argv
+
+_t0 = time.perf_counter()
+_events = []
+_state = threading.local()
+
+def _record(kind, label, start, end, depth):
+    _events.append({"kind": kind, "label": label, "start": start - _t0, "end": end - _t0, "depth": depth})
+
+@contextmanager
+def mark(label, kind="init"):
+    if not ENABLED:
+        yield
+        return
+    depth = getattr(_state, "depth", 0)
+    _state.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _state.depth = depth
+        _record(kind, label, start, time.perf_counter(), depth)
+
+class _TimedLoader:
+    def __init__(self, loader, name):
+        self._loader = loader
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with mark(self._name, kind="import"):
+            self._loader.exec_module(module)
+
+class _TimingFinder:
+    """Meta path hook that lets the real finders do the work and wraps the loader they return."""
+
+    def find_spec(self, name, path, target=None):
+        if getattr(_state, "finding", False):
+            return None
+        _state.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = _TimedLoader(spec.loader, name)
+                    return spec
+            return None
+        finally:
+            _state.finding = False
+
+def report(title="Startup", min_ms=1.0, width=40):
+    """Print every import/init step that took at least min_ms, in start order."""
+    if not ENABLED or not _events:
+        return
+    total = max(e["end"] for e in _events)
+    print(f"\n[STARTUP PROFILE] {title}: {total * 1000:.1f} ms since profiler import")
+    for e in sorted(_events, key=lambda e: e["start"]):
+        duration = (e["end"] - e["start"]) * 1000
+        if duration < min_ms:
+            continue
+        offset = int(e["start"] / total * width)
+        length = max(1, int((e["end"] - e["start"]) / total * width))
+        bar = " " * offset + "█" * length
+        label = "  " * e["depth"] + ("" if e["kind"] == "import" else "* ") + e["label"]
+        print(f"{e['start'] * 1000:8.1f} ms {duration:8.1f} ms |{bar:<{width}}| {label}")
+
+if ENABLED:
+    sys.meta_path.insert(0, _TimingFinder())
@@ -0,0 +1,80 @@
+import os
+import time
+import threading
+
+# A folder of cached files with an LRU size limit, shared by the TTS clip cache
+# and the picture cache. Each file is named <key><suffix>. A JsonStore index
+# records each file's size and when it was last used, plus whatever the caller
+# wants to note about it. Files are written under a temporary name and moved
+# into place, so a crash mid-write never leaves a broken file behind. Once the
+# folder grows past max_bytes the least recently used files are deleted.
+
+class DiskLRU:
+    def __init__(self, cache_dir, index_store, max_bytes, suffix=""):
+        self.cache_dir = cache_dir
+        self.index_store = index_store
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def lookup(self, key):
+        """Path of the cached file for this key, or None. Marks it as just used."""
+        entry = self.index_store.get(key)
+        if entry is None:
+            return None
+        path = self.path(key)
+        if not os.path.exists(path):
+            self.index_store.pop(key)
+            return None
+        self.index_store.set(key, dict(entry, used=time.time()))
+        return path
+
+    def discard(self, key):
+        """Drop a file that turned out to be unreadable."""
+        self.index_store.pop(key)
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def store(self, key, write, **info):
+        """Write a file into the cache with write(path) and return its path.
+
+        write is given a temporary name in the cache folder; the file is moved
+        into place only once it has been written completely. info is kept in
+        the index next to the size and last use.
+        """
+        path = self.path(key)
+        tmp_path = os.path.join(self.cache_dir, f".{key}.{threading.get_ident()}.tmp{self.suffix}")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            write(tmp_path)
+            size = os.path.getsize(tmp_path)
+            if size == 0:
+                raise OSError(f"{tmp_path} was written empty")
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.index_store.set(key, dict(info, size=size, used=time.time()))
+        self.evict()
+        return path
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used files until the cache fits in max_bytes."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.index_store.items()
+        total = sum(entry["size"] for _, entry in entries)
+        if total <= max_bytes:
+            return
+        for key, entry in sorted(entries, key=lambda item: item[1]["used"]):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            self.index_store.pop(key)
+            total -= entry["size"]
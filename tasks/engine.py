@@ -0,0 +1,98 @@
+import threading
+from collections import deque
+from concurrent.futures import Future
+from tasks.router import dispatch, match_intents
+
+# Runs commands on a small pool of worker threads. A command is handed to a
+# worker only when none of the resources its intents use (tasks.resources) are
+# busy with another command, and never ahead of an earlier queued command that
+# shares a resource with it. So "add task" and "play music" run side by side,
+# while two "add task"s run one after the other, in the order they came in.
+
+WORKERS = 4
+MAX_PENDING = 64
+
+class EngineBusy(Exception):
+    pass
+
+class _Job:
+    __slots__ = ("command", "uses", "future")
+
+    def __init__(self, command, uses):
+        self.command = command
+        self.uses = uses
+        self.future = Future()
+
+class TaskEngine:
+    def __init__(self, workers=WORKERS, max_pending=MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._busy = set()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start(self):
+        # Called with _cond held
+        if not self._threads:
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"task-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, command):
+        """Queue a command. Returns a Future for the name of the intent that handled it (None if none did).
+
+        Raises EngineBusy when MAX_PENDING commands are already waiting.
+        """
+        command = command.lower().strip()
+        # Conservatively claim the resources of every intent that might end up taking it
+        uses = frozenset(name for intent in match_intents(command) for name in intent["uses"])
+        job = _Job(command, uses)
+        with self._cond:
+            if len(self._pending) >= self.max_pending:
+                raise EngineBusy(f"{len(self._pending)} commands already waiting")
+            self._start()
+            self._pending.append(job)
+            self._cond.notify()
+        return job.future
+
+    def _take(self):
+        """Next job whose resources are free and not claimed by an earlier waiting job."""
+        with self._cond:
+            while True:
+                claimed = set(self._busy)
+                for job in self._pending:
+                    if not job.uses & claimed:
+                        self._pending.remove(job)
+                        self._busy |= job.uses
+                        return job
+                    claimed |= job.uses
+                self._cond.wait()
+
+    def _work(self):
+        while True:
+            job = self._take()
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(dispatch(job.command))
+            except Exception as e:
+                print(f"[ENGINE ERROR] {job.command!r} failed: {e}")
+                job.future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._busy -= job.uses
+                    self._cond.notify_all()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TaskEngine()
+        return _engine
+
+def submit(command):
+    return get_engine().submit(command)
@@ -1,20 +1,20 @@
-import os
-import json
-import requests
+from tasks.llm_client import get_client, sentences, LLMError
 
-def query_groq_model(prompt):
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {os.getenv('GROQ_API_KEY')}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [{"role": "user", "content": prompt}]
-    }
+def query_groq_model(prompt, error_reply="I'm sorry, something went wrong with the AI response."):
     try:
-        response = requests.post(url, headers=headers, data=json.dumps(data))
-        return response.json()["choices"][0]["message"]["content"]
-    except Exception as e:
+        return get_client().complete(prompt)
+    except LLMError as e:
         print("Error from Groq API:", e)
-        return "I'm sorry, something went wrong with the AI response."
+        return error_reply
+
+def stream_groq_answer(prompt, say, error_reply="I'm sorry, something went wrong with the AI response."):
+    """Stream the answer and hand each sentence to say() as soon as it is complete."""
+    spoken = False
+    try:
+        for sentence in sentences(get_client().stream(prompt)):
+            say(sentence)
+            spoken = True
+    except LLMError as e:
+        print("Error from Groq API:", e)
+        if not spoken:
+            say(error_reply)
@@ -0,0 +1,115 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+from tasks.store import get_store
+from tasks.disk_cache import DiskLRU
+
+# Slideshow frames are prepared off the UI thread. A small thread pool decodes
+# the next few pictures and fits them to the screen, keeping their aspect
+# ratio. JPEGs are decoded in draft mode, so libjpeg scales them down by 1/2 to
+# 1/8 while decoding instead of building the full-size photo first. Finished
+# frames sit in a bounded LRU in memory. They are also written to an on-disk
+# cache keyed by (path, mtime, screen size), so the next slideshow, or the
+# next pass through the folder after the LRU has moved on, reads a small JPEG
+# instead of the original.
+#
+# The UI thread only ever calls get(), which returns a ready frame or None.
+
+CACHE_DIR = "picture_cache"
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+JPEG_QUALITY = 90
+
+WORKERS = 2
+PREFETCH_AHEAD = 3        # pictures prepared ahead of the one on screen
+MAX_FRAMES = 8            # screen-sized frames kept in memory
+
+disk_cache = DiskLRU(CACHE_DIR, get_store(os.path.join(CACHE_DIR, "index.json")), MAX_CACHE_BYTES, ".jpg")
+
+def frame_key(path, size):
+    """Cache key for a picture at a screen size. Editing the file changes its mtime, and so the key."""
+    mtime = os.stat(path).st_mtime_ns
+    return hashlib.sha1(f"{os.path.abspath(path)}\0{mtime}\0{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+
+def fit(path, size):
+    """Decode a picture and scale it to the largest size that fits in `size` without cropping."""
+    with Image.open(path) as img:
+        if img.format == "JPEG":
+            img.draft("RGB", size)  # decode at the smallest 1/n scale that is still at least `size`
+        img = ImageOps.exif_transpose(img)
+        return ImageOps.contain(img.convert("RGB"), size, Image.Resampling.LANCZOS)
+
+def load_cached(key):
+    """The cached frame for this key, or None. Marks it as just used."""
+    path = disk_cache.lookup(key)
+    if path is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            img.load()
+    except OSError:
+        disk_cache.discard(key)
+        return None
+    return img
+
+def store_cached(key, frame, source):
+    disk_cache.store(key, lambda tmp_path: frame.save(tmp_path, "JPEG", quality=JPEG_QUALITY), source=source)
+
+def prepare(path, size):
+    """Screen-sized frame for a picture, from the disk cache or freshly decoded."""
+    key = frame_key(path, size)
+    frame = load_cached(key)
+    if frame is None:
+        frame = fit(path, size)
+        try:
+            store_cached(key, frame, path)
+        except OSError as e:
+            print(f"[PICTURE ERROR] Could not cache frame for {path}: {e}")
+    return frame
+
+class FramePipeline:
+    def __init__(self, size, workers=WORKERS, max_frames=MAX_FRAMES):
+        self.size = size
+        self.max_frames = max_frames
+        self._frames = OrderedDict()    # path -> PIL image, least recently used first
+        self._pending = {}              # path -> Future
+        self._errors = {}               # path -> exception from the last attempt
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="picture")
+
+    def _prepare(self, path):
+        try:
+            frame = prepare(path, self.size)
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(path, None)
+                self._errors[path] = e
+            return
+        with self._lock:
+            self._pending.pop(path, None)
+            self._frames[path] = frame
+            self._frames.move_to_end(path)
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+
+    def prefetch(self, paths):
+        """Start preparing any of these pictures that aren't ready or under way."""
+        with self._lock:
+            for path in paths:
+                if path not in self._frames and path not in self._pending and path not in self._errors:
+                    self._pending[path] = self._pool.submit(self._prepare, path)
+
+    def get(self, path):
+        """The prepared frame, or None if it isn't ready yet. Raises the error if preparing it failed."""
+        with self._lock:
+            if path in self._errors:
+                raise self._errors.pop(path)
+            frame = self._frames.get(path)
+            if frame is not None:
+                self._frames.move_to_end(path)
+            return frame
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,56 @@
+from tasks.router import register_intent
+from tasks.resources import TODO, REMINDER, VLC, DISPLAY
+from tasks.media_categories import MEDIA_CATEGORIES
+
+# Trigger phrases for every task module. Handlers are given as "module:function"
+# so a task module (and whatever it pulls in: tkinter, PIL, playsound, ...) is
+# only imported the first time one of its commands is spoken.
+#
+# Phrases are registered in the same order the old handler checks ran in, so
+# the router picks the same action. `uses` lists the shared resources each
+# handler touches, so commands that conflict never run at the same time.
+
+MEDIA_CATEGORY_NAMES = tuple(MEDIA_CATEGORIES)
+
+# Returns straight away; the search and playback run on youtube_task's worker, which takes VLC itself
+register_intent("youtube", ["open youtube and play"], "tasks.youtube_task:handle_youtube", priority=10)
+
+for category in MEDIA_CATEGORY_NAMES:
+    register_intent("media", [f"play random {category}"], "tasks.media_task:play_media",
+                    args=(category, True), priority=20, uses=(VLC,))
+    register_intent("media", [f"play {category}"], "tasks.media_task:play_media",
+                    args=(category,), priority=20, uses=(VLC,))
+
+for category in MEDIA_CATEGORY_NAMES:
+    register_intent("media", [f"pause {category}", f"resume {category}", f"continue {category}"],
+                    "tasks.media_task:control_vlc", args=("pause",), priority=20, uses=(VLC,))
+    register_intent("media", [f"stop {category}"], "tasks.media_task:control_vlc",
+                    args=("stop",), priority=20, uses=(VLC,))
+    register_intent("media", [f"skip {category}", f"next {category}"],
+                    "tasks.media_task:control_vlc", args=("next",), priority=20, uses=(VLC,))
+
+# "unmute" goes ahead of "mute" since every "unmute" command also contains "mute"
+register_intent("media", ["volume up"], "tasks.media_task:control_vlc", args=("volume up",), priority=20, uses=(VLC,))
+register_intent("media", ["volume down"], "tasks.media_task:control_vlc", args=("volume down",), priority=20, uses=(VLC,))
+register_intent("media", ["unmute"], "tasks.media_task:control_vlc", args=("unmute",), priority=20, uses=(VLC,))
+register_intent("media", ["mute"], "tasks.media_task:control_vlc", args=("mute",), priority=20, uses=(VLC,))
+register_intent("media", ["what's playing", "what is playing"], "tasks.media_task:report_now_playing",
+                args=(), priority=20, uses=(VLC,))
+
+register_intent("system", ["close play"], "tasks.system_task:handle_system", priority=30, uses=(VLC,))
+
+register_intent("todo", ["add task", "remove task"], "tasks.todo_task:handle_todo", priority=40, match="startswith",
+                uses=(TODO,))
+register_intent("todo", ["show task"], "tasks.todo_task:handle_todo", priority=40, match="exact", uses=(TODO,))
+
+register_intent("reminder", ["remind me to"], "tasks.reminder_task:handle_reminder", priority=50, match="startswith",
+                uses=(REMINDER,))
+register_intent("reminder", ["show reminders"], "tasks.reminder_task:handle_reminder", priority=50, match="exact",
+                uses=(REMINDER,))
+register_intent("reminder", ["remove reminder"], "tasks.reminder_task:handle_reminder", priority=50, match="startswith",
+                uses=(REMINDER,))
+
+register_intent("pictures", ["play pictures", "show pictures", "start slideshow",
+                             "pause picture", "continue picture",
+                             "stop picture", "close pictures"],
+                "tasks.picture_task:handle_pictures", priority=60, match="exact", uses=(DISPLAY,))
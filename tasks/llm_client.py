@@ -0,0 +1,251 @@
+import os
+import re
+import json
+import time
+import random
+import threading
+from collections import OrderedDict, deque
+import requests
+from requests.adapters import HTTPAdapter
+
+# Client for Groq's OpenAI-compatible chat API, shared by the voice loop and
+# the Alexa server. One requests.Session keeps the TLS connection alive between
+# questions; every call has connect and read timeouts, and connection errors,
+# 429 and 5xx answers are retried a bounded number of times with jittered
+# exponential backoff. Answers are cached for CACHE_TTL seconds under the
+# normalized prompt, so asking the same thing twice doesn't go out again.
+# stream() uses the API's server-sent events so callers can act on the first
+# tokens (see sentences()) long before the whole answer has been generated.
+
+# GROQ_API_URL (like GROQ_API_KEY) is read when the client is made, not at
+# import: the Alexa process imports this before load_dotenv() has run
+GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 15
+MAX_RETRIES = 2
+BACKOFF_SECONDS = 0.25
+MAX_BACKOFF_SECONDS = 2.0
+CACHE_TTL = 600
+CACHE_SIZE = 256
+RETRY_STATUS = (429, 500, 502, 503, 504)
+MIN_SENTENCE_CHARS = 20  # don't cut after "Dr." or "1."
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+class LLMError(Exception):
+    pass
+
+def normalize_prompt(prompt):
+    """Case, spacing and trailing punctuation don't change the question."""
+    return " ".join(prompt.lower().split()).rstrip("?!. ")
+
+class LLMClient:
+    def __init__(self, url=None, api_key=None, model=GROQ_MODEL,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries=MAX_RETRIES,
+                 cache_ttl=CACHE_TTL, cache_size=CACHE_SIZE, pool_size=8):
+        self.url = url or os.getenv("GROQ_API_URL", GROQ_URL)
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key if api_key is not None else os.getenv('GROQ_API_KEY')}",
+            "Content-Type": "application/json",
+        })
+        self._cache = OrderedDict()  # normalized prompt -> (expires_at, answer)
+        self._lock = threading.Lock()
+        self.calls = deque(maxlen=500)  # recent calls, newest last
+        self.totals = {"calls": 0, "cache_hits": 0, "errors": 0, "retries": 0,
+                       "prompt_tokens": 0, "completion_tokens": 0}
+
+    # Cache
+
+    def _cached(self, key):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _remember(self, key, answer):
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, answer)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    # Requests
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.replace(".", "", 1).isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        return random.uniform(0, min(MAX_BACKOFF_SECONDS, BACKOFF_SECONDS * 2 ** attempt))
+
+    def _post(self, payload, stream=False):
+        """POST with retries. Returns (parsed JSON, or the open response when streaming, attempts)."""
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout, stream=stream)
+                if response.status_code not in RETRY_STATUS:
+                    response.raise_for_status()
+                    return (response if stream else response.json()), attempt + 1
+                response.close()
+                error = LLMError(f"Groq API returned {response.status_code}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = LLMError(f"Groq API unreachable: {e}")
+            except (requests.RequestException, ValueError) as e:
+                raise LLMError(f"Groq API request failed: {e}")
+            if attempt == self.retries:
+                raise error
+            with self._lock:
+                self.totals["retries"] += 1
+            time.sleep(self._backoff(attempt, response))
+
+    def complete(self, prompt):
+        """Answer a single-turn prompt. Raises LLMError once the retries are used up."""
+        key = normalize_prompt(prompt)
+        started = time.perf_counter()
+        answer = self._cached(key)
+        if answer is not None:
+            self._record(started, cached=True)
+            return answer
+
+        payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}]}
+        try:
+            data, attempts = self._post(payload)
+            answer = data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError) as e:
+            self._record(started, error=True)
+            raise LLMError(f"Unexpected Groq API response: {e}")
+        except LLMError:
+            self._record(started, error=True)
+            raise
+        usage = data.get("usage") or {}
+        self._record(started, attempts=attempts, prompt_tokens=usage.get("prompt_tokens", 0),
+                     completion_tokens=usage.get("completion_tokens", 0))
+        self._remember(key, answer)
+        return answer
+
+    def stream(self, prompt):
+        """Yield the answer as it is generated, in small text pieces.
+
+        Retries only happen before the first piece arrives; a connection lost
+        mid-answer raises LLMError. A cached answer is yielded in one piece.
+        """
+        key = normalize_prompt(prompt)
+        started = time.perf_counter()
+        answer = self._cached(key)
+        if answer is not None:
+            self._record(started, cached=True)
+            yield answer
+            return
+
+        payload = {"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": True}
+        try:
+            response, attempts = self._post(payload, stream=True)
+        except LLMError:
+            self._record(started, error=True)
+            raise
+        pieces = []
+        usage = {}
+        first_ms = None
+        try:
+            with response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line or not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    # Groq reports usage on the last chunk, under x_groq
+                    usage = chunk.get("usage") or (chunk.get("x_groq") or {}).get("usage") or usage
+                    for choice in chunk.get("choices", []):
+                        text = (choice.get("delta") or {}).get("content")
+                        if text:
+                            if first_ms is None:
+                                first_ms = (time.perf_counter() - started) * 1000
+                            pieces.append(text)
+                            yield text
+        except (requests.RequestException, ValueError) as e:
+            self._record(started, error=True)
+            raise LLMError(f"Groq stream broke off: {e}")
+        self._record(started, attempts=attempts, first_token_ms=first_ms,
+                     prompt_tokens=usage.get("prompt_tokens", 0),
+                     completion_tokens=usage.get("completion_tokens", len(pieces)))
+        self._remember(key, "".join(pieces))
+
+    # Metrics
+
+    def _record(self, started, cached=False, error=False, attempts=0, prompt_tokens=0, completion_tokens=0,
+                first_token_ms=None):
+        call = {
+            "latency_ms": (time.perf_counter() - started) * 1000,
+            "first_token_ms": first_token_ms,
+            "cached": cached,
+            "error": error,
+            "attempts": attempts,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+        with self._lock:
+            self.calls.append(call)
+            self.totals["calls"] += 1
+            self.totals["cache_hits"] += cached
+            self.totals["errors"] += error
+            self.totals["prompt_tokens"] += prompt_tokens
+            self.totals["completion_tokens"] += completion_tokens
+        first = f" (first token {first_token_ms:.0f} ms)" if first_token_ms is not None else ""
+        print(f"[LLM] {call['latency_ms']:.0f} ms{first}, {'cache hit' if cached else f'{attempts} attempt(s)'}, "
+              f"{prompt_tokens}+{completion_tokens} tokens{' (error)' if error else ''}")
+
+    def stats(self):
+        """Totals plus latency percentiles over the recent uncached calls."""
+        with self._lock:
+            latencies = sorted(c["latency_ms"] for c in self.calls if not c["cached"] and not c["error"])
+            stats = dict(self.totals)
+        if latencies:
+            stats["p50_ms"] = latencies[len(latencies) // 2]
+            stats["p95_ms"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return stats
+
+def sentences(pieces, min_chars=MIN_SENTENCE_CHARS):
+    """Regroup a stream of text pieces into whole sentences, each yielded as soon as it ends."""
+    buffer = ""
+    for piece in pieces:
+        buffer += piece
+        start = 0
+        for match in _SENTENCE_END.finditer(buffer):
+            if match.end() - start >= min_chars:
+                yield buffer[start:match.end()].strip()
+                start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """The shared client, created on first use (after .env has been loaded)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
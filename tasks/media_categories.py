@@ -0,0 +1,15 @@
+import os
+
+# Media categories: the folder each one plays from and whether it is music or
+# video. media_task plays them and tasks.intents registers a "play <category>"
+# (and pause/stop/skip) phrase for every key, so adding a category here is all
+# it takes. Kept apart from media_task so the intents can be registered
+# without importing VLC and speech code at startup.
+
+MEDIA_CATEGORIES = {
+    "music": {"path": os.path.join(os.path.dirname(__file__), "music"), "type": "music"},
+    "video": {"path": os.path.join(os.path.dirname(__file__), "videos"), "type": "video"},
+    "devotional": {"path": os.path.join(os.path.dirname(__file__), "devotional"), "type": "video"},
+    "study music": {"path": os.path.join(os.path.dirname(__file__), "study_music"), "type": "music"},
+    "study video": {"path": os.path.join(os.path.dirname(__file__), "study_video"), "type": "video"}
+}
@@ -0,0 +1,87 @@
+import os
+import hashlib
+from tasks.store import get_store
+
+# Catalogue of the media files in each category folder, kept in
+# media_library.json. A folder is only listed again when its mtime changes
+# (a file was added, removed or renamed); every file is then stat'ed, and a
+# file whose mtime or size no longer matches the catalogue (replaced under the
+# same name) gets its entry updated. Tracks are identified by a hash of their
+# file name, so media_state.json can remember a track even when files are
+# added or removed around it.
+
+LIBRARY_FILE = os.path.join(os.path.dirname(__file__), "media_library.json")
+PLAYLIST_DIR = os.path.join(os.path.dirname(__file__), "playlists")
+
+MEDIA_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.mp4', '.mkv', '.avi')
+
+library_store = get_store(LIBRARY_FILE)
+
+_track_lists = {}  # category -> (catalogue entry, [(track_id, path), ...]) built from it
+
+def track_id(name):
+    return hashlib.sha1(name.encode("utf-8", "surrogateescape")).hexdigest()[:12]
+
+def scan_category(category, folder):
+    """Bring the catalogue for one category up to date and return it.
+
+    Returns {"folder", "dir_mtime", "tracks": {id: {"name", "mtime", "size"}}, "order": [ids sorted by name]}.
+    """
+    entry = library_store.get(category)
+    dir_mtime = os.stat(folder).st_mtime_ns
+    if entry and entry["folder"] == folder and entry["dir_mtime"] == dir_mtime:
+        return entry
+
+    known = {}
+    if entry and entry["folder"] == folder:
+        known = {info["name"]: (tid, info) for tid, info in entry["tracks"].items()}
+
+    tracks = {}
+    added = changed = 0
+    with os.scandir(folder) as it:
+        for dirent in it:
+            if not dirent.name.lower().endswith(MEDIA_EXTENSIONS) or not dirent.is_file():
+                continue
+            st = dirent.stat()
+            info = {"name": dirent.name, "mtime": st.st_mtime, "size": st.st_size}
+            if dirent.name in known:
+                tid, old = known[dirent.name]
+                if old != info:
+                    changed += 1
+            else:
+                tid = track_id(dirent.name)
+                added += 1
+            tracks[tid] = info
+
+    removed = len(known) - (len(tracks) - added)
+    print(f"[MEDIA DEBUG] Rescanned {category}: {len(tracks)} track(s), {added} new, {changed} changed, {removed} removed")
+    entry = {
+        "folder": folder,
+        "dir_mtime": dir_mtime,
+        "tracks": tracks,
+        "order": sorted(tracks, key=lambda tid: tracks[tid]["name"]),
+    }
+    library_store.set(category, entry)
+    return entry
+
+def get_tracks(category, folder):
+    """[(track_id, path), ...] for a category, sorted by file name."""
+    entry = scan_category(category, folder)
+    cached = _track_lists.get(category)
+    if cached is None or cached[0] is not entry:
+        prefix = os.path.join(folder, "")
+        tracks = entry["tracks"]
+        cached = _track_lists[category] = (entry, [(tid, prefix + tracks[tid]["name"]) for tid in entry["order"]])
+    return list(cached[1])
+
+def write_playlist(category, paths):
+    """Write an M3U playlist for VLC, so file paths never go on its command line."""
+    os.makedirs(PLAYLIST_DIR, exist_ok=True)
+    path = os.path.join(PLAYLIST_DIR, category.replace(" ", "_") + ".m3u")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for media_path in paths:
+            f.write(media_path + "\n")
+    os.replace(tmp_path, path)
+    return path
@@ -1,38 +1,28 @@
 import os
+import time
 import subprocess
-import socket
 import random
-import json
 from speech_module import speak
+from tasks.store import get_store
+from tasks.media_library import get_tracks, write_playlist
+from tasks.media_categories import MEDIA_CATEGORIES
+from tasks.vlc_client import VLCClient, VLCError, VLC_HOST, VLC_PORT
 
 MEDIA_STATE_FILE = os.path.join(os.path.dirname(__file__), "media_state.json")
 
-MEDIA_CATEGORIES = {
-    "music": {"path": os.path.join(os.path.dirname(__file__), "music"), "type": "music"},
-    "video": {"path": os.path.join(os.path.dirname(__file__), "videos"), "type": "video"},
-    "devotional": {"path": os.path.join(os.path.dirname(__file__), "devotional"), "type": "video"},
-    "study music": {"path": os.path.join(os.path.dirname(__file__), "study_music"), "type": "music"},
-    "study video": {"path": os.path.join(os.path.dirname(__file__), "study_video"), "type": "video"}
-}
+media_store = get_store(MEDIA_STATE_FILE)
 
-if not os.path.exists(MEDIA_STATE_FILE):
-    with open(MEDIA_STATE_FILE, "w") as f:
-        json.dump({}, f)
+# How the VLC that start_vlc() last started shows things: "video" (a
+# fullscreen window) or "music" (no video output at all)
+VLC_MODE_KEY = "vlc_mode"
+
+vlc = VLCClient()
 
 def load_state():
-    with open(MEDIA_STATE_FILE, "r") as f:
-        return json.load(f)
+    return media_store.snapshot()
 
 def save_state(state):
-    with open(MEDIA_STATE_FILE, "w") as f:
-        json.dump(state, f, indent=4)
-
-def get_media_files(folder):
-    return sorted([
-        os.path.join(folder, f)
-        for f in os.listdir(folder)
-        if f.lower().endswith(('.mp3', '.wav', '.m4a', '.mp4', '.mkv', '.avi'))
-    ])
+    media_store.replace(state)
 
 def play_media(category, shuffle=False):
     info = MEDIA_CATEGORIES.get(category)
@@ -47,48 +37,102 @@ def play_media(category, shuffle=False):
         speak(f"{category} folder not found.")
         return True
 
-    media_files = get_media_files(folder)
-    if not media_files:
+    tracks = get_tracks(category, folder)
+    if not tracks:
         speak(f"No {category} files found.")
         return True
 
-    state = load_state()
     index = 0
 
     if shuffle:
-        random.shuffle(media_files)
-        state[category] = {"last_index": 0}
+        random.shuffle(tracks)
     else:
-        index = state.get(category, {}).get("last_index", 0)
-        if index >= len(media_files):
-            index = 0
-        media_files = media_files[index:] + media_files[:index]
+        # Resume from the track after the one we started with last time. Older
+        # state files only have a list position, which is used as a fallback.
+        state = media_store.get(category, {})
+        ids = [tid for tid, _ in tracks]
+        if state.get("next_track") in ids:
+            index = ids.index(state["next_track"])
+        else:
+            index = state.get("last_index", 0)
+            if index >= len(tracks):
+                index = 0
+        tracks = tracks[index:] + tracks[:index]
 
     speak(f"Playing your {category}{' in random order' if shuffle else ''} now.")
-    args = ['vlc', '--extraintf', 'rc', '--rc-host', 'localhost:9999']
+    playlist = write_playlist(category, [path for _, path in tracks])
+    start_vlc(media_type, playlist, shuffle)
+
+    # Remember where to pick up next session
+    media_store.set(category, {"next_track": tracks[1 % len(tracks)][0]})
+
+    return True
+
+def start_vlc(media_type, target, shuffle=False):
+    """Start a VLC with the RC interface this module talks to, playing target (a file, playlist or URL)."""
+    args = ['vlc', '--extraintf', 'rc', '--rc-host', f'{VLC_HOST}:{VLC_PORT}']
     if shuffle:
         args.append('--random')
     if media_type == "video":
         args.append('--fullscreen')
     else:
         args.extend(['--intf', 'dummy', '--no-video'])
+    subprocess.Popen(args + [target])
+    vlc.reset()  # a new VLC is starting; don't wait out the old connection's backoff
+    media_store.set(VLC_MODE_KEY, "video" if media_type == "video" else "music")
 
-    subprocess.Popen(args + media_files)
-
-    # Save last index for next session
-    state[category] = {"last_index": (index + 1) % len(media_files)}
-    save_state(state)
-
-    return True
+def stop_vlc(timeout=2.0):
+    """Close any running VLC and wait up to timeout seconds for it to exit, so a new one can take the RC port."""
+    try:
+        subprocess.run(["pkill", "-x", "vlc"])
+        deadline = time.monotonic() + timeout
+        while subprocess.run(["pgrep", "-x", "vlc"], stdout=subprocess.DEVNULL).returncode == 0:
+            if time.monotonic() > deadline:
+                print("[VLC DEBUG] VLC is still running after pkill")
+                break
+            time.sleep(0.05)
+    except OSError as e:
+        print("[ERROR closing VLC]", e)
+    vlc.reset()
+
+def play_url(url):
+    """Play a network stream in the running VLC, replacing its playlist, or start VLC for it.
+
+    A VLC started for music has no video output, so it is replaced by one started for video.
+    """
+    if media_store.get(VLC_MODE_KEY) == "video":
+        try:
+            vlc.send_many(["clear", f"add {url}"])
+            return
+        except VLCError as e:
+            print(f"[VLC DEBUG] No running VLC ({e}); starting one")
+    else:
+        print("[VLC DEBUG] Running VLC has no video output; restarting it for video")
+        stop_vlc()
+    start_vlc("video", url)
 
 def send_vlc_command(cmd):
+    """Send one RC command. Returns VLC's reply, or None if VLC couldn't be reached
+    or didn't recognise the command."""
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect(('localhost', 9999))
-            s.sendall((cmd + '\n').encode())
-    except Exception as e:
+        reply = vlc.command(cmd)
+    except VLCError as e:
         speak("Failed to control VLC.")
         print("[VLC TCP Error]", e)
+        return None
+    if reply.startswith("Unknown command"):
+        print(f"[VLC ERROR] {reply}")
+        return None
+    return reply
+
+def report_now_playing():
+    try:
+        playing = vlc.now_playing()
+    except VLCError as e:
+        print("[VLC TCP Error]", e)
+        playing = None
+    speak(f"Now playing {playing}." if playing else "Nothing is playing right now.")
+    return True
 
 def control_vlc(action):
     commands = {
@@ -1,19 +1,95 @@
 import os
 import glob
-import threading
-import time
-import tkinter as tk
-from PIL import Image, ImageTk
+from PIL import ImageTk
 from speech_module import speak
+import ui_service
+from tasks.image_pipeline import FramePipeline, PREFETCH_AHEAD
 
 PICTURE_FOLDER = os.path.join(os.path.dirname(__file__), "Pictures")
 
+# The slideshow runs on the UI thread (ui_service). Voice commands only flip
+# these flags or queue a call(); the UI thread does all the drawing. Pictures
+# are decoded and scaled ahead of time by tasks.image_pipeline, so the UI
+# thread only swaps in frames that are already screen-sized.
 slideshow_state = {
-    "root": None,
+    "running": False,
     "paused": False,
-    "stop_requested": False,
+    "job": None,          # pending after() id for the next slide
+    "pipeline": None,     # kept between slideshows so its frames are reused
 }
 
+SLIDE_MS = 5000
+PAUSED_POLL_MS = 1000
+NOT_READY_POLL_MS = 50    # the next frame is still being prepared
+
+def _pipeline(size):
+    pipeline = slideshow_state["pipeline"]
+    if pipeline is None or pipeline.size != size:
+        if pipeline is not None:
+            pipeline.shutdown()
+        pipeline = slideshow_state["pipeline"] = FramePipeline(size)
+    return pipeline
+
+def _next_slide(pipeline, image_files, index):
+    # UI thread
+    win = ui_service.window("image")
+    slideshow_state["job"] = None
+    if not slideshow_state["running"]:
+        return
+
+    if slideshow_state["paused"]:
+        slideshow_state["job"] = win.top.after(PAUSED_POLL_MS, _next_slide, pipeline, image_files, index)  # Check again after 1s
+        return
+
+    path = image_files[index]
+    try:
+        frame = pipeline.get(path)
+    except Exception as e:
+        print(f"[PICTURE ERROR] Could not display image: {e}")
+        del image_files[index]
+        if not image_files:
+            _stop_slideshow()
+            return
+        slideshow_state["job"] = win.top.after(0, _next_slide, pipeline, image_files, index % len(image_files))
+        return
+
+    if frame is None:
+        # Keep the current picture up a little longer rather than decode here
+        pipeline.prefetch([path])
+        slideshow_state["job"] = win.top.after(NOT_READY_POLL_MS, _next_slide, pipeline, image_files, index)
+        return
+
+    win.set_image(ImageTk.PhotoImage(frame))
+    ahead = [image_files[(index + n) % len(image_files)] for n in range(1, PREFETCH_AHEAD + 1)]
+    pipeline.prefetch(ahead)
+
+    next_index = (index + 1) % len(image_files)
+    slideshow_state["job"] = win.top.after(SLIDE_MS, _next_slide, pipeline, image_files, next_index)
+
+def _slideshow_closed():
+    # UI thread, when the window is hidden (Escape, stop_slideshow)
+    slideshow_state["running"] = False
+    if slideshow_state["job"] is not None:
+        ui_service.window("image").top.after_cancel(slideshow_state["job"])
+        slideshow_state["job"] = None
+
+def _start_slideshow(image_files):
+    # UI thread
+    win = ui_service.window("image")
+    if slideshow_state["running"]:
+        _slideshow_closed()  # restart from the first picture
+    pipeline = _pipeline((win.top.winfo_screenwidth(), win.top.winfo_screenheight()))
+    pipeline.prefetch(image_files[:PREFETCH_AHEAD + 1])
+    slideshow_state["running"] = True
+    slideshow_state["paused"] = False
+    win.on_hide = _slideshow_closed
+    win.show()
+    _next_slide(pipeline, list(image_files), 0)
+
+def _stop_slideshow():
+    # UI thread
+    ui_service.window("image").hide()
+
 def play_slideshow():
     image_files = glob.glob(os.path.join(PICTURE_FOLDER, "*.[jJpP][pPnN][gG]"))
 
@@ -22,71 +98,27 @@ def play_slideshow():
         speak("No pictures found in your Pictures folder.")
         return
 
-    def run_slideshow():
-        root = tk.Tk()
-        slideshow_state["root"] = root
-        slideshow_state["paused"] = False
-        slideshow_state["stop_requested"] = False
-
-        root.attributes("-fullscreen", True)
-        label = tk.Label(root)
-        label.pack(expand=True)
-
-        def show_image(index):
-            if slideshow_state["stop_requested"]:
-                return
-
-            if slideshow_state["paused"]:
-                root.after(1000, show_image, index)  # Check again after 1s
-                return
-
-            try:
-                img = Image.open(image_files[index])
-                screen_width = root.winfo_screenwidth()
-                screen_height = root.winfo_screenheight()
-                img = img.resize((screen_width, screen_height), Image.Resampling.LANCZOS)
-                photo = ImageTk.PhotoImage(img)
-                label.config(image=photo)
-                label.image = photo
-            except Exception as e:
-                print(f"[PICTURE ERROR] Could not display image: {e}")
-
-            next_index = (index + 1) % len(image_files)
-            root.after(5000, show_image, next_index)
-
-        def exit_fullscreen(event=None):
-            slideshow_state["stop_requested"] = True
-            root.destroy()
-            slideshow_state["root"] = None
-
-        root.bind("<Escape>", exit_fullscreen)
-        show_image(0)
-        root.mainloop()
-
-    threading.Thread(target=run_slideshow).start()
+    ui_service.call(_start_slideshow, image_files)
     speak("Starting slideshow now.")
 
 def pause_slideshow():
-    if slideshow_state["root"] and not slideshow_state["paused"]:
+    if slideshow_state["running"] and not slideshow_state["paused"]:
         slideshow_state["paused"] = True
         speak("Slideshow paused.")
     else:
         speak("Slideshow is not running or already paused.")
 
 def continue_slideshow():
-    if slideshow_state["root"] and slideshow_state["paused"]:
+    if slideshow_state["running"] and slideshow_state["paused"]:
         slideshow_state["paused"] = False
         speak("Resuming slideshow.")
     else:
         speak("Slideshow is not paused or not running.")
 
 def stop_slideshow():
-    root = slideshow_state.get("root")
-    if root:
+    if slideshow_state["running"]:
         speak("Stopping slideshow.")
-        slideshow_state["stop_requested"] = True
-        root.destroy()
-        slideshow_state["root"] = None
+        ui_service.call(_stop_slideshow)
     else:
         speak("No slideshow is currently running.")
 
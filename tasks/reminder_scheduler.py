@@ -0,0 +1,239 @@
+import heapq
+import time
+import datetime
+import threading
+
+# Event-driven reminder scheduler. Every scheduled reminder has one entry in a
+# min-heap keyed by its next fire timestamp; the scheduler thread sleeps until
+# the earliest one is due (or until add/remove wakes it), fires it, and pushes
+# the next occurrence for recurring reminders. Removing a reminder only drops it
+# from _scheduled; its stale heap entry is skipped when it reaches the top.
+#
+# Reminders set or removed through Alexa are saved by the app.py process, which
+# runs no scheduler. So start_scheduler can be given a version() callable for
+# the saved reminders: the thread checks it at least every SYNC_SECONDS and,
+# when it changes, brings the heap in line with load().
+#
+# With the SQLite store the database already keeps every reminder's next fire
+# time in an index, so start_store_scheduler() runs the same thread without
+# the heap: it asks the store for the reminder due soonest (one indexed
+# query), sleeps until then, and has the store move it on to its next
+# occurrence before firing it. Nothing is loaded into memory, and reminders
+# saved by the Alexa process are seen on the next query.
+
+TIME_FORMAT = "%I:%M %p"
+
+# Upper bound on a single wait, so a suspend/resume or a wall-clock change
+# can't leave the thread sleeping past a reminder.
+MAX_WAIT_SECONDS = 300
+
+# How soon a reminder saved by another process is picked up
+SYNC_SECONDS = 30
+
+_heap = []             # (fire_at, sequence, reminder_id)
+_scheduled = {}        # reminder_id -> {"info": ..., "sequence": ...}
+_sequence = 0
+_condition = threading.Condition()
+_thread = None
+_on_fire = None
+_version = None        # version() given to start_scheduler, or None
+_load = None
+_seen_version = None
+_store_due = None      # next_due() given to start_store_scheduler, or None
+_store_advance = None
+_store_changed = False
+
+def next_fire_time(info, after=None):
+    """Next datetime strictly after `after` at which a reminder should go off, or None."""
+    after = after or datetime.datetime.now()
+    try:
+        at = datetime.datetime.strptime(info["time"], TIME_FORMAT).time()
+    except (KeyError, ValueError):
+        return None
+
+    candidate = datetime.datetime.combine(after.date(), at)
+    if info.get("recurring") == "weekly":
+        try:
+            weekday = time.strptime(info.get("day", ""), "%A").tm_wday
+        except ValueError:
+            return None
+        candidate += datetime.timedelta(days=(weekday - after.weekday()) % 7)
+        if candidate <= after:
+            candidate += datetime.timedelta(days=7)
+    elif candidate <= after:
+        # Daily and one-off reminders both go off the next time the clock shows their time
+        candidate += datetime.timedelta(days=1)
+    return candidate
+
+def _push(reminder_id, info, after=None):
+    global _sequence
+    fire_at = next_fire_time(info, after)
+    if fire_at is None:
+        print(f"[REMINDER DEBUG] Could not schedule {reminder_id}: {info}")
+        _scheduled.pop(reminder_id, None)
+        return
+    _sequence += 1
+    _scheduled[reminder_id] = {"info": info, "sequence": _sequence}
+    heapq.heappush(_heap, (fire_at.timestamp(), _sequence, reminder_id))
+
+def _store_wake():
+    # Called with _condition held: the store changed, so query it again
+    global _store_changed
+    _store_changed = True
+    _condition.notify()
+
+def add_reminder(reminder_id, info):
+    """Schedule (or reschedule) a reminder and wake the scheduler thread."""
+    with _condition:
+        if _store_due is not None:
+            _store_wake()  # already saved with its fire time; the store is the schedule
+            return
+        _push(reminder_id, dict(info))
+        _condition.notify()
+
+def remove_reminder(reminder_id):
+    with _condition:
+        if _store_due is not None:
+            _store_wake()
+        elif _scheduled.pop(reminder_id, None) is not None:
+            _condition.notify()
+
+def sync_reminders(reminders):
+    """Make the schedule match `reminders` ({id: info}). New and changed reminders
+    are (re)scheduled, missing ones dropped; the rest keep their place."""
+    with _condition:
+        for reminder_id in [rid for rid in _scheduled if rid not in reminders]:
+            del _scheduled[reminder_id]
+        for reminder_id, info in reminders.items():
+            entry = _scheduled.get(reminder_id)
+            if entry is None or entry["info"] != info:
+                _push(reminder_id, dict(info))
+        _condition.notify()
+
+def _sync_if_changed():
+    global _seen_version
+    if _version is None:
+        return
+    try:
+        version = _version()
+        if version != _seen_version:
+            sync_reminders(_load())
+            _seen_version = version
+    except Exception as e:
+        print(f"[REMINDER ERROR] Could not re-read saved reminders: {e}")
+
+def clear_reminders():
+    with _condition:
+        _heap.clear()
+        _scheduled.clear()
+        _condition.notify()
+
+def next_due():
+    """(reminder_id, datetime) of the next reminder to fire, or None."""
+    with _condition:
+        _drop_stale()
+        if not _heap:
+            return None
+        fire_at, _, reminder_id = _heap[0]
+        return reminder_id, datetime.datetime.fromtimestamp(fire_at)
+
+def _drop_stale():
+    while _heap:
+        _, sequence, reminder_id = _heap[0]
+        entry = _scheduled.get(reminder_id)
+        if entry is not None and entry["sequence"] == sequence:
+            return
+        heapq.heappop(_heap)
+
+def _run():
+    while True:
+        # Outside _condition: load() takes the store's own locks
+        _sync_if_changed()
+        with _condition:
+            longest = SYNC_SECONDS if _version is not None else None
+            _drop_stale()
+            if not _heap:
+                _condition.wait(longest)
+                continue
+
+            fire_at, _, reminder_id = _heap[0]
+            delay = fire_at - time.time()
+            if delay > 0:
+                _condition.wait(min(delay, MAX_WAIT_SECONDS, longest or MAX_WAIT_SECONDS))
+                continue
+
+            heapq.heappop(_heap)
+            info = _scheduled[reminder_id]["info"]
+            if info.get("recurring") in ("daily", "weekly"):
+                _push(reminder_id, info, after=datetime.datetime.fromtimestamp(fire_at))
+            else:
+                _scheduled.pop(reminder_id)
+
+        # Fire outside the lock so a slow popup/alarm never delays the next reminder
+        threading.Thread(target=_on_fire, args=(reminder_id, info), daemon=True).start()
+
+def _run_store():
+    global _store_changed
+    while True:
+        try:
+            due = _store_due()
+        except Exception as e:
+            print(f"[REMINDER ERROR] Could not read the next reminder: {e}")
+            due = None
+        with _condition:
+            if _store_changed:
+                _store_changed = False
+                continue
+            delay = due[2] - time.time() if due is not None else SYNC_SECONDS
+            if delay > 0:
+                # Woken early by add/remove; reminders saved by the other process show up within SYNC_SECONDS
+                _condition.wait_for(lambda: _store_changed, min(delay, MAX_WAIT_SECONDS, SYNC_SECONDS))
+                continue
+
+        reminder_id, info, fire_at = due
+        following = None
+        if info.get("recurring") in ("daily", "weekly"):
+            # From now, not from fire_at: a reminder missed while Jarvis was off fires once, not once per day missed
+            following = next_fire_time(info, after=datetime.datetime.fromtimestamp(max(fire_at, time.time())))
+        try:
+            _store_advance(reminder_id, following)
+        except Exception as e:
+            print(f"[REMINDER ERROR] Could not reschedule {reminder_id}: {e}")
+            time.sleep(1)  # don't fire it over and over while the store is failing
+            continue
+        threading.Thread(target=_on_fire, args=(reminder_id, info), daemon=True).start()
+
+def start_store_scheduler(next_due, advance, on_fire):
+    """Start the scheduler thread on a store that keeps the schedule itself.
+
+    next_due() returns (reminder_id, info, fire_at timestamp) for the reminder
+    due soonest, or None. advance(reminder_id, datetime or None) saves when it
+    goes off next (None: never again) and is called before on_fire.
+    """
+    global _thread, _on_fire, _store_due, _store_advance
+    with _condition:
+        _on_fire = on_fire
+        _store_due, _store_advance = next_due, advance
+        if _thread is None:
+            _thread = threading.Thread(target=_run_store, daemon=True)
+            _thread.start()
+        _store_wake()
+
+def start_scheduler(reminders, on_fire, version=None, load=None):
+    """Load `reminders` ({id: info}) into the heap and start the scheduler thread once.
+
+    on_fire(reminder_id, info) is called on its own thread when a reminder is due.
+    If version() is given, it should change whenever the saved reminders change,
+    in any process; the schedule is then re-read from load() ({id: info}).
+    """
+    global _thread, _on_fire, _version, _load, _seen_version
+    with _condition:
+        _on_fire = on_fire
+        if version is not None:
+            _version, _load, _seen_version = version, load, version()
+        for reminder_id, info in reminders.items():
+            _push(reminder_id, dict(info))
+        if _thread is None:
+            _thread = threading.Thread(target=_run, daemon=True)
+            _thread.start()
+        _condition.notify()
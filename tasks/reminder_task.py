@@ -1,27 +1,43 @@
 import os
-import json
-import time
-import threading
 import datetime
-import tkinter as tk
-from playsound import playsound
-from speech_module import speak
+from speech_module import speak, PRIORITY_URGENT
+import ui_service
+from tasks.store import get_store
+from tasks.reminder_scheduler import (start_scheduler, start_store_scheduler, add_reminder, remove_reminder,
+                                      next_fire_time)
+from tasks import sqlite_store, resources
+from tasks.sqlite_store import SQLITE_ENABLED
 
 REMINDER_FILE = os.path.join("tasks", "reminders.json")
 ALARM_FILE = os.path.join("tasks", "alarm.wav")
 
-# Ensure file exists
-if not os.path.exists(REMINDER_FILE):
-    with open(REMINDER_FILE, "w") as f:
-        json.dump({}, f)
+reminder_store = get_store(REMINDER_FILE)
 
 def load_reminders():
-    with open(REMINDER_FILE, "r") as f:
-        return json.load(f)
+    return reminder_store.snapshot()
 
 def save_reminders(reminders):
-    with open(REMINDER_FILE, "w") as f:
-        json.dump(reminders, f, indent=4)
+    reminder_store.replace(reminders)
+
+def list_reminders():
+    """[(reminder_id, info), ...] from whichever backend is active."""
+    if SQLITE_ENABLED:
+        return [(f"reminder-{n}", info) for n, info in sqlite_store.list_reminders()]
+    return reminder_store.items()
+
+def store_reminder(info):
+    """Save a new reminder and return its id."""
+    if SQLITE_ENABLED:
+        fire_at = next_fire_time(info)
+        return f"reminder-{sqlite_store.add_reminder(info, fire_at.timestamp() if fire_at else None)}"
+    return reminder_store.add_numbered("reminder-", info)
+
+def delete_reminder(task_id):
+    """Remove a saved reminder. Returns its info, or None if it didn't exist."""
+    if SQLITE_ENABLED:
+        number = task_id.replace("reminder-", "", 1)
+        return sqlite_store.remove_reminder(int(number)) if number.isdigit() else None
+    return reminder_store.pop(task_id)
 
 def parse_time(time_str):
     try:
@@ -30,59 +46,60 @@ def parse_time(time_str):
         return None
 
 def show_reminder_popup(text):
-    def show_window():
-        root = tk.Tk()
-        root.title("Reminder")
-        root.attributes("-fullscreen", True)
-        label = tk.Label(root, text=text, font=("Helvetica", 20))
-        label.pack(expand=True)
-
-        def close():
-            root.destroy()
-
-        tk.Button(root, text="Dismiss", command=close, font=("Helvetica", 14)).pack(pady=20)
-        root.mainloop()
-
-    thread = threading.Thread(target=show_window)
-    thread.start()
-    time.sleep(1)  # Ensure popup shows first
-    return thread
+    """Show the reminder alert. Returns an Event that is set once it is dismissed."""
+    return ui_service.show_alert(text)
 
 def trigger_reminder(task_id, text):
-    popup_thread = show_reminder_popup(f"{task_id}: {text}")
+    from playsound import playsound
+    dismissed = show_reminder_popup(f"{task_id}: {text}")
     playsound(ALARM_FILE)
-    speak(f"Reminder: {text}")
-    popup_thread.join()
-
-def schedule_existing_reminders():
-    def check_reminders():
-        while True:
-            now = datetime.datetime.now()
-            current_time = now.strftime("%I:%M %p")
-            current_day = now.strftime("%A").lower()
-
-            reminders = load_reminders()
-            to_remove = []
-
-            for task_id, info in reminders.items():
-                if info["time"] == current_time:
-                    recurring = info.get("recurring")
-                    if not recurring:
-                        to_remove.append(task_id)
-                    elif recurring == "weekly":
-                        if info.get("day", "").lower() != current_day:
-                            continue  # Skip until day matches
-
-                    trigger_reminder(task_id, info["task"])
-
-            if to_remove:
-                for r in to_remove:
-                    reminders.pop(r)
-                save_reminders(reminders)
+    speak(f"Reminder: {text}", priority=PRIORITY_URGENT)
+    dismissed.wait()
+
+def on_reminder_due(task_id, info):
+    # Runs on the scheduler thread, outside the task engine, so take the store lock here
+    with resources.holding((resources.REMINDER,)):
+        if not info.get("recurring"):
+            # One-off reminders are dropped from the store once they go off
+            delete_reminder(task_id)
+    trigger_reminder(task_id, info["task"])
+
+def reminders_version():
+    """Changes whenever the saved reminders change, whichever process changed them."""
+    if SQLITE_ENABLED:
+        return sqlite_store.data_version()
+    return reminder_store.version()
+
+def _reminder_number(task_id):
+    return int(task_id.replace("reminder-", "", 1))
+
+def next_due_reminder():
+    """(task_id, info, fire_at timestamp) of the SQLite reminder due soonest, or None."""
+    due = sqlite_store.next_due_reminder()
+    if due is None:
+        return None
+    number, info, fire_at = due
+    return f"reminder-{number}", info, fire_at
 
-            time.sleep(30)
+def advance_reminder(task_id, fire_at):
+    sqlite_store.set_next_fire_at(_reminder_number(task_id), fire_at.timestamp() if fire_at else None)
 
-    threading.Thread(target=check_reminders, daemon=True).start()
+def schedule_existing_reminders():
+    """Hand every saved reminder to the scheduler. Reminders added or removed here
+    reach it through handle_reminder; those changed by the Alexa server are
+    picked up when the saved reminders change.
+
+    With SQLite the database is the schedule: the scheduler asks it for the
+    next due reminder instead of holding them all in memory."""
+    if SQLITE_ENABLED:
+        for number, info in sqlite_store.unscheduled_reminders():
+            fire_at = next_fire_time(info)
+            if fire_at is not None:
+                sqlite_store.set_next_fire_at(number, fire_at.timestamp())
+        start_store_scheduler(next_due_reminder, advance_reminder, on_reminder_due)
+        return
+    start_scheduler(dict(list_reminders()), on_reminder_due,
+                    version=reminders_version, load=lambda: dict(list_reminders()))
 
 def handle_reminder(command):
     print(f"[REMINDER DEBUG] Received command: {command}")
@@ -111,17 +128,16 @@ def handle_reminder(command):
                 print("[!] Invalid time format. Use HH:MM AM/PM format.")
                 return True
 
-            reminders = load_reminders()
-            task_id = f"reminder-{len(reminders) + 1}"
-            reminders[task_id] = {
+            info = {
                 "task": task,
                 "time": parsed.strftime("%I:%M %p"),
                 "recurring": recurring,
             }
             if day:
-                reminders[task_id]["day"] = day
+                info["day"] = day
 
-            save_reminders(reminders)
+            task_id = store_reminder(info)
+            add_reminder(task_id, info)
             speak(f"{task_id} set for {parsed.strftime('%I:%M %p')}")
             print(f"[⏰] {task_id} set for {task} at {parsed.strftime('%I:%M %p')}")
             return True
@@ -132,7 +148,7 @@ def handle_reminder(command):
             return True
 
     elif command == "show reminders":
-        reminders = load_reminders()
+        reminders = list_reminders()
         if not reminders:
             speak("No reminders found.")
             print("[📭] No reminders in list.")
@@ -141,26 +157,11 @@ def handle_reminder(command):
             text = "\n".join([
                 f"{task_id}: {info['task']} at {info['time']}" +
                 (f" ({info['recurring']})" if info.get("recurring") else "")
-                for task_id, info in reminders.items()
+                for task_id, info in reminders
             ])
 
-            # GUI popup
-            def show_window():
-                root = tk.Tk()
-                root.title("Reminders")
-                root.attributes("-fullscreen", True)
-
-                text_widget = tk.Text(root, wrap="word", font=("Helvetica", 20))
-                text_widget.insert("1.0", text)
-                text_widget.config(state="disabled")
-                text_widget.pack(padx=10, pady=10, fill="both", expand=True)
-
-                tk.Button(root, text="Close", command=root.destroy, font=("Helvetica", 14)).pack(pady=10)
-                root.after(10000, root.destroy)
-                root.mainloop()
-
-            threading.Thread(target=show_window).start()
-            for task_id, info in reminders.items():
+            ui_service.show_text("Reminders", text)
+            for task_id, info in reminders:
                 speak(f"{task_id}: {info['task']} at {info['time']}")
         return True
 
@@ -169,10 +170,9 @@ def handle_reminder(command):
         if not task_id.startswith("reminder-"):
             task_id = f"reminder-{task_id}"
 
-        reminders = load_reminders()
-        if task_id in reminders:
-            removed = reminders.pop(task_id)
-            save_reminders(reminders)
+        removed = delete_reminder(task_id)
+        if removed is not None:
+            remove_reminder(task_id)
             speak(f"{task_id} removed.")
             print(f"[🗑️] {task_id} removed: {removed}")
         else:
@@ -0,0 +1,46 @@
+import time
+import threading
+from contextlib import contextmanager
+
+# Shared things a command can touch. Every intent declares the resources its
+# handler uses (see tasks/intents.py); router.dispatch holds their locks while
+# the handler runs, so the voice loop, Alexa requests and the reminder
+# scheduler never interleave read-modify-write cycles on the same store, or
+# drive VLC or the screen at the same time. Commands on different resources
+# still run in parallel.
+
+TODO = "todo"            # to-do store
+REMINDER = "reminder"    # reminder store and scheduler
+VLC = "vlc"              # the VLC process, its RC connection and media_state.json
+DISPLAY = "display"      # full-screen windows: the slideshow
+
+RESOURCES = (TODO, REMINDER, VLC, DISPLAY)
+
+SLOW_WAIT_SECONDS = 0.5
+
+# Re-entrant, so a handler can call code that takes the same resource again
+_locks = {name: threading.RLock() for name in RESOURCES}
+
+def validate(names):
+    unknown = [name for name in names if name not in _locks]
+    if unknown:
+        raise ValueError(f"Unknown resource(s): {', '.join(unknown)}")
+    return tuple(sorted(set(names)))
+
+@contextmanager
+def holding(names):
+    """Hold the locks of several resources. They are always taken in sorted order, so two callers can't deadlock."""
+    names = validate(names)
+    started = time.perf_counter()
+    acquired = []
+    try:
+        for name in names:
+            _locks[name].acquire()
+            acquired.append(name)
+        waited = time.perf_counter() - started
+        if waited > SLOW_WAIT_SECONDS:
+            print(f"[ENGINE DEBUG] Waited {waited:.2f}s for {', '.join(names)}")
+        yield
+    finally:
+        for name in reversed(acquired):
+            _locks[name].release()
@@ -0,0 +1,149 @@
+import re
+import importlib
+import threading
+from tasks import resources
+
+# Every trigger phrase from every task module ends up in one table. The table is
+# compiled into a single regex the first time a command is dispatched (and again
+# only if something registers later), so a command is scanned once instead of
+# once per handler.
+
+_intents = []
+_compiled = None
+_compile_lock = threading.Lock()
+_END_OF_COMMAND = object()
+
+MATCH_MODES = ("contains", "startswith", "exact")
+
+def register_intent(name, phrases, handler, args=None, priority=100, match="contains", uses=()):
+    """Register trigger phrases for a handler.
+
+    Lower priority values win. Phrases registered with the same priority keep
+    their registration order, which mirrors the old if/elif order in each task.
+    The handler is called as handler(command), or handler(*args) when args is given.
+    It can also be a "module:function" string, in which case the module is only
+    imported the first time one of its phrases is dispatched.
+    uses names the shared resources (tasks.resources) the handler touches;
+    dispatch holds their locks while it runs.
+    """
+    global _compiled
+    if match not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {match}")
+    uses = resources.validate(uses)
+
+    with _compile_lock:
+        for phrase in phrases:
+            _intents.append({
+                "name": name,
+                "phrase": phrase.lower().strip(),
+                "match": match,
+                "handler": handler,
+                "args": args,
+                "priority": priority,
+                "uses": uses,
+                "order": len(_intents),
+            })
+        _compiled = None
+
+def _trie_pattern(node):
+    """Turn a character trie into a regex. At each node the branches are tried
+    best priority first, so when two phrases start at the same place the
+    higher priority one is the one reported."""
+    branches = []
+    for key, child in node.items():
+        if key is None:
+            branches.append((child, f"(?P<i{child}>)"))
+        elif key is _END_OF_COMMAND:
+            branches.append((child["_best"], r"\Z" + _trie_pattern(child["_next"])))
+        else:
+            branches.append((child["_best"], re.escape(key) + _trie_pattern(child["_next"])))
+    branches.sort(key=lambda b: b[0])
+    if len(branches) == 1:
+        return branches[0][1]
+    return "(?:" + "|".join(b[1] for b in branches) + ")"
+
+def _trie_insert(trie, keys, index):
+    node = trie
+    for char in keys:
+        child = node.setdefault(char, {"_best": index, "_next": {}})
+        child["_best"] = min(child["_best"], index)
+        node = child["_next"]
+    node.setdefault(None, index)
+
+def compile_intents():
+    """Build the combined regex.
+
+    Phrases go into a character trie that is emitted as one regex wrapped in a
+    lookahead, so a single finditer pass reports a trigger at every position it
+    starts (overlapping triggers included) and a position that can't start any
+    phrase is rejected after one character. Anchored phrases (startswith/exact)
+    get their own trie that can only match at the start of the command.
+    """
+    global _compiled
+    with _compile_lock:
+        ordered = sorted(_intents, key=lambda i: (i["priority"], i["order"]))
+        anywhere, anchored = {}, {}
+        best = {"anywhere": len(ordered), "anchored": len(ordered)}
+        for index, intent in enumerate(ordered):
+            if intent["match"] == "contains":
+                _trie_insert(anywhere, intent["phrase"], index)
+                best["anywhere"] = min(best["anywhere"], index)
+            else:
+                keys = list(intent["phrase"])
+                if intent["match"] == "exact":
+                    keys.append(_END_OF_COMMAND)
+                _trie_insert(anchored, keys, index)
+                best["anchored"] = min(best["anchored"], index)
+
+        parts = []
+        if anywhere:
+            parts.append((best["anywhere"], _trie_pattern(anywhere)))
+        if anchored:
+            parts.append((best["anchored"], r"\A" + _trie_pattern(anchored)))
+        parts = [pattern for _, pattern in sorted(parts)]
+
+        regex = re.compile("(?=" + "|".join(parts) + ")") if parts else None
+        _compiled = (regex, ordered)
+        return _compiled
+
+def match_intents(command):
+    """Return the intents triggered by a command, best first, without running them."""
+    regex, ordered = _compiled or compile_intents()
+    if regex is None:
+        return []
+
+    hits = {int(m.lastgroup[1:]) for m in regex.finditer(command)}
+    return [ordered[i] for i in sorted(hits)]
+
+def resolve_handler(intent):
+    handler = intent["handler"]
+    if isinstance(handler, str):
+        module_name, _, attr = handler.partition(":")
+        handler = getattr(importlib.import_module(module_name), attr)
+        intent["handler"] = handler
+    return handler
+
+def prepare(partial):
+    """Import the handler of the best match for a partial transcript, so it is
+    loaded by the time the full command arrives. Returns the intent name or None."""
+    matched = match_intents(partial.lower().strip())
+    if not matched:
+        return None
+    resolve_handler(matched[0])
+    return matched[0]["name"]
+
+def dispatch(command):
+    """Run the best matching handler. Returns the intent name, or None if nothing took it.
+
+    A handler that returns False (e.g. "add task" with no task text) passes the
+    command on to the next match, the same way the old handler cascade did.
+    """
+    command = command.lower().strip()
+    for intent in match_intents(command):
+        handler = resolve_handler(intent)
+        args = intent["args"]
+        with resources.holding(intent["uses"]):
+            handled = handler(*args) if args is not None else handler(command)
+        if handled:
+            return intent["name"]
+    return None
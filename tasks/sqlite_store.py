@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import threading
+
+# Optional SQLite backend for to-dos and reminders. Set JARVIS_STORAGE=sqlite to
+# use it (JARVIS_DB picks the file, default jarvis.db); the JSON files stay the
+# default. IDs come from AUTOINCREMENT so they are never reused after a delete,
+# and reminders keep their next fire time in an indexed column so "what's due
+# next" is one index lookup. Run migrate_json_to_sqlite.py once to copy the old
+# JSON files over.
+
+SQLITE_ENABLED = os.getenv("JARVIS_STORAGE", "json").lower() == "sqlite"
+DB_FILE = os.getenv("JARVIS_DB", "jarvis.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    text TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    time TEXT NOT NULL,
+    recurring TEXT,
+    day TEXT,
+    next_fire_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_next_fire_at ON reminders (next_fire_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_connection = None
+_lock = threading.RLock()
+
+def get_connection(path=None):
+    """One shared connection; every query goes through _lock, so it can be used from any thread."""
+    global _connection
+    with _lock:
+        if _connection is None:
+            _connection = sqlite3.connect(path or DB_FILE, check_same_thread=False)
+            _connection.row_factory = sqlite3.Row
+            _connection.execute("PRAGMA journal_mode=WAL")
+            _connection.executescript(SCHEMA)
+        return _connection
+
+def _execute(sql, params=()):
+    """Run a write in its own transaction and return the new row id."""
+    with _lock:
+        conn = get_connection()
+        with conn:
+            return conn.execute(sql, params).lastrowid
+
+def _query(sql, params=()):
+    with _lock:
+        return get_connection().execute(sql, params).fetchall()
+
+def _query_one(sql, params=()):
+    rows = _query(sql, params)
+    return rows[0] if rows else None
+
+# To-dos
+
+def add_todo(text, todo_id=None):
+    """Insert a to-do and return its numeric id."""
+    return _execute("INSERT INTO todos (id, text) VALUES (?, ?)", (todo_id, text))
+
+def remove_todo(todo_id):
+    """Delete a to-do. Returns its text, or None if there was no such id."""
+    with _lock:
+        row = _query_one("SELECT text FROM todos WHERE id = ?", (todo_id,))
+        if row is None:
+            return None
+        _execute("DELETE FROM todos WHERE id = ?", (todo_id,))
+        return row["text"]
+
+def list_todos():
+    return [(row["id"], row["text"]) for row in _query("SELECT id, text FROM todos ORDER BY id")]
+
+# Reminders
+
+def _reminder_info(row):
+    info = {"task": row["task"], "time": row["time"], "recurring": row["recurring"]}
+    if row["day"]:
+        info["day"] = row["day"]
+    return info
+
+def add_reminder(info, next_fire_at=None, reminder_id=None):
+    """Insert a reminder ({"task", "time", "recurring", "day"}) and return its numeric id."""
+    return _execute(
+        "INSERT INTO reminders (id, task, time, recurring, day, next_fire_at) VALUES (?, ?, ?, ?, ?, ?)",
+        (reminder_id, info["task"], info["time"], info.get("recurring"), info.get("day"), next_fire_at),
+    )
+
+def remove_reminder(reminder_id):
+    """Delete a reminder. Returns its info dict, or None if there was no such id."""
+    with _lock:
+        row = _query_one("SELECT * FROM reminders WHERE id = ?", (reminder_id,))
+        if row is None:
+            return None
+        _execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+        return _reminder_info(row)
+
+def list_reminders():
+    return [(row["id"], _reminder_info(row)) for row in _query("SELECT * FROM reminders ORDER BY id")]
+
+def set_next_fire_at(reminder_id, next_fire_at):
+    _execute("UPDATE reminders SET next_fire_at = ? WHERE id = ?", (next_fire_at, reminder_id))
+
+def next_due_reminder():
+    """(id, info, next_fire_at) of the reminder due soonest, or None. Uses idx_reminders_next_fire_at."""
+    row = _query_one("SELECT * FROM reminders WHERE next_fire_at IS NOT NULL ORDER BY next_fire_at LIMIT 1")
+    if row is None:
+        return None
+    return row["id"], _reminder_info(row), row["next_fire_at"]
+
+def unscheduled_reminders():
+    """[(id, info), ...] of reminders with no next fire time (not yet scheduled)."""
+    return [(row["id"], _reminder_info(row))
+            for row in _query("SELECT * FROM reminders WHERE next_fire_at IS NULL ORDER BY id")]
+
+def data_version():
+    """Changes when another connection (another process) commits to the database."""
+    return _query_one("PRAGMA data_version")[0]
+
+# Migration bookkeeping
+
+def get_meta(key):
+    row = _query_one("SELECT value FROM meta WHERE key = ?", (key,))
+    return row["value"] if row else None
+
+def set_meta(key, value):
+    _execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
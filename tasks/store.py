@@ -0,0 +1,297 @@
+import os
+import json
+import atexit
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process flush lock
+    fcntl = None
+
+# In-memory JSON store with write-behind persistence. Reads come from memory
+# and writes only mark the store dirty. A timer flushes dirty stores
+# DEBOUNCE_SECONDS after the first change, so a burst of commands costs one
+# write. Writes go to a temp file in the same folder and are moved over the
+# real file with os.replace, so a crash mid-write never leaves a truncated
+# JSON file behind.
+#
+# The voice loop (main.py) and the Alexa server (app.py) are separate
+# processes sharing these files. So the store remembers which version of the
+# file it holds (inode, mtime, size; every write is a new inode). Before each
+# read it checks the file, which costs one stat, and reloads it if another
+# process has written it. Its own unsaved changes are kept per key and
+# replayed on top. A flush takes a lock file next to the store, reloads
+# first, then writes. Two processes changing different keys both keep their
+# changes; for the same key the last flush wins.
+#
+# Numbered keys ("task-7") are handed out by add_numbered(). The store keeps
+# the highest number per prefix in memory, and the lock file holds the
+# highest number any process has handed out, so taking the next one costs a
+# lock and a few bytes, not a scan of the keys or a write of the store.
+# Numbers only go up: a deleted number is not handed out again.
+
+DEBOUNCE_SECONDS = 1.0
+
+_DELETED = object()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+class JsonStore:
+    def __init__(self, path, debounce=DEBOUNCE_SECONDS):
+        self.path = path
+        self.debounce = debounce
+        self._data = None
+        self._pending = {}        # key -> value (or _DELETED) not written yet
+        self._signature = None    # (inode, mtime, size) of the file _data came from
+        self._highest = {}        # prefix -> highest number among the keys, once asked for
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._number_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _reload(self):
+        try:
+            with open(self.path, "r") as f:
+                st = os.fstat(f.fileno())
+                data = json.load(f)
+            signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            data, signature = {}, None
+        except json.JSONDecodeError as e:
+            print(f"[STORE ERROR] Could not parse {self.path}, starting empty: {e}")
+            data, signature = {}, self._file_signature()
+        for key, value in self._pending.items():
+            if value is _DELETED:
+                data.pop(key, None)
+            else:
+                data[key] = value
+        self._data = data
+        self._signature = signature
+        self._highest = {}
+
+    def _loaded(self):
+        if self._data is None or self._file_signature() != self._signature:
+            self._reload()
+        return self._data
+
+    # Reads
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._loaded().get(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._loaded()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._loaded())
+
+    def keys(self):
+        with self._lock:
+            return list(self._loaded())
+
+    def items(self):
+        with self._lock:
+            return list(self._loaded().items())
+
+    def version(self):
+        """Changes whenever the file is written, by this process or another one."""
+        return self._file_signature()
+
+    def snapshot(self):
+        """Shallow copy of the whole store."""
+        with self._lock:
+            return dict(self._loaded())
+
+    # Writes. Values are treated as immutable once stored: to change one, set() a new value.
+
+    def set(self, key, value):
+        with self._lock:
+            self._loaded()[key] = value
+            self._pending[key] = value
+            self._note_number(key)
+            self._mark_dirty()
+
+    def pop(self, key, default=None):
+        with self._lock:
+            data = self._loaded()
+            if key not in data:
+                return default
+            value = data.pop(key)
+            self._pending[key] = _DELETED
+            self._mark_dirty()
+            return value
+
+    def replace(self, data):
+        with self._lock:
+            for key in self._loaded():
+                if key not in data:
+                    self._pending[key] = _DELETED
+            self._pending.update(data)
+            self._data = dict(data)
+            self._highest = {}
+            self._mark_dirty()
+
+    # Persistence
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # Numbered keys
+
+    def _highest_number(self, prefix):
+        # Called with _lock held. One scan per prefix after each (re)load.
+        if prefix not in self._highest:
+            self._highest[prefix] = max((int(key[len(prefix):]) for key in self._loaded()
+                                         if key.startswith(prefix) and key[len(prefix):].isdigit()), default=0)
+        return self._highest[prefix]
+
+    def _note_number(self, key):
+        # Called with _lock held, so a key set() directly still counts
+        for prefix, highest in self._highest.items():
+            number = key[len(prefix):]
+            if key.startswith(prefix) and number.isdigit() and int(number) > highest:
+                self._highest[prefix] = int(number)
+
+    def add_numbered(self, prefix, value):
+        """Store value under the next free "<prefix><n>" key and return the key.
+
+        The number is reserved in the lock file, so the other process can't
+        hand out the same one before it sees this entry; the entry itself is
+        written by the usual debounced flush.
+        """
+        # _number_lock covers the threads of this process where there is no file lock
+        with self._number_lock:
+            with self._lock:
+                highest = self._highest_number(prefix)
+            with _file_lock(self.path) as lock_fd:
+                counters = _read_counters(lock_fd)
+                number = max(counters.get(prefix, 0), highest) + 1
+                counters[prefix] = number
+                _write_counters(lock_fd, counters)
+            key = f"{prefix}{number}"
+            self.set(key, value)
+        return key
+
+    def flush(self):
+        """Write the store to disk now if it has unsaved changes."""
+        # _flush_lock keeps two flushes (timer and atexit, say) from writing
+        # their snapshots out of order; the file lock does the same for other
+        # processes.
+        with self._flush_lock, _file_lock(self.path):
+            self._write()
+
+    def _write(self):
+        # Called with _flush_lock and the file lock held; _lock is only held for the copy
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            data = dict(self._loaded())  # picks up other processes' writes
+            pending, self._pending = self._pending, {}
+            self._dirty = False
+
+        try:
+            _atomic_write_json(self.path, data)
+        except Exception as e:
+            print(f"[STORE ERROR] Could not save {self.path}: {e}")
+            with self._lock:
+                self._pending = {**pending, **self._pending}
+                self._mark_dirty()
+            return
+        with self._lock:
+            # Changes made during the write are still pending; they reach the file next flush
+            self._signature = self._file_signature()
+
+@contextmanager
+def _file_lock(path):
+    """Exclusive lock on a hidden file next to path, held across processes while a store is written.
+
+    Yields the lock file's descriptor (None where there is no fcntl).
+    """
+    if fcntl is None:
+        yield None
+        return
+    folder, name = os.path.split(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd = os.open(os.path.join(folder, f".{name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)  # releases the lock
+
+def _read_counters(fd):
+    """{prefix: highest number handed out} kept in a store's lock file ({} without one)."""
+    if fd is None:
+        return {}
+    os.lseek(fd, 0, os.SEEK_SET)
+    raw = b""
+    while chunk := os.read(fd, 4096):
+        raw += chunk
+    try:
+        counters = json.loads(raw or b"{}")
+    except ValueError:
+        return {}
+    return counters if isinstance(counters, dict) else {}
+
+def _write_counters(fd, counters):
+    if fd is None:
+        return
+    raw = json.dumps(counters).encode()
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, raw)
+    os.ftruncate(fd, len(raw))
+
+def _atomic_write_json(path, data):
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def get_store(path):
+    """Shared store for a file, so every module that touches it sees the same data."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = JsonStore(path)
+        return store
+
+def flush_all():
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+atexit.register(flush_all)
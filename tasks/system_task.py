@@ -11,4 +11,4 @@ def handle_system(command):
             speak("Failed to close VLC.")
             print("[ERROR closing VLC]", e)
         return True
-    return False
\ No newline at end of file
+    return False
@@ -1,38 +1,40 @@
-import json
-import os
-import threading
-import tkinter as tk
 from speech_module import speak
+import ui_service
+from tasks.store import get_store
+from tasks import sqlite_store
+from tasks.sqlite_store import SQLITE_ENABLED
 
 TODO_FILE = "todo_list.json"
 
-# Ensure the file exists
-if not os.path.exists(TODO_FILE):
-    with open(TODO_FILE, "w") as f:
-        json.dump({}, f)
+todo_store = get_store(TODO_FILE)
 
 def load_tasks():
-    with open(TODO_FILE, "r") as f:
-        return json.load(f)
+    return todo_store.snapshot()
 
 def save_tasks(tasks):
-    with open(TODO_FILE, "w") as f:
-        json.dump(tasks, f, indent=4)
+    todo_store.replace(tasks)
+
+def list_tasks():
+    """[(task_id, text), ...] from whichever backend is active."""
+    if SQLITE_ENABLED:
+        return [(f"task-{n}", text) for n, text in sqlite_store.list_todos()]
+    return todo_store.items()
 
 def add_task(task_text):
-    tasks = load_tasks()
-    next_id = len(tasks) + 1
-    task_id = f"task-{next_id}"
-    tasks[task_id] = task_text
-    save_tasks(tasks)
+    if SQLITE_ENABLED:
+        task_id = f"task-{sqlite_store.add_todo(task_text)}"
+    else:
+        task_id = todo_store.add_numbered("task-", task_text)
     speak(f"{task_id} added: {task_text}")
     print(f"[✔] {task_id} added: {task_text}")
 
 def remove_task_by_id(task_id):
-    tasks = load_tasks()
-    if task_id in tasks:
-        removed = tasks.pop(task_id)
-        save_tasks(tasks)
+    if SQLITE_ENABLED:
+        number = task_id.replace("task-", "", 1)
+        removed = sqlite_store.remove_todo(int(number)) if number.isdigit() else None
+    else:
+        removed = todo_store.pop(task_id)
+    if removed is not None:
         speak(f"{task_id} removed.")
         print(f"[🗑️] {task_id} removed: {removed}")
     else:
@@ -40,41 +42,20 @@ def remove_task_by_id(task_id):
         print("[!] Task not found.")
 
 def show_tasks():
-    tasks = load_tasks()
+    tasks = list_tasks()
     if not tasks:
         speak("No tasks found.")
         print("[📝] No tasks in list.")
         return
 
-    lines = [f"{k}: {v}" for k, v in tasks.items()]
+    lines = [f"{k}: {v}" for k, v in tasks]
     task_text = "\n".join(lines)
     print("[📋] Current tasks:\n" + task_text)
     speak("Here are your tasks.")
     for line in lines:
         speak(line)
 
-    # GUI Window
-    def show_window():
-        root = tk.Tk()
-        root.title("To-Do List")
-        root.attributes("-fullscreen", True)
-        root.attributes("-topmost", True)
-
-        text_widget = tk.Text(root, wrap="word", font=("Helvetica", 20))
-        text_widget.insert("1.0", task_text)
-        text_widget.config(state="disabled")
-        text_widget.pack(padx=20, pady=20, fill="both", expand=True)
-
-        # Close button
-        def close():
-            root.destroy()
-
-        tk.Button(root, text="Close", command=close, font=("Helvetica", 16)).pack(pady=10)
-
-        root.after(10000, close)  # Auto-close after 10 seconds
-        root.mainloop()
-
-    threading.Thread(target=show_window).start()
+    ui_service.show_text("To-Do List", task_text, topmost=True)
 
 def handle_todo(command):
     command = command.strip()
@@ -0,0 +1,180 @@
+import re
+import time
+import socket
+import threading
+
+# Long-lived client for VLC's RC interface (started with --extraintf rc --rc-host).
+# It keeps one TCP connection open, reads every reply up to VLC's "> " prompt so
+# callers know whether a command worked, and reconnects with exponential backoff
+# when VLC is restarted. Several commands can be pipelined in one round trip.
+
+VLC_HOST = "localhost"
+VLC_PORT = 9999
+
+PROMPT = b"> "
+
+class VLCError(Exception):
+    pass
+
+class VLCClient:
+    def __init__(self, host=VLC_HOST, port=VLC_PORT, timeout=2.0,
+                 min_backoff=0.05, max_backoff=5.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self._sock = None
+        self._buffer = b""
+        self._lock = threading.Lock()
+        self._backoff = 0
+        self._retry_at = 0
+
+    # Connection handling
+
+    def _connect(self):
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise VLCError(f"VLC unreachable, next retry in {self._retry_at - now:.2f}s")
+        try:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            self._backoff = min(self.max_backoff, self._backoff * 2 or self.min_backoff)
+            self._retry_at = now + self._backoff
+            raise VLCError(f"Could not connect to VLC at {self.host}:{self.port}: {e}")
+        self._sock = sock
+        self._buffer = b""
+        self._backoff = 0
+        self._retry_at = 0
+        self._read_reply()  # welcome banner
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._buffer = b""
+
+    def reset(self):
+        """Forget the current connection and any backoff, e.g. right after starting a new VLC."""
+        with self._lock:
+            self._close()
+            self._backoff = 0
+            self._retry_at = 0
+
+    def _read_reply(self):
+        """Read up to the next prompt and return the text before it."""
+        while True:
+            if self._buffer.startswith(PROMPT):
+                self._buffer = self._buffer[len(PROMPT):]
+                return ""
+            end = self._buffer.find(b"\n" + PROMPT)
+            if end != -1:
+                reply = self._buffer[:end]
+                self._buffer = self._buffer[end + 1 + len(PROMPT):]
+                return reply.decode(errors="replace").replace("\r", "")
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("VLC closed the connection")
+            self._buffer += chunk
+
+    # Commands
+
+    def send_many(self, commands):
+        """Pipeline several commands in one write and return their replies, in order."""
+        payload = "".join(cmd.strip() + "\n" for cmd in commands).encode()
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    self._sock.sendall(payload)
+                    return [self._read_reply() for _ in commands]
+                except socket.timeout as e:
+                    # VLC is alive but slow; resending could run the command twice
+                    self._close()
+                    raise VLCError(f"VLC did not answer: {e}")
+                except (OSError, ConnectionError) as e:
+                    # VLC went away (restart, crash); reconnect once before giving up
+                    self._close()
+                    if attempt == 1:
+                        raise VLCError(f"VLC command failed: {e}")
+
+    def command(self, cmd):
+        return self.send_many([cmd])[0]
+
+    # Queries
+
+    def status(self):
+        """Parse `status` into {"input": ..., "volume": ..., "state": ...}."""
+        return parse_status(self.command("status"))
+
+    def get_time(self):
+        """Seconds into the current item, or None when nothing is playing."""
+        reply = self.command("get_time").strip()
+        return int(reply) if reply.lstrip("-").isdigit() else None
+
+    def get_title(self):
+        return self.command("get_title").strip()
+
+    def playlist(self):
+        """Entries of the "Playlist" node as a list of {"id", "title", "current"} dicts.
+
+        VLC prints a tree like:
+            +----[ Playlist - playlist ]
+            | 1 - Playlist
+            |   4 - song.mp3 (00:03:12) [played 1 time]
+            |   *5 - other.mp3 (00:04:00)
+            | 2 - Media Library
+            +----[ End of playlist ]
+        """
+        items = []
+        in_playlist = False
+        for line in self.command("playlist").splitlines():
+            if not line.startswith("|"):
+                continue
+            body = line[1:]
+            depth = len(body) - len(body.lstrip())
+            body = body.strip()
+            current = body.startswith("*")
+            number, _, title = body.lstrip("*").partition(" - ")
+            if not number.isdigit():
+                continue
+            if depth <= 1:
+                in_playlist = title.strip() == "Playlist"
+                continue
+            if in_playlist:
+                title = re.sub(r"\s*\[played \d+ times?\]$", "", title.strip())
+                title = re.sub(r"\s*\(\d+:\d+:\d+\)$", "", title)
+                items.append({"id": int(number), "title": title, "current": current})
+        return items
+
+    def now_playing(self):
+        """Short description of what VLC is playing, or None."""
+        title, status = self.send_many(["get_title", "status"])
+        state = parse_status(status).get("state")
+        if not title.strip() or state in (None, "stopped"):
+            return None
+        return f"{title.strip()} ({state})"
+
+def parse_status(text):
+    info = {}
+    for line in text.splitlines():
+        line = line.strip().strip("()").strip()
+        if line.startswith("new input:"):
+            info["input"] = line[len("new input:"):].strip()
+        elif line.startswith("audio volume:"):
+            try:
+                info["volume"] = int(float(line[len("audio volume:"):].strip()))
+            except ValueError:
+                pass
+        elif line.startswith("state "):
+            info["state"] = line[len("state "):].strip()
+    return info
@@ -1,30 +1,145 @@
+import os
+import time
+import threading
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from speech_module import speak
+from tasks.store import get_store
+from tasks.resources import holding, VLC
+
+# "open youtube and play <keyword>" finds the video with yt-dlp and hands its
+# stream URL to the VLC that media_task controls (restarted with video output
+# if it was playing music), so pause/stop/volume and "close play" work on it
+# like on local media. No browser, no screen
+# coordinates. The handler only queues the request and returns; a single
+# background worker does the search and starts playback. If a newer request
+# comes in while one is still being resolved, the older one is dropped.
+#
+# Results are cached by keyword in CACHE_FILE. Which video a search finds
+# rarely changes, so that part is kept for SEARCH_TTL_SECONDS. The stream URL
+# stops working when YouTube's "expire" parameter passes; until shortly before
+# then the cached URL is played without asking YouTube anything. After that,
+# only the known video is resolved again and the search itself is skipped.
+#
+# The resolver is a plain function, resolve(target) -> {"id", "title", "url"}
+# and optionally "expires", where target is "ytsearch1:<keyword>" or a watch
+# URL. Pass another one to set_resolver() to run without yt-dlp or the network.
+
+CACHE_FILE = os.path.join("data", "youtube_cache.json")
+MAX_CACHED = 200
+SEARCH_TTL_SECONDS = 7 * 24 * 3600
+STREAM_TTL_SECONDS = 5 * 3600     # when the URL doesn't say when it expires
+EXPIRY_MARGIN_SECONDS = 600       # don't start a video on a URL that is about to die
+
+# One file with audio and video in it: VLC is handed a single URL
+YTDL_OPTIONS = {
+    "quiet": True,
+    "no_warnings": True,
+    "noplaylist": True,
+    "format": "best[vcodec!=none][acodec!=none]/best",
+}
+
+class ResolveError(Exception):
+    pass
+
+def resolve_with_ytdlp(target):
+    try:
+        import yt_dlp
+    except ImportError:
+        raise ResolveError("yt-dlp is not installed (pip install yt-dlp)")
+    try:
+        with yt_dlp.YoutubeDL(YTDL_OPTIONS) as ydl:
+            info = ydl.extract_info(target, download=False)
+    except yt_dlp.utils.DownloadError as e:
+        raise ResolveError(str(e))
+    if info and "entries" in info:
+        info = next(iter(info["entries"] or []), None)
+    if not info or not info.get("url"):
+        raise ResolveError(f"No playable result for {target!r}")
+    return {"id": info["id"], "title": info.get("title") or info["id"], "url": info["url"]}
+
+_resolver = resolve_with_ytdlp
+
+def set_resolver(resolve):
+    global _resolver
+    _resolver = resolve
+
+cache = get_store(CACHE_FILE)
+
+def cache_key(keyword):
+    return " ".join(keyword.lower().split())
+
+def watch_url(video_id):
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+def stream_expiry(url, now):
+    """When a googlevideo URL stops working, from its expire= parameter."""
+    expire = parse_qs(urlparse(url).query).get("expire", [""])[0]
+    return int(expire) if expire.isdigit() else now + STREAM_TTL_SECONDS
+
+def lookup(keyword):
+    """{"id", "title", "url", ...} for the first search result, from the cache when it is still playable."""
+    key = cache_key(keyword)
+    now = time.time()
+    entry = cache.get(key)
+    searched = entry is not None and now - entry["searched"] < SEARCH_TTL_SECONDS
+    if searched and now < entry["expires"] - EXPIRY_MARGIN_SECONDS:
+        print(f"[YOUTUBE DEBUG] Cache hit for {key!r}")
+        entry = dict(entry, used=now)
+    else:
+        info = _resolver(watch_url(entry["id"]) if searched else f"ytsearch1:{key}")
+        entry = {"id": info["id"], "title": info["title"], "url": info["url"],
+                 "expires": info.get("expires") or stream_expiry(info["url"], now),
+                 "searched": entry["searched"] if searched else now, "used": now}
+    cache.set(key, entry)
+    _trim_cache()
+    return entry
+
+def _trim_cache():
+    if len(cache) <= MAX_CACHED:
+        return
+    by_use = sorted(cache.items(), key=lambda item: item[1].get("used", 0))
+    for key, _ in by_use[:len(by_use) - MAX_CACHED]:
+        cache.pop(key)
+
+_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="youtube")
+_latest = 0
+_latest_lock = threading.Lock()
+
+def _play(keyword, request):
+    # Runs on _worker, where nobody would see an exception; report everything here
+    try:
+        if request != _latest:
+            print(f"[YOUTUBE DEBUG] Skipping {keyword!r}, a newer request came in")
+            return
+        entry = lookup(keyword)
+        if request != _latest:
+            print(f"[YOUTUBE DEBUG] Skipping {keyword!r}, a newer request came in")
+            return
+        from tasks.media_task import play_url
+        with holding((VLC,)):
+            play_url(entry["url"])
+        speak(f"Playing {entry['title']}")
+    except ResolveError as e:
+        speak(f"I couldn't find {keyword} on YouTube.")
+        print(f"[YOUTUBE ERROR] {e}")
+    except Exception as e:
+        speak("Something went wrong while trying to play YouTube.")
+        print(f"[YOUTUBE ERROR] {e}")
+
 def handle_youtube(command):
+    global _latest
     command = command.lower()
     if "open youtube and play" in command:
-        import subprocess, time
-        import pyautogui
-        from speech_module import speak
-
         keyword = command.replace("open youtube and play", "").strip()
         if not keyword:
             speak("Please tell me what to search for on YouTube.")
             return True
 
-        try:
-            url = "https://www.youtube.com"
-            subprocess.Popen(["firefox", url])
-            speak(f"Opening YouTube and searching for {keyword}")
-
-            time.sleep(7)
-            pyautogui.write(keyword)
-            time.sleep(1)
-            pyautogui.press("enter")
-            time.sleep(5)
-            pyautogui.moveTo(400, 350)
-            pyautogui.click()
-            return True
-        except Exception as e:
-            speak("Something went wrong while trying to open YouTube.")
-            print(f"[ERROR] {e}")
-            return True
-    return False
\ No newline at end of file
+        speak(f"Searching YouTube for {keyword}")
+        with _latest_lock:
+            _latest += 1
+            request = _latest
+        _worker.submit(_play, keyword, request)
+        return True
+    return False
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the modules at the repo root (and the stubs in benchmarks/) the
+# way the apps do, with the repo root as the working directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+"""endpoint_sync against benchmarks.stub_smapi: what is sent, and that failures stay in the background."""
+import os
+import time
+
+import pytest
+
+import endpoint_sync
+from benchmarks.stub_smapi import StubSmapiServer
+from tasks.store import JsonStore
+
+NEW_URL = "https://new.example.ngrok-free.app/alexa"
+
+@pytest.fixture
+def smapi(monkeypatch, tmp_path):
+    server = StubSmapiServer(status_polls=2).start()
+    for name, value in server.env().items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(endpoint_sync, "state_store", JsonStore(os.path.join(tmp_path, "alexa_endpoint.json")))
+    monkeypatch.setattr(endpoint_sync, "STATUS_POLL_SECONDS", 0.01)
+    yield server
+    server.shutdown()
+
+def puts(server):
+    return server.calls[f"PUT /v1/skills/{server.skill_id}/stages/development/manifest"]
+
+def test_url_already_published_sends_nothing(smapi):
+    endpoint_sync.remember_published(NEW_URL, "smapi")
+    assert endpoint_sync.sync_endpoint(NEW_URL) == "unchanged"
+    assert sum(smapi.calls.values()) == 0
+
+def test_manifest_already_pointing_at_url_sends_no_put(smapi):
+    assert endpoint_sync.sync_endpoint(smapi.endpoint) == "smapi"
+    assert puts(smapi) == 0
+    assert endpoint_sync.last_published() == smapi.endpoint
+
+def test_changed_url_sends_one_put_with_the_etag(smapi):
+    assert endpoint_sync.sync_endpoint(NEW_URL) == "smapi"
+    assert puts(smapi) == 1
+    assert smapi.if_match == ['"1"']   # the ETag the manifest GET returned
+    assert smapi.endpoint == NEW_URL
+    assert smapi.calls[f"GET /v1/skills/{smapi.skill_id}/status"] == 3   # two IN_PROGRESS, then SUCCEEDED
+    assert endpoint_sync.last_published() == NEW_URL
+
+    # Published once; the next boot with the same URL sends nothing
+    assert endpoint_sync.sync_endpoint(NEW_URL) == "unchanged"
+    assert puts(smapi) == 1
+
+def test_failure_does_not_block_startup(smapi, monkeypatch):
+    monkeypatch.setenv("SMAPI_URL", "http://localhost:9")   # nothing listens there
+    monkeypatch.setattr(endpoint_sync, "RETRY_SECONDS", (0.05,))
+    syncer = endpoint_sync.EndpointSyncer()
+
+    started = time.perf_counter()
+    syncer.request(NEW_URL)
+    assert time.perf_counter() - started < 0.1   # the caller (server start-up) goes straight on
+
+    assert syncer.wait(timeout=10)
+    assert isinstance(syncer.last_error, Exception)
+    assert endpoint_sync.last_published() is None
+    assert puts(smapi) == 0
+
+    # Once SMAPI can be reached the retry publishes the URL
+    monkeypatch.setenv("SMAPI_URL", smapi.url)
+    deadline = time.monotonic() + 10
+    while endpoint_sync.last_published() != NEW_URL and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert endpoint_sync.last_published() == NEW_URL
+    assert puts(smapi) == 1
+    assert syncer.wait(timeout=10)
+    assert syncer.last_error is None
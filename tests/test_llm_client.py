@@ -0,0 +1,93 @@
+"""tasks.llm_client against benchmarks.stub_groq: retries, caching, timeouts and streaming."""
+import pytest
+
+from benchmarks.stub_groq import StubGroqServer
+from tasks import llm_client
+from tasks.llm_client import LLMClient, LLMError
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_client, "BACKOFF_SECONDS", 0.0)
+
+def start_stub(**kwargs):
+    return StubGroqServer(**kwargs).start()
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_then_succeeds(status):
+    server = start_stub(fail_first=2, fail_status=status)
+    try:
+        client = LLMClient(url=server.url, api_key="test", retries=2)
+        answer = client.complete("what time is it")
+        assert answer == "This is the stub answer to: what time is it. It has a second sentence. And a third one."
+        assert server.requests == 3
+        assert client.totals["retries"] == 2
+        assert client.calls[-1]["attempts"] == 3
+    finally:
+        server.shutdown()
+
+def test_gives_up_after_retries():
+    server = start_stub(fail_first=10, fail_status=503)
+    try:
+        client = LLMClient(url=server.url, api_key="test", retries=2)
+        with pytest.raises(LLMError, match="503"):
+            client.complete("hello")
+        assert server.requests == 3
+        assert client.totals["errors"] == 1
+    finally:
+        server.shutdown()
+
+def test_cache_hit_sends_no_second_request():
+    server = start_stub()
+    try:
+        client = LLMClient(url=server.url, api_key="test", cache_ttl=60)
+        first = client.complete("What is the capital of France?")
+        second = client.complete("what is the capital of   france")
+        assert second == first
+        assert server.requests == 1
+        assert client.totals["cache_hits"] == 1
+    finally:
+        server.shutdown()
+
+def test_expired_cache_entry_is_asked_again():
+    server = start_stub()
+    try:
+        client = LLMClient(url=server.url, api_key="test", cache_ttl=-1)
+        client.complete("hello")
+        client.complete("hello")
+        assert server.requests == 2
+    finally:
+        server.shutdown()
+
+def test_timeout_raises_llm_error():
+    server = start_stub(latency=1.0)
+    try:
+        client = LLMClient(url=server.url, api_key="test", timeout=(1.0, 0.2), retries=1)
+        with pytest.raises(LLMError, match="unreachable"):
+            client.complete("slow question")
+        assert server.requests == 2
+    finally:
+        server.shutdown()
+
+def test_stream_reassembles_pieces_in_order():
+    answer = "one two three four five six seven eight nine ten"
+    server = start_stub(answer=lambda prompt: answer, token_delay=0.001)
+    try:
+        client = LLMClient(url=server.url, api_key="test")
+        pieces = list(client.stream("count to ten"))
+        assert len(pieces) == 10
+        assert "".join(pieces) == answer
+        assert client.calls[-1]["completion_tokens"] == 10
+        # The whole answer is cached for the next ask, streamed or not
+        assert client.complete("count to ten") == answer
+        assert server.requests == 1
+    finally:
+        server.shutdown()
+
+def test_stream_sentences_in_order():
+    server = start_stub()
+    try:
+        client = LLMClient(url=server.url, api_key="test")
+        assert list(llm_client.sentences(client.stream("the sky"))) == [
+            "This is the stub answer to: the sky.", "It has a second sentence.", "And a third one."]
+    finally:
+        server.shutdown()
@@ -0,0 +1,80 @@
+"""tunnel.TunnelSupervisor against benchmarks.fake_ngrok, republishing through endpoint_sync and the SMAPI stub."""
+import os
+import time
+import socket
+
+import pytest
+import requests
+
+import tunnel
+import endpoint_sync
+from tunnel import TunnelSupervisor
+from benchmarks import fake_ngrok
+from benchmarks.stub_smapi import StubSmapiServer
+from tasks.store import JsonStore
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+def wait_until(condition, timeout=20):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+@pytest.fixture
+def smapi(monkeypatch, tmp_path):
+    server = StubSmapiServer(status_polls=0).start()
+    for name, value in server.env().items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(endpoint_sync, "state_store", JsonStore(os.path.join(tmp_path, "alexa_endpoint.json")))
+    monkeypatch.setattr(endpoint_sync, "STATUS_POLL_SECONDS", 0.01)
+    yield server
+    server.shutdown()
+
+@pytest.fixture
+def supervisor(monkeypatch, smapi):
+    monkeypatch.chdir(REPO)   # the fake runs as python -m benchmarks.fake_ngrok
+    monkeypatch.setattr(tunnel, "HEALTH_SECONDS", 0.1)
+    port = free_port()
+    syncer = endpoint_sync.EndpointSyncer()
+    supervisor = TunnelSupervisor(5000, on_url=syncer.request, api_url=f"http://localhost:{port}/api/tunnels",
+                                  command=fake_ngrok.command(port, ready_after=0.05, chatter=100))
+    supervisor.syncer = syncer
+    supervisor.fake_api = f"http://localhost:{port}"
+    yield supervisor
+    supervisor.stop()
+
+def puts(server):
+    return server.calls[f"PUT /v1/skills/{server.skill_id}/stages/development/manifest"]
+
+def test_start_publishes_the_url(supervisor, smapi):
+    url = supervisor.start()
+    assert url.startswith("https://") and url.endswith(".ngrok-free.app/alexa")
+    assert wait_until(lambda: smapi.endpoint == url)
+    assert supervisor.syncer.wait(timeout=10)
+    assert puts(smapi) == 1
+
+@pytest.mark.parametrize("failure", ["kill", "exit", "drop"])
+def test_restart_publishes_the_new_url(supervisor, smapi, failure):
+    first = supervisor.start()
+    assert wait_until(lambda: smapi.endpoint == first)
+
+    if failure == "kill":
+        supervisor._process.kill()
+    else:
+        requests.post(supervisor.fake_api + f"/fake/{failure}", timeout=2)
+
+    assert wait_until(lambda: supervisor.public_url != first), "the supervisor never picked up a new URL"
+    second = supervisor.public_url
+    assert supervisor.restarts == 1
+    assert wait_until(lambda: smapi.endpoint == second), "the new URL was not republished"
+    assert supervisor.syncer.wait(timeout=10)
+    assert puts(smapi) == 2
+    assert endpoint_sync.last_published() == second
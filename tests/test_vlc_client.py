@@ -0,0 +1,121 @@
+"""tasks.vlc_client against benchmarks.fake_vlc_rc (and a few hand-rolled sockets for the awkward cases)."""
+import time
+import socket
+import threading
+
+import pytest
+
+from benchmarks.fake_vlc_rc import FakeVLCServer, BANNER
+from tasks.vlc_client import VLCClient, VLCError
+
+@pytest.fixture
+def server():
+    server = FakeVLCServer().start()
+    yield server
+    server.stop()
+
+def test_multi_line_reply_is_read_up_to_the_prompt(server):
+    client = VLCClient(port=server.port)
+    reply = client.command("status")
+    assert reply.splitlines() == ["( new input: file:///music/track-001.mp3 )", "( audio volume: 256 )",
+                                  "( state playing )"]
+    assert client.status() == {"input": "file:///music/track-001.mp3", "volume": 256, "state": "playing"}
+    assert [item["title"] for item in client.playlist()] == [f"track-{n:03d}.mp3" for n in range(1, 6)]
+    # Nothing of one reply is left over for the next
+    assert client.get_title() == "track-001.mp3"
+
+def test_pipelined_replies_come_back_in_order(server):
+    client = VLCClient(port=server.port)
+    replies = client.send_many(["get_title", "next", "get_title", "status"])
+    assert replies[0] == "track-001.mp3"
+    assert replies[1] == ""
+    assert replies[2] == "track-002.mp3"
+    assert "state playing" in replies[3]
+
+def test_reply_split_across_packets():
+    """A reply (and the prompt itself) may arrive a few bytes at a time."""
+    listener = socket.create_server(("localhost", 0))
+
+    def serve():
+        conn, _ = listener.accept()
+        with conn:
+            conn.sendall((BANNER + "> ").encode())
+            conn.recv(1024)
+            for piece in (b"( audio vol", b"ume: 128 )\n( sta", b"te paused )\n", b">", b" "):
+                conn.sendall(piece)
+                time.sleep(0.02)
+            conn.recv(1024)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    try:
+        client = VLCClient(port=listener.getsockname()[1])
+        assert client.status() == {"volume": 128, "state": "paused"}
+        client.close()
+    finally:
+        thread.join(2)
+        listener.close()
+
+def test_reconnects_after_the_server_hangs_up(server):
+    client = VLCClient(port=server.port)
+    assert client.get_title() == "track-001.mp3"
+    server.drop_connections()
+    time.sleep(0.05)
+    # The dead connection is noticed, and the command resent on a new one
+    assert client.get_title() == "track-001.mp3"
+
+def test_backs_off_while_vlc_is_down_then_reconnects(server):
+    port = server.port
+    client = VLCClient(port=port, min_backoff=0.1, max_backoff=0.4)
+    client.get_title()
+    server.stop()
+
+    with pytest.raises(VLCError, match="Could not connect"):
+        client.get_title()
+    # Within the backoff nothing is tried at all
+    with pytest.raises(VLCError, match="next retry"):
+        client.get_title()
+    waits = []
+    for _ in range(4):
+        time.sleep(client._retry_at - time.monotonic() + 0.01)
+        with pytest.raises(VLCError, match="Could not connect"):
+            client.get_title()
+        waits.append(client._backoff)
+    assert waits == [0.2, 0.4, 0.4, 0.4]   # doubles up to max_backoff
+
+    restarted = FakeVLCServer(port=port).start()
+    try:
+        time.sleep(client._retry_at - time.monotonic() + 0.01)
+        assert client.get_title() == "track-001.mp3"
+        assert client._backoff == 0
+    finally:
+        restarted.stop()
+
+def test_raises_once_retries_run_out(server):
+    client = VLCClient(port=server.port)
+    client.get_title()
+    server.stop()
+    # The connection is gone and so is the listener: one reconnect, then VLCError
+    with pytest.raises(VLCError):
+        client.command("pause")
+
+def test_raises_when_vlc_stops_answering():
+    listener = socket.create_server(("localhost", 0))
+    accepted = []
+
+    def serve():
+        conn, _ = listener.accept()
+        accepted.append(conn)
+        conn.sendall((BANNER + "> ").encode())   # then never answers
+
+    threading.Thread(target=serve, daemon=True).start()
+    try:
+        client = VLCClient(port=listener.getsockname()[1], timeout=0.2)
+        started = time.monotonic()
+        with pytest.raises(VLCError, match="did not answer"):
+            client.command("status")
+        assert time.monotonic() - started < 1
+    finally:
+        for conn in accepted:
+            conn.close()
+        listener.close()
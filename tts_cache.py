@@ -0,0 +1,87 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from tasks.store import get_store
+from tasks.disk_cache import DiskLRU
+
+# On-disk cache of synthesized speech. A clip is rendered to WAV once and stored
+# under a hash of (voice, rate, text), so changing the voice or speed never
+# plays a stale clip. index.json records each clip's size and when it was last
+# played; once the folder grows past MAX_CACHE_BYTES the least recently played
+# clips are deleted.
+#
+# Only text that is likely to come back is cached: the fixed responses below,
+# and anything spoken a second time. One-off text (reminder contents, answers
+# from the LLM) is spoken directly and never written to disk. To spot the
+# second time, the last MAX_SEEN texts spoken are remembered, oldest dropped
+# first, so a long session of streamed answers doesn't grow without end.
+
+CACHE_DIR = "tts_cache"
+MAX_CACHE_BYTES = 50 * 1024 * 1024
+MAX_SEEN = 2000
+
+KNOWN_PHRASES = (
+    "Jarvis ready. Say 'ok jarvis' or 'ok bro' followed by your command.",
+    "Sorry, I didn't understand that command.",
+    "Here are your tasks.",
+    "No tasks found.",
+    "Task not found.",
+    "Here are your reminders.",
+    "No reminders found.",
+    "Reminder not found.",
+    "Sorry, I couldn't understand the reminder.",
+    "Invalid time format. Please say time like 5:30 p.m.",
+    "Starting slideshow now.",
+    "Slideshow paused.",
+    "Resuming slideshow.",
+    "Stopping slideshow.",
+    "No slideshow is currently running.",
+    "Slideshow is not running or already paused.",
+    "Slideshow is not paused or not running.",
+    "No pictures found in your Pictures folder.",
+    "Closed VLC player.",
+    "Failed to close VLC.",
+    "Failed to control VLC.",
+    "Unsupported media category.",
+    "Please tell me what to search for on YouTube.",
+)
+
+disk_cache = DiskLRU(CACHE_DIR, get_store(os.path.join(CACHE_DIR, "index.json")), MAX_CACHE_BYTES, ".wav")
+
+_lock = threading.Lock()
+_known = frozenset(KNOWN_PHRASES)
+_seen = OrderedDict()   # text spoken once -> None, least recently spoken first
+
+def clip_key(text, voice, rate):
+    return hashlib.sha1(f"{voice}\0{rate}\0{text}".encode("utf-8")).hexdigest()
+
+def should_cache(text):
+    """True for fixed responses and for text heard before; remembers `text` either way."""
+    with _lock:
+        if text in _known:
+            return True
+        if text in _seen:
+            _seen.move_to_end(text)
+            return True
+        _seen[text] = None
+        if len(_seen) > MAX_SEEN:
+            _seen.popitem(last=False)
+        return False
+
+def is_known(text):
+    """True if text is a fixed response or has been spoken before (so it has or will get a clip)."""
+    with _lock:
+        return text in _known or text in _seen
+
+def lookup(text, voice, rate):
+    """Path of the cached clip for this utterance, or None. Marks the clip as just used."""
+    return disk_cache.lookup(clip_key(text, voice, rate))
+
+def store(text, voice, rate, render):
+    """Render an utterance into the cache with render(path) and return the clip's path.
+
+    render must write a complete WAV file to the path it is given; it writes to
+    a temporary name first, so a crash mid-render never leaves a broken clip.
+    """
+    return disk_cache.store(clip_key(text, voice, rate), render, text=text[:80])
@@ -0,0 +1,179 @@
+import os
+import time
+import logging
+import threading
+import subprocess
+from collections import deque
+import requests
+
+# Runs ngrok and keeps it healthy.
+#
+# After starting the process, the supervisor polls ngrok's local API until a
+# public https tunnel shows up. The first poll comes after a few milliseconds;
+# the wait doubles up to a cap, so a quick start is noticed at once and a slow
+# one isn't hammered. ngrok's output is read continuously on its own thread
+# (a full, unread pipe would block it); the last lines are kept for error
+# messages. A watch thread then checks the process and the tunnel every
+# HEALTH_SECONDS. If ngrok exits, or its API stops listing the tunnel for
+# UNHEALTHY_CHECKS checks in a row, ngrok is restarted. Whenever the public
+# URL differs from the last one, on_url(url) is called so the caller can
+# republish it.
+
+log = logging.getLogger("jarvis.tunnel")
+
+API_URL = os.getenv("NGROK_API_URL", "http://localhost:4040/api/tunnels")
+READY_TIMEOUT_SECONDS = 20
+FIRST_POLL_SECONDS = 0.005
+MAX_POLL_SECONDS = 0.1
+HEALTH_SECONDS = 10
+UNHEALTHY_CHECKS = 3
+RESTART_BACKOFF_SECONDS = (1, 5, 30)
+OUTPUT_LINES = 50
+
+class TunnelError(Exception):
+    pass
+
+def ngrok_command(port):
+    return ["ngrok", "http", str(port), "--log", "stdout"]
+
+class TunnelSupervisor:
+    def __init__(self, port, on_url=None, command=None, api_url=API_URL, path="/alexa"):
+        self.port = port
+        self.on_url = on_url
+        self.command = command or ngrok_command(port)
+        self.api_url = api_url
+        self.path = path
+        self.public_url = None
+        self.restarts = 0
+        self.output = deque(maxlen=OUTPUT_LINES)
+        self.output_lines = 0
+        self._process = None
+        self._session = requests.Session()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    # ngrok process
+
+    def _spawn(self):
+        self._process = subprocess.Popen(self.command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                         stdin=subprocess.DEVNULL, text=True, errors="replace")
+        threading.Thread(target=self._drain, args=(self._process,), name="ngrok-output", daemon=True).start()
+
+    def _drain(self, process):
+        for line in process.stdout:
+            line = line.rstrip()
+            self.output.append(line)
+            self.output_lines += 1
+            log.debug("ngrok: %s", line)
+        process.stdout.close()
+
+    def _kill(self):
+        process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    # ngrok API
+
+    def current_url(self):
+        """The public https URL ngrok's API lists (with path appended), or None."""
+        try:
+            response = self._session.get(self.api_url, timeout=(0.5, 2))
+            response.raise_for_status()
+            tunnels = response.json().get("tunnels") or []
+        except (requests.RequestException, ValueError):
+            return None
+        urls = [t.get("public_url", "") for t in tunnels]
+        url = next((u for u in urls if u.startswith("https://")), urls[0] if urls else None)
+        return url + self.path if url else None
+
+    def _wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        delay = FIRST_POLL_SECONDS
+        while True:
+            url = self.current_url()
+            if url:
+                return url
+            if self._process.poll() is not None:
+                raise TunnelError(f"ngrok exited with code {self._process.returncode}: {self._last_output()}")
+            if time.monotonic() + delay > deadline:
+                raise TunnelError(f"ngrok did not open a tunnel within {timeout}s: {self._last_output()}")
+            time.sleep(delay)
+            delay = min(delay * 2, MAX_POLL_SECONDS)
+
+    def _last_output(self):
+        return " | ".join(list(self.output)[-5:]) or "no output"
+
+    def _open(self, timeout):
+        started = time.perf_counter()
+        self._spawn()
+        try:
+            url = self._wait_ready(timeout)
+        except TunnelError:
+            self._kill()
+            raise
+        log.info("Tunnel ready in %.0f ms: %s", (time.perf_counter() - started) * 1000, url)
+        self._set_url(url)
+        return url
+
+    def _set_url(self, url):
+        if url == self.public_url:
+            return
+        self.public_url = url
+        if self.on_url:
+            try:
+                self.on_url(url)
+            except Exception:
+                log.exception("on_url callback failed for %s", url)
+
+    # Lifecycle
+
+    def start(self, timeout=READY_TIMEOUT_SECONDS):
+        """Start ngrok, wait for its public URL, and start watching it. Returns the URL; raises TunnelError."""
+        url = self._open(timeout)
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="tunnel-watch", daemon=True)
+        self._watcher.start()
+        return url
+
+    def _watch(self):
+        misses = 0
+        while not self._stop.wait(HEALTH_SECONDS):
+            process = self._process
+            url = self.current_url() if process and process.poll() is None else None
+            if url:
+                misses = 0
+                self._set_url(url)
+                continue
+            misses += 1
+            if process is None or process.poll() is not None or misses >= UNHEALTHY_CHECKS:
+                log.warning("Tunnel is down (%s); restarting ngrok",
+                            "process exited" if process is None or process.poll() is not None
+                            else f"API has not listed it for {misses} checks")
+                self._restart()
+                misses = 0
+
+    def _restart(self):
+        attempt = 0
+        while not self._stop.is_set():
+            self._kill()
+            self.restarts += 1
+            try:
+                self._open(READY_TIMEOUT_SECONDS)
+                return
+            except TunnelError as e:
+                delay = RESTART_BACKOFF_SECONDS[min(attempt, len(RESTART_BACKOFF_SECONDS) - 1)]
+                attempt += 1
+                log.error("Could not restart ngrok (trying again in %gs): %s", delay, e)
+                self._stop.wait(delay)
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher and self._watcher is not threading.current_thread():
+            self._watcher.join(timeout=HEALTH_SECONDS + READY_TIMEOUT_SECONDS)
+        self._kill()
@@ -0,0 +1,200 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+# One thread owns the only Tk interpreter. Everything else asks it to show
+# things through a queue: show_text, show_alert, or call() for code that has to
+# touch widgets itself (the slideshow). The root window stays hidden. Each
+# kind of window is a Toplevel built the first time it is needed. Closing it
+# only hides it, so the next popup of that kind reuses it.
+#
+# Tk is not thread-safe. Code outside this module must never touch a widget
+# directly; it goes through call().
+
+POLL_MS = 20              # how often the UI thread checks the queue
+TEXT_CLOSE_SECONDS = 10   # task and reminder lists close themselves after this
+
+_requests = queue.Queue()
+_thread = None
+_start_lock = threading.Lock()
+_root = None
+_windows = {}             # kind -> window; only touched on the UI thread
+_unavailable = None       # why Tk could not start, once it has failed
+
+class _Window:
+    """A fullscreen Toplevel that hides instead of closing."""
+
+    def __init__(self, root, title):
+        import tkinter as tk
+        self.top = tk.Toplevel(root)
+        self.top.title(title)
+        self.top.withdraw()
+        self.top.attributes("-fullscreen", True)
+        self.top.protocol("WM_DELETE_WINDOW", self.hide)
+        self.top.bind("<Escape>", lambda event: self.hide())
+        self.on_hide = None
+        self._close_job = None
+
+    @property
+    def visible(self):
+        return self.top.winfo_viewable()
+
+    def show(self, close_after=None, topmost=False):
+        self._cancel_close()
+        self.top.attributes("-topmost", topmost)
+        self.top.deiconify()
+        self.top.lift()
+        if close_after:
+            self._close_job = self.top.after(int(close_after * 1000), self.hide)
+
+    def hide(self):
+        self._cancel_close()
+        self.top.withdraw()
+        on_hide, self.on_hide = self.on_hide, None
+        if on_hide:
+            on_hide()
+
+    def _cancel_close(self):
+        if self._close_job is not None:
+            self.top.after_cancel(self._close_job)
+            self._close_job = None
+
+class _TextWindow(_Window):
+    def __init__(self, root):
+        import tkinter as tk
+        super().__init__(root, "Jarvis")
+        self.text = tk.Text(self.top, wrap="word", font=("Helvetica", 20))
+        self.text.pack(padx=20, pady=20, fill="both", expand=True)
+        tk.Button(self.top, text="Close", command=self.hide, font=("Helvetica", 16)).pack(pady=10)
+
+    def set(self, title, text):
+        self.top.title(title)
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("1.0", text)
+        self.text.config(state="disabled")
+
+class _AlertWindow(_Window):
+    def __init__(self, root):
+        import tkinter as tk
+        super().__init__(root, "Reminder")
+        self.label = tk.Label(self.top, font=("Helvetica", 20), fg="white", bg="black", wraplength=1000)
+        self.label.pack(padx=20, pady=20, fill="both", expand=True)
+        tk.Button(self.top, text="Dismiss", command=self.hide, font=("Helvetica", 14)).pack(pady=20)
+        self.top.configure(bg="black")
+
+class _ImageWindow(_Window):
+    def __init__(self, root):
+        import tkinter as tk
+        super().__init__(root, "Pictures")
+        self.label = tk.Label(self.top, bg="black")
+        self.label.pack(fill="both", expand=True)
+        self.top.configure(bg="black")
+
+    def set_image(self, photo):
+        self.label.config(image=photo)
+        self.label.image = photo  # keep a reference or Tk shows nothing
+
+WINDOW_KINDS = {"text": _TextWindow, "alert": _AlertWindow, "image": _ImageWindow}
+
+def window(kind):
+    """The reusable window of this kind. UI thread only (use it inside call())."""
+    if kind not in _windows:
+        _windows[kind] = WINDOW_KINDS[kind](_root)
+    return _windows[kind]
+
+def root():
+    """The hidden root window, for after() timers. UI thread only."""
+    return _root
+
+def _drain():
+    while True:
+        try:
+            future, fn, args = _requests.get_nowait()
+        except queue.Empty:
+            break
+        if not future.set_running_or_notify_cancel():
+            continue
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            print(f"[UI ERROR] {getattr(fn, '__name__', fn)} failed: {e}")
+            future.set_exception(e)
+    _root.after(POLL_MS, _drain)
+
+def _fail_pending():
+    while True:
+        try:
+            future, fn, args = _requests.get_nowait()
+        except queue.Empty:
+            return
+        if future.set_running_or_notify_cancel():
+            future.set_exception(RuntimeError(f"UI unavailable: {_unavailable}"))
+
+def _run(ready):
+    global _root, _unavailable
+    try:
+        import tkinter as tk
+        _root = tk.Tk()
+        _root.withdraw()
+    except Exception as e:
+        _unavailable = str(e)
+        print(f"[UI ERROR] Could not start Tk, popups are disabled: {e}")
+        ready.set()
+        _fail_pending()
+        return
+    ready.set()
+    _root.after(0, _drain)
+    _root.mainloop()
+
+def start():
+    """Start the UI thread (done on first use anyway). Returns once Tk is up or has failed."""
+    global _thread
+    with _start_lock:
+        if _thread is None:
+            ready = threading.Event()
+            _thread = threading.Thread(target=_run, args=(ready,), name="ui", daemon=True)
+            _thread.start()
+            ready.wait()
+
+def call(fn, *args):
+    """Run fn(*args) on the UI thread. Returns a Future for its result."""
+    future = Future()
+    start()
+    if _unavailable is not None:
+        future.set_exception(RuntimeError(f"UI unavailable: {_unavailable}"))
+        return future
+    if threading.current_thread() is _thread:
+        # Already on the UI thread: queueing would only add a poll's delay
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    _requests.put((future, fn, args))
+    return future
+
+def show_text(title, text, close_after=TEXT_CLOSE_SECONDS, topmost=False):
+    """Fullscreen read-only text with a Close button. Returns a Future that is done once it is on screen."""
+    def show():
+        win = window("text")
+        win.set(title, text)
+        win.show(close_after, topmost)
+        win.top.update_idletasks()
+    return call(show)
+
+def show_alert(text, close_after=None):
+    """Fullscreen alert with a Dismiss button. Returns an Event that is set when it is dismissed (or can't be shown)."""
+    dismissed = threading.Event()
+
+    def show():
+        win = window("alert")
+        if win.on_hide:
+            win.on_hide()  # a newer alert replaces the one on screen
+        win.label.config(text=text)
+        win.on_hide = dismissed.set
+        win.show(close_after, topmost=True)
+
+    call(show).add_done_callback(lambda f: f.exception() and dismissed.set())
+    return dismissed
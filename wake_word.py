@@ -0,0 +1,287 @@
+import os
+import json
+import math
+import wave
+from array import array
+
+# Local wake-word stage. Raw microphone frames go through an energy gate with
+# an adaptive noise floor; only while the gate is open are per-frame features
+# computed (log energy in a few frequency bands via the Goertzel algorithm,
+# plus zero-crossing rate). When a burst of speech of wake-word length ends,
+# it is compared with the enrolled "ok jarvis" / "ok bro" recordings using
+# dynamic time warping. Nothing is sent over the network until that matches.
+#
+# Enroll by recording yourself saying the wake phrase a few times (16-bit mono
+# WAV) into data/wake_words/ and running:  python wake_word.py enroll
+#
+# The zero-crossing feature depends on the sample rate, so every template
+# records the rate it was made at. A template made at another rate than the
+# microphone's is rebuilt from its recording, resampled; one whose recording
+# is gone is left out.
+#
+# Steady loud sound, like the music or video Jarvis is playing itself, keeps
+# the gate open indefinitely. Once a burst runs past MAX_BURST_FRAMES the noise
+# floor is let up towards it, so the gate closes again and a wake phrase said
+# over the music can still open it.
+
+TEMPLATE_FILE = os.path.join("data", "wake_templates.json")
+ENROLL_DIR = os.path.join("data", "wake_words")
+
+FRAME_MS = 30
+BAND_HZ = (300, 500, 800, 1200, 1800, 2500, 3500)
+GATE_RATIO = 3.0          # speech = frame RMS above noise floor * ratio
+MIN_RMS = 200             # never open the gate below this, however quiet the room
+HANGOVER_FRAMES = 8       # silent frames that end a burst (240 ms)
+MIN_BURST_FRAMES = 10     # wake phrases are roughly 0.3 s ...
+MAX_BURST_FRAMES = 60     # ... to 1.8 s long
+MATCH_THRESHOLD = 5.0     # mean DTW distance per frame; lower is stricter (bench_wake_word: 0 false accepts, 5% rejects)
+FLOOR_RATE = 0.05         # how fast the noise floor follows the level between bursts
+LONG_BURST_FLOOR_RATE = 0.02  # ... and during an over-long burst
+
+def frame_samples(sample_rate):
+    return sample_rate * FRAME_MS // 1000
+
+def _rms(samples):
+    return math.sqrt(sum(s * s for s in samples) / len(samples)) if samples else 0.0
+
+def frame_features(samples, sample_rate):
+    """Log band energies + zero-crossing rate for one frame of int16 samples."""
+    # Every other sample is plenty for bands under 4 kHz at 16 kHz and up
+    step = 2 if sample_rate >= 16000 else 1
+    x = samples[::step]
+    rate = sample_rate / step
+    n = len(x)
+    features = []
+    for hz in BAND_HZ:
+        coeff = 2 * math.cos(2 * math.pi * hz / rate)
+        s1 = s2 = 0.0
+        for v in x:
+            s1, s2 = v + coeff * s1 - s2, s1
+        power = s1 * s1 + s2 * s2 - coeff * s1 * s2
+        features.append(math.log(power / n + 1.0))
+    crossings = sum(1 for a, b in zip(x, x[1:]) if (a < 0) != (b < 0))
+    features.append(10.0 * crossings / n)
+    return features
+
+def normalize(sequence):
+    """Subtract each feature's mean over the burst so loudness and mic gain drop out."""
+    if not sequence:
+        return sequence
+    means = [sum(col) / len(sequence) for col in zip(*sequence)]
+    return [[v - m for v, m in zip(row, means)] for row in sequence]
+
+def dtw_distance(a, b, window=None):
+    """Mean per-step Euclidean distance along the best DTW alignment of a and b."""
+    n, m = len(a), len(b)
+    window = max(window or max(n, m), abs(n - m))
+    inf = float("inf")
+    prev = [inf] * (m + 1)
+    prev[0] = 0.0
+    prev_len = [0] * (m + 1)
+    for i in range(1, n + 1):
+        cur = [inf] * (m + 1)
+        cur_len = [0] * (m + 1)
+        row = a[i - 1]
+        for j in range(max(1, i - window), min(m, i + window) + 1):
+            cost = math.sqrt(sum((p - q) ** 2 for p, q in zip(row, b[j - 1])))
+            best, length = prev[j - 1], prev_len[j - 1]
+            if prev[j] < best:
+                best, length = prev[j], prev_len[j]
+            if cur[j - 1] < best:
+                best, length = cur[j - 1], cur_len[j - 1]
+            cur[j] = best + cost
+            cur_len[j] = length + 1
+        prev, prev_len = cur, cur_len
+    return prev[m] / prev_len[m] if prev_len[m] else inf
+
+class WakeWordDetector:
+    """Feed raw 16-bit mono frames to process(); it returns True when a wake phrase just ended."""
+
+    def __init__(self, templates, sample_rate=16000, threshold=MATCH_THRESHOLD):
+        self.templates = [normalize(t) for t in templates]
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_len = frame_samples(sample_rate)
+        self.noise_floor = None
+        self.last_distance = None
+        self._pending = array("h")
+        self._burst = []
+        self._silent = 0
+        self._too_long = False
+        self.samples_fed = 0        # since reset()
+        self.wake_end_sample = None # where the last detected wake phrase ended, in samples since reset()
+        self._frames_done = 0
+        self._end_sample = 0
+
+    def reset(self):
+        self._pending = array("h")
+        self._burst = []
+        self._silent = 0
+        self._too_long = False
+        self.samples_fed = 0
+        self.wake_end_sample = None
+        self._frames_done = 0
+        self._end_sample = 0
+
+    @property
+    def speaking(self):
+        """True while a burst of speech is in progress (the noise floor is frozen)."""
+        return bool(self._burst)
+
+    def process(self, data):
+        """Consume raw bytes of any length. True if a wake phrase was detected in them."""
+        self._pending.frombytes(data[:len(data) - len(data) % 2])
+        self.samples_fed += len(data) // 2
+        detected = False
+        while len(self._pending) >= self.frame_len:
+            frame = self._pending[:self.frame_len]
+            del self._pending[:self.frame_len]
+            detected = self._process_frame(frame) or detected
+            self._frames_done += 1
+        return detected
+
+    def _process_frame(self, frame):
+        level = _rms(frame)
+        if self.noise_floor is None:
+            self.noise_floor = level
+        speech = level > max(MIN_RMS, self.noise_floor * GATE_RATIO)
+        if not speech and not self._burst:
+            # Track the room's noise floor only while nobody is talking
+            self.noise_floor += FLOOR_RATE * (level - self.noise_floor)
+            return False
+        if self._too_long:
+            # Too long for speech: media or machinery. Let the floor rise to it
+            self.noise_floor += LONG_BURST_FLOOR_RATE * (level - self.noise_floor)
+
+        if speech:
+            self._silent = 0
+            self._burst.append(frame_features(frame, self.sample_rate))
+            if len(self._burst) > MAX_BURST_FRAMES:
+                # Too long to be a wake phrase (someone is just talking); wait for a pause
+                self._burst = self._burst[-MAX_BURST_FRAMES:]
+                self._too_long = True
+            return False
+
+        if self._silent == 0:
+            self._end_sample = self._frames_done * self.frame_len
+        self._silent += 1
+        if self._silent < HANGOVER_FRAMES:
+            return False
+        burst, too_long = self._burst, self._too_long
+        self._burst, self._silent, self._too_long = [], 0, False
+        if too_long or len(burst) < MIN_BURST_FRAMES:
+            return False
+        if self.matches(burst):
+            self.wake_end_sample = self._end_sample
+            return True
+        return False
+
+    def matches(self, burst):
+        if not self.templates:
+            return False
+        burst = normalize(burst)
+        self.last_distance = min(dtw_distance(burst, t, window=len(t) // 2) for t in self.templates)
+        return self.last_distance <= self.threshold
+
+# WAV helpers, templates and enrollment
+
+def read_wav(path):
+    """(sample_rate, array('h')) for a 16-bit WAV; stereo is mixed down to mono."""
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        rate, channels = w.getframerate(), w.getnchannels()
+        samples = array("h")
+        samples.frombytes(w.readframes(w.getnframes()))
+    if channels > 1:
+        samples = array("h", (sum(samples[i:i + channels]) // channels
+                              for i in range(0, len(samples), channels)))
+    return rate, samples
+
+def extract_template(samples, sample_rate):
+    """Features for the loudest stretch of a recording: frames above the gate, trimmed at both ends."""
+    n = frame_samples(sample_rate)
+    frames = [samples[i:i + n] for i in range(0, len(samples) - n + 1, n)]
+    levels = [_rms(f) for f in frames]
+    if not frames:
+        return []
+    floor = sorted(levels)[len(levels) // 10]
+    voiced = [i for i, lvl in enumerate(levels) if lvl > max(MIN_RMS, floor * GATE_RATIO)]
+    if not voiced:
+        return []
+    return [frame_features(f, sample_rate) for f in frames[voiced[0]:voiced[-1] + 1]]
+
+def resample(samples, from_rate, to_rate):
+    """Linear-interpolation resampling, plenty for the features above."""
+    if from_rate == to_rate or not samples:
+        return samples
+    ratio = from_rate / to_rate
+    last = len(samples) - 1
+    out = array("h", bytes(2 * int(len(samples) / ratio)))
+    for i in range(len(out)):
+        pos = i * ratio
+        j = int(pos)
+        a = samples[j]
+        b = samples[j + 1] if j < last else a
+        out[i] = int(a + (b - a) * (pos - j))
+    return out
+
+_rebuilt = {}  # (source, mtime, rate) -> template
+
+def _template_at(entry, sample_rate):
+    """entry's features at sample_rate, rebuilt from its recording if it was made at another rate; None if it can't be."""
+    if sample_rate is None or entry["sample_rate"] == sample_rate:
+        return entry["features"]
+    source = entry.get("source")
+    if not source or not os.path.exists(source):
+        print(f"[WAKE WORD] Skipped a template made at {entry['sample_rate']} Hz: the microphone runs at "
+              f"{sample_rate} Hz and {source or 'its recording'} is gone. Enroll again.")
+        return None
+    key = (source, os.path.getmtime(source), sample_rate)
+    if key not in _rebuilt:
+        rate, samples = read_wav(source)
+        _rebuilt[key] = extract_template(resample(samples, rate, sample_rate), sample_rate)
+    return _rebuilt[key]
+
+def load_templates(path=TEMPLATE_FILE, sample_rate=None):
+    """Enrolled templates, usable at sample_rate (any rate if None)."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        entries = json.load(f)["templates"]
+    templates = []
+    for entry in entries:
+        if isinstance(entry, list):
+            # Enrolled before rates were recorded; nothing to check against
+            templates.append(entry)
+            continue
+        template = _template_at(entry, sample_rate)
+        if template:
+            templates.append(template)
+    return templates
+
+def enroll(wav_paths, path=TEMPLATE_FILE):
+    templates = []
+    entries = []
+    for wav_path in wav_paths:
+        rate, samples = read_wav(wav_path)
+        template = extract_template(samples, rate)
+        if len(template) >= MIN_BURST_FRAMES // 2:
+            templates.append(template)
+            entries.append({"sample_rate": rate, "source": os.path.abspath(wav_path), "features": template})
+            print(f"[WAKE WORD] Enrolled {wav_path}: {len(template)} frames at {rate} Hz")
+        else:
+            print(f"[WAKE WORD] Skipped {wav_path}: no clear speech found")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"frame_ms": FRAME_MS, "bands": BAND_HZ, "templates": entries}, f)
+    return templates
+
+if __name__ == "__main__":
+    import sys
+    import glob
+    if len(sys.argv) > 1 and sys.argv[1] == "enroll":
+        files = sys.argv[2:] or sorted(glob.glob(os.path.join(ENROLL_DIR, "*.wav")))
+        print(f"[WAKE WORD] {len(enroll(files))} template(s) saved to {TEMPLATE_FILE}")
+    else:
+        print("Usage: python wake_word.py enroll [file.wav ...]")
@@ -0,0 +1,12 @@
+# WSGI entry point for running the Alexa server under a production server
+# instead of `python app.py`, e.g.
+#
+#     waitress-serve --host 127.0.0.1 --port 5000 --threads 8 wsgi:app
+#     gunicorn --workers 1 --threads 8 --bind 127.0.0.1:5000 wsgi:app
+#
+# Keep it to one worker process (see app.run_server). This doesn't start ngrok
+# or update the skill endpoint; `python app.py --production` does both and
+# then serves with waitress.
+from app import app
+
+application = app